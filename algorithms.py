@@ -1,6 +1,17 @@
 import heapq
-from PyQt6.QtCore import QObject, pyqtSignal as Signal, QTimer, QEventLoop
-from counter import perf_monitor
+import os
+import sys
+import numpy as np
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal as Signal, pyqtSlot as Slot
+from counter import OperationCounter, perf_monitor
+from event_trace import EventTrace, STATES
+
+# The optimized headless algorithms live in src/algorithms (flat imports)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "algorithms"))
+from bellman_ford import bellmanFord
+from dijkstra import dijkstra
+from graph_generator import createGraph
+from graph_io import loadGraph
 
 # --- Weighted Graph Data {Source: {Target: Weight}} ---
 SAMPLE_GRAPH = {
@@ -11,26 +22,152 @@ SAMPLE_GRAPH = {
 }
 
 
-class AlgorithmRunner(QObject):
-    # Signals:
-    # update_state: node_id, color_state
-    # update_dist: node_id, new_distance_value
-    update_state = Signal(str, str)
-    update_dist = Signal(str, object)
-    metrics_signal = Signal(str)
+def generate_graph(nodes, seed=None):
+    """A createGraph() graph as an undirected CSRGraph (node ids 0..V-1)."""
+    return createGraph(nodes, csr=True, seed=seed)
 
-    def __init__(self):
+
+def load_graph(path):
+    """A saved .csr graph, memory-mapped."""
+    return loadGraph(path)
+
+
+def draw_arrays(graph):
+    """
+    (nodes, us, vs, weights) for GraphView.draw_arrays. An undirected
+    CSRGraph stores each edge twice; only one copy is drawn.
+    """
+    us, vs = graph.arcSources(), graph.targets
+    keep = slice(None) if graph.directed else us < vs
+    return (
+        list(range(graph.V)),
+        us[keep].astype(np.int32),
+        vs[keep].astype(np.int32),
+        graph.weights[keep],
+    )
+
+
+class HeadlessResult:
+    """Whole-graph result of a headless run, shown as a heatmap or tree."""
+
+    def __init__(self, label, source, dist, pred, metrics, negative_cycle=False):
+        self.label = label
+        self.source = source
+        self.dist = dist    # float64 per node, inf = unreachable
+        self.pred = pred    # Shortest-path tree parent per node, -1 = none
+        self.metrics = metrics
+        self.negative_cycle = negative_cycle
+
+
+class HeadlessWorker(QObject):
+    """
+    Runs the optimized src/algorithms code on a CSRGraph on a worker thread.
+    Nothing is animated: the GUI only receives the final distances.
+    """
+
+    result_ready = Signal(object)
+    done = Signal()
+
+    def __init__(self, algo_type, graph, source):
         super().__init__()
-        self.delay_ms = 400
+        self.algo_type = algo_type
+        self.graph = graph
+        self.source = source
+
+    @Slot()
+    def run(self):
+        graph, src = self.graph, self.source
+        with OperationCounter() as counter:
+            # float64 arrays: unreachable nodes come back as inf for the views
+            if self.algo_type == "dijkstra":
+                label = "Dijkstra"
+                output = dijkstra(graph.V, graph, src, counter=counter, dtype=np.float64, predecessors=True)
+            else:
+                label = "Bellman-Ford"
+                output = bellmanFord(graph.V, graph, src, engine="numpy", counter=counter,
+                                     dtype=np.float64, predecessors=True)
+
+        metrics = (
+            f"{label} on {graph.V} nodes from {src}\n"
+            f"Relaxations: {counter.relaxations}  Time: {counter.execution_time:.4f}s"
+        )
+        if output is None:
+            empty = np.full(graph.V, np.inf)
+            result = HeadlessResult(label, src, empty, np.full(graph.V, -1), metrics, negative_cycle=True)
+        else:
+            dist, pred = output
+            result = HeadlessResult(label, src, dist, pred, metrics)
+
+        self.result_ready.emit(result)
+        self.done.emit()
+
+
+class AlgorithmWorker(QObject):
+    """
+    Runs one algorithm on a worker thread, in a single fast pass.
+
+    Instead of emitting signals and sleeping between steps, the algorithm
+    records an EventTrace; every former animation step closes a frame. The
+    GUI then replays the trace at any speed, without paying the algorithm
+    cost again.
+    """
+
+    trace_ready = Signal(object)
+    done = Signal()
+
+    def __init__(self, algo_type, graph, start_node, record=True):
+        super().__init__()
+        self.algo_type = algo_type
+        self.graph = graph
+        self.start_node = start_node
+        self.record = record  # False = "no animation": only the final state
+        self.cancelled = False
+        self.trace = None
+
+    # --- Event helpers used by the algorithm bodies ---
+    def update_state(self, node, state):
+        if self.record:
+            self.trace.record_state(node, state)
+
+    def update_dist(self, node, dist):
+        if self.record:
+            self.trace.record_dist(node, dist)
 
     def wait(self):
-        """Helper to create a visual delay"""
-        loop = QEventLoop()
-        QTimer.singleShot(self.delay_ms, loop.quit)
-        loop.exec()
+        """Marks one animation step: the end of a replay frame."""
+        if self.record:
+            self.trace.end_frame()
+
+    @Slot()
+    def run(self):
+        label = "Dijkstra" if self.algo_type == "dijkstra" else "Bellman-Ford"
+        self.trace = EventTrace(self.graph, label=label)
 
-    def run_dijkstra(self, graph, start_node):
         perf_monitor.start()
+        if self.algo_type == "dijkstra":
+            distances, visited = self.run_dijkstra()
+        else:
+            distances, visited = self.run_bellman_ford()
+        perf_monitor.stop()
+
+        if not self.record:
+            # Only the final result goes into the trace, as one frame
+            self.record = True
+            for node, dist in distances.items():
+                self.update_dist(node, dist)
+                if node in visited:
+                    self.update_state(node, "visited")
+            self.update_state(self.start_node, "start")
+        self.trace.end_frame()
+
+        self.trace.metrics = (
+            f"{label} Steps: {perf_monitor.steps}\nTime: {perf_monitor.execution_time:.4f}s"
+        )
+        self.trace_ready.emit(self.trace)
+        self.done.emit()
+
+    def run_dijkstra(self):
+        graph, start_node = self.graph, self.start_node
 
         # Distances map
         distances = {node: float("inf") for node in graph}
@@ -38,24 +175,24 @@ class AlgorithmRunner(QObject):
 
         # Update GUI with initial distances
         for node in graph:
-            self.update_dist.emit(node, float("inf"))
-        self.update_dist.emit(start_node, 0)
+            self.update_dist(node, float("inf"))
+        self.update_dist(start_node, 0)
 
         # Priority Queue: (current_dist, node_id)
         pq = [(0, start_node)]
         visited = set()
 
-        self.update_state.emit(start_node, "start")
+        self.update_state(start_node, "start")
         self.wait()
 
-        while pq:
+        while pq and not self.cancelled:
             current_dist, u = heapq.heappop(pq)
             perf_monitor.increment()
 
             if u in visited:
                 continue
             visited.add(u)
-            self.update_state.emit(u, "visited")
+            self.update_state(u, "visited")
             self.wait()
 
             # Check neighbors
@@ -64,37 +201,34 @@ class AlgorithmRunner(QObject):
                 new_dist = current_dist + weight
 
                 # Highlighting edge check
-                self.update_state.emit(v, "updating")
+                self.update_state(v, "updating")
                 self.wait()
 
                 if new_dist < distances[v]:
                     distances[v] = new_dist
-                    self.update_dist.emit(v, new_dist)
+                    self.update_dist(v, new_dist)
                     heapq.heappush(pq, (new_dist, v))
-                    self.update_state.emit(v, "frontier")
+                    self.update_state(v, "frontier")
                 else:
                     # Revert color if not updated
                     if v not in visited:
-                        self.update_state.emit(v, "default")
+                        self.update_state(v, "default")
 
                 self.wait()
 
-        perf_monitor.stop()
-        self.metrics_signal.emit(
-            f"Dijkstra Steps: {perf_monitor.steps}\nTime: {perf_monitor.execution_time:.4f}s"
-        )
+        return distances, visited
 
-    def run_bellman_ford(self, graph, start_node):
-        perf_monitor.start()
+    def run_bellman_ford(self):
+        graph, start_node = self.graph, self.start_node
 
         distances = {node: float("inf") for node in graph}
         distances[start_node] = 0
 
         # Reset GUI
         for node in graph:
-            self.update_dist.emit(node, float("inf"))
-        self.update_dist.emit(start_node, 0)
-        self.update_state.emit(start_node, "start")
+            self.update_dist(node, float("inf"))
+        self.update_dist(start_node, 0)
+        self.update_state(start_node, "start")
         self.wait()
 
         nodes = list(graph.keys())
@@ -105,11 +239,13 @@ class AlgorithmRunner(QObject):
             changed = False
             for u in graph:
                 for v, weight in graph[u].items():
+                    if self.cancelled:
+                        break
                     perf_monitor.increment()
 
                     # Highlight checking
-                    self.update_state.emit(u, "visited")  # Current source
-                    self.update_state.emit(v, "updating")  # Checking target
+                    self.update_state(u, "visited")  # Current source
+                    self.update_state(v, "updating")  # Checking target
                     self.wait()
 
                     if (
@@ -117,22 +253,209 @@ class AlgorithmRunner(QObject):
                         and distances[u] + weight < distances[v]
                     ):
                         distances[v] = distances[u] + weight
-                        self.update_dist.emit(v, distances[v])
-                        self.update_state.emit(v, "frontier")  # Updated
+                        self.update_dist(v, distances[v])
+                        self.update_state(v, "frontier")  # Updated
                         changed = True
                     else:
                         if v != start_node:
-                            self.update_state.emit(v, "default")
+                            self.update_state(v, "default")
 
                     self.wait()
                     # Reset source color
                     if u != start_node:
-                        self.update_state.emit(u, "default")
+                        self.update_state(u, "default")
 
-            if not changed:
+            if not changed or self.cancelled:
                 break
 
-        perf_monitor.stop()
-        self.metrics_signal.emit(
-            f"Bellman-Ford Steps: {perf_monitor.steps}\nTime: {perf_monitor.execution_time:.4f}s"
-        )
+        reached = {node for node, dist in distances.items() if dist != float("inf")}
+        return distances, reached
+
+
+class TracePlayer(QObject):
+    """
+    Replays an EventTrace on the GUI thread: play, pause, seek, reverse and
+    variable speed. Each move emits only the nodes whose state or distance
+    differs from what is currently shown.
+    """
+
+    update_state = Signal(str, str)
+    update_dist = Signal(str, object)
+    position_changed = Signal(int, int)  # frame, frame_count
+    playback_finished = Signal()
+
+    def __init__(self, frame_ms=400):
+        super().__init__()
+        self.trace = None
+        self.position = 0
+        self.frame_ms = frame_ms
+        self.speed = 1.0
+        self.reverse = False
+        self._shown = None  # (states, dists) currently on screen
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+    def load(self, trace, position=0):
+        self.pause()
+        self.trace = trace
+        self._shown = None
+        self.seek(position)
+
+    def is_playing(self):
+        return self._timer.isActive()
+
+    def invalidate(self):
+        """The view was changed elsewhere: the next seek redraws every node."""
+        self._shown = None
+
+    def play(self):
+        if self.trace is None:
+            return
+        # Restart from the matching end when already there
+        if not self.reverse and self.position >= self.trace.frame_count:
+            self.seek(0)
+        elif self.reverse and self.position <= 0:
+            self.seek(self.trace.frame_count)
+        self._timer.start(self._interval())
+
+    def pause(self):
+        self._timer.stop()
+
+    def set_speed(self, speed):
+        self.speed = speed
+        if self.is_playing():
+            self._timer.setInterval(self._interval())
+
+    def set_reverse(self, reverse):
+        self.reverse = reverse
+
+    def seek(self, position):
+        if self.trace is None:
+            return
+        position = max(0, min(position, self.trace.frame_count))
+        states, dists = self.trace.snapshot(position)
+
+        if self._shown is None:
+            changed_states = changed_dists = range(len(self.trace.nodes))
+        else:
+            shown_states, shown_dists = self._shown
+            changed_states = np.flatnonzero(states != shown_states).tolist()
+            changed_dists = np.flatnonzero(dists != shown_dists).tolist()
+
+        nodes = self.trace.nodes
+        for i in changed_dists:
+            d = float(dists[i])
+            self.update_dist.emit(nodes[i], int(d) if d.is_integer() else d)
+        for i in changed_states:
+            self.update_state.emit(nodes[i], STATES[states[i]])
+
+        self._shown = (states, dists)
+        self.position = position
+        self.position_changed.emit(position, self.trace.frame_count)
+
+    def _interval(self):
+        return max(1, int(self.frame_ms / max(self.speed, 0.01)))
+
+    def _tick(self):
+        target = self.position + (-1 if self.reverse else 1)
+        if target < 0 or target > self.trace.frame_count:
+            self.pause()
+            self.playback_finished.emit()
+            return
+        self.seek(target)
+
+
+class AlgorithmRunner(QObject):
+    # Signals:
+    # update_state: node_id, color_state
+    # update_dist: node_id, new_distance_value
+    update_state = Signal(str, str)
+    update_dist = Signal(str, object)
+    metrics_signal = Signal(str)
+    result_signal = Signal(object)  # HeadlessResult
+    finished = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.delay_ms = 400
+        self.animate = True   # False = "no animation": true algorithm time
+        self.trace = None     # Last recorded or loaded EventTrace
+        self._thread = None
+        self._worker = None
+
+        # All drawing goes through the player, live runs and loaded traces alike
+        self.player = TracePlayer(self.delay_ms)
+        self.player.update_state.connect(self.update_state)
+        self.player.update_dist.connect(self.update_dist)
+
+    def is_running(self):
+        return self._thread is not None
+
+    def set_speed(self, speed):
+        self.player.set_speed(speed)
+
+    def run_dijkstra(self, graph, start_node):
+        self._start("dijkstra", graph, start_node)
+
+    def run_bellman_ford(self, graph, start_node):
+        self._start("bellman", graph, start_node)
+
+    def run_headless(self, algo_type, graph, source):
+        """Runs the optimized algorithm on a CSRGraph; emits result_signal."""
+        if self.is_running():
+            return
+        self.player.pause()
+        worker = HeadlessWorker(algo_type, graph, source)
+        worker.result_ready.connect(self.result_signal)
+        self._launch(worker)
+
+    def stop(self, wait=True):
+        """Cancels a running algorithm and playback."""
+        self.player.pause()
+        if isinstance(self._worker, AlgorithmWorker):
+            self._worker.cancelled = True
+        if wait and self._thread is not None:
+            self._thread.wait()
+
+    def save_trace(self, path):
+        if self.trace is not None:
+            self.trace.save(path)
+
+    def load_trace(self, path):
+        """Replays a saved trace without recomputing anything."""
+        self._show_trace(EventTrace.load(path))
+
+    def _start(self, algo_type, graph, start_node):
+        if self.is_running():
+            return
+        self.player.pause()
+        worker = AlgorithmWorker(algo_type, graph, start_node, record=self.animate)
+        worker.trace_ready.connect(self._show_trace)
+        self._launch(worker)
+
+    def _launch(self, worker):
+        thread = QThread()
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.done.connect(thread.quit)
+        thread.finished.connect(self._on_finished)
+
+        self._thread, self._worker = thread, worker
+        thread.start()
+
+    def _show_trace(self, trace):
+        self.trace = trace
+        self.player.frame_ms = self.delay_ms
+        self.player.load(trace)
+        self.metrics_signal.emit(trace.metrics)
+        if self.animate:
+            self.player.play()
+        else:
+            self.player.seek(trace.frame_count)
+
+    def _on_finished(self):
+        self._worker.deleteLater()
+        self._thread.deleteLater()
+        self._thread = self._worker = None
+        self.finished.emit()
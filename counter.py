@@ -1,24 +1,63 @@
 import time
+from contextlib import contextmanager
 
 
 class OperationCounter:
     """
     Singleton or context manager to track steps and time for algorithms.
+
+    The headless algorithms in src/algorithms accept one as `counter=` and
+    report into it: per-phase times (build, init, search) plus heap and
+    relaxation counts. They keep counts in local variables and call add()
+    once per query or batch, so an enabled counter stays cheap and a
+    disabled one (counter=None) costs nothing.
     """
 
+    # Counters summed by add(); peak_heap keeps the maximum instead.
+    # The cache_* ones come from src/algorithms/query_cache.QueryCache.
+    COUNTS = (
+        "relaxations", "heap_pushes", "heap_pops", "stale_pops", "queries",
+        "cache_hits", "cache_misses", "cache_evictions",
+    )
+
     def __init__(self):
         self.steps = 0
         self.start_time = 0
         self.execution_time = 0
+        self.reset()
 
     def reset(self):
         self.steps = 0
         self.execution_time = 0
+        self.phases = {}
+        for name in self.COUNTS:
+            setattr(self, name, 0)
+        self.peak_heap = 0
 
     def increment(self):
         """Call this method to count a step."""
         self.steps += 1
 
+    def add(self, peak_heap=0, **counts):
+        """Adds a batch of counts at once, e.g. add(relaxations=120, heap_pops=40)."""
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+        if peak_heap > self.peak_heap:
+            self.peak_heap = peak_heap
+
+    def add_time(self, name, seconds):
+        """Adds `seconds` to the named phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block into the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
     def start(self):
         self.reset()
         self.start_time = time.perf_counter()
@@ -26,6 +65,23 @@ class OperationCounter:
     def stop(self):
         self.execution_time = time.perf_counter() - self.start_time
 
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def summary(self):
+        """All counters and phase times as a plain dict."""
+        result = {name: getattr(self, name) for name in self.COUNTS}
+        result["peak_heap"] = self.peak_heap
+        result["steps"] = self.steps
+        result["execution_time"] = self.execution_time
+        result["phases"] = dict(self.phases)
+        return result
+
 
 # Global instance for simplicity in Sprint 1
 perf_monitor = OperationCounter()
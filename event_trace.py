@@ -0,0 +1,123 @@
+import array
+import bisect
+import math
+import numpy as np
+
+# Node colour states, stored as one byte per event
+STATES = ("default", "start", "visited", "frontier", "updating")
+STATE_CODE = {name: code for code, name in enumerate(STATES)}
+NO_STATE = -1  # The event only changes a distance
+
+
+class EventTrace:
+    """
+    Compact record of one algorithm run, for replay without recomputing.
+
+    Every event is one (node, state, dist) record in parallel typed arrays:
+    a state change stores dist = NaN, a distance change stores NO_STATE.
+    Each animation step closes a frame. Seeking rebuilds the view from the
+    nearest keyframe instead of replaying from the start.
+    """
+
+    KEYFRAME_EVERY = 512  # Events between stored snapshots
+
+    def __init__(self, nodes, label=""):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.label = label
+        self.metrics = ""
+
+        self.node = array.array("i")
+        self.state = array.array("b")
+        self.dist = array.array("d")
+        # Frame k covers events [frame_ends[k - 1], frame_ends[k])
+        self.frame_ends = array.array("q")
+        self._keyframes = None
+
+    # --- Recording ---
+    def record_state(self, node, state):
+        self.node.append(self.index[node])
+        self.state.append(STATE_CODE[state])
+        self.dist.append(math.nan)
+
+    def record_dist(self, node, dist):
+        self.node.append(self.index[node])
+        self.state.append(NO_STATE)
+        self.dist.append(float(dist))
+
+    def end_frame(self):
+        """Closes the current frame (empty frames are skipped)."""
+        end = len(self.node)
+        if end and (not self.frame_ends or self.frame_ends[-1] != end):
+            self.frame_ends.append(end)
+        self._keyframes = None
+
+    def __len__(self):
+        return len(self.node)
+
+    @property
+    def frame_count(self):
+        return len(self.frame_ends)
+
+    # --- Replay ---
+    def _initial(self):
+        states = np.zeros(len(self.nodes), dtype=np.int8)
+        dists = np.full(len(self.nodes), math.inf)
+        return states, dists
+
+    def _apply(self, states, dists, start, end):
+        node, state, dist = self.node, self.state, self.dist
+        for i in range(start, end):
+            if state[i] == NO_STATE:
+                dists[node[i]] = dist[i]
+            else:
+                states[node[i]] = state[i]
+
+    def _build_keyframes(self):
+        states, dists = self._initial()
+        self._keyframes = [(0, states.copy(), dists.copy())]
+        for start in range(0, len(self), self.KEYFRAME_EVERY):
+            end = min(start + self.KEYFRAME_EVERY, len(self))
+            self._apply(states, dists, start, end)
+            self._keyframes.append((end, states.copy(), dists.copy()))
+        self._keyframe_at = [kf[0] for kf in self._keyframes]
+
+    def snapshot(self, position):
+        """
+        View state after `position` frames (0 = before the first event).
+        Returns (states, dists): int8 state codes and float distances per node.
+        """
+        if self._keyframes is None:
+            self._build_keyframes()
+        end = self.frame_ends[position - 1] if position > 0 else 0
+
+        k = bisect.bisect_right(self._keyframe_at, end) - 1
+        start, states, dists = self._keyframes[k]
+        states, dists = states.copy(), dists.copy()
+        self._apply(states, dists, start, end)
+        return states, dists
+
+    # --- Persistence ---
+    def save(self, path):
+        """Writes the trace as a compressed .npz file (node ids stored as text)."""
+        np.savez_compressed(
+            path,
+            nodes=np.array([str(node) for node in self.nodes]),
+            node=np.frombuffer(self.node, dtype=np.int32),
+            state=np.frombuffer(self.state, dtype=np.int8),
+            dist=np.frombuffer(self.dist, dtype=np.float64),
+            frame_ends=np.frombuffer(self.frame_ends, dtype=np.int64),
+            label=np.array(self.label),
+            metrics=np.array(self.metrics),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            trace = cls(data["nodes"].tolist(), label=str(data["label"]))
+            trace.metrics = str(data["metrics"])
+            trace.node.frombytes(data["node"].astype(np.int32).tobytes())
+            trace.state.frombytes(data["state"].astype(np.int8).tobytes())
+            trace.dist.frombytes(data["dist"].astype(np.float64).tobytes())
+            trace.frame_ends.frombytes(data["frame_ends"].astype(np.int64).tobytes())
+        return trace
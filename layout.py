@@ -0,0 +1,284 @@
+import hashlib
+import os
+from collections import OrderedDict, namedtuple
+import networkx as nx
+import numpy as np
+
+# networkx's spring layout is dense O(n^2) (or needs scipy) above this size
+SPRING_LAYOUT_MAX_NODES = 500
+
+# Edits changing more than this fraction of nodes + edges (and more than
+# INCREMENTAL_MIN_EDITS of them) get a full layout instead of an update
+INCREMENTAL_MAX_CHANGE = 0.1
+INCREMENTAL_MIN_EDITS = 5
+
+# One cached layout, with the graph it belongs to (needed to diff edits)
+LayoutEntry = namedtuple("LayoutEntry", "nodes us vs weights pos")
+
+
+def graph_arrays(graph_data):
+    """
+    Flattens a {source: {target: weight}} dict into (nodes, us, vs, weights),
+    with us/vs as int32 indices into nodes.
+    """
+    # Same node order the original DiGraph build produced, so small graphs
+    # keep their familiar seeded spring layout
+    nodes, index = [], {}
+    for u, neighbors in graph_data.items():
+        for node in (u, *neighbors):
+            if node not in index:
+                index[node] = len(nodes)
+                nodes.append(node)
+
+    us, vs, weights = [], [], []
+    for u, neighbors in graph_data.items():
+        for v, weight in neighbors.items():
+            us.append(index[u])
+            vs.append(index[v])
+            weights.append(weight)
+    return (
+        nodes,
+        np.array(us, dtype=np.int32),
+        np.array(vs, dtype=np.int32),
+        np.array(weights),
+    )
+
+
+def graph_key(nodes, us, vs, weights):
+    """Content hash of a graph (weights shape the layout too), used as the layout cache key."""
+    h = hashlib.sha1()
+    h.update("\0".join(map(str, nodes)).encode())
+    h.update(np.ascontiguousarray(us, dtype=np.int32).tobytes())
+    h.update(np.ascontiguousarray(vs, dtype=np.int32).tobytes())
+    h.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def compute_layout(nodes, us, vs, weights, seed=42):
+    """
+    Node positions as an (n, 2) float array.
+    Small graphs keep the original networkx spring layout; large graphs use
+    the vectorized fast_spring_layout().
+    """
+    n = len(nodes)
+    if n <= SPRING_LAYOUT_MAX_NODES:
+        G = nx.DiGraph()
+        G.add_nodes_from(range(n))
+        G.add_weighted_edges_from(zip(us.tolist(), vs.tolist(), weights.tolist()))
+        pos = nx.spring_layout(G, seed=seed, k=2)
+        return np.array([pos[i] for i in range(n)], dtype=float).reshape(n, 2)
+    return fast_spring_layout(n, us, vs, seed=seed)
+
+
+def fast_spring_layout(n, us, vs, iterations=60, samples=8, seed=42, pos=None, movable=None):
+    """
+    Force-directed layout in O((n * samples + E) * iterations).
+    Edges attract as in Fruchterman-Reingold; repulsion is estimated against
+    `samples` random nodes per node per iteration instead of all n.
+    Returns positions in roughly [-1, 1]^2. Pass `pos` to continue from
+    previous positions instead of a random start, and `movable` (node
+    indices) to move only those nodes, leaving the rest exactly in place.
+    """
+    rng = np.random.default_rng(seed)
+    if pos is None:
+        pos = rng.random((n, 2)) * 2 - 1
+    else:
+        pos = np.array(pos, dtype=float)
+    if n < 2:
+        return pos
+
+    # Only forces acting on movable nodes are ever computed
+    if movable is None:
+        movable = np.arange(n)
+    else:
+        movable = np.asarray(movable, dtype=np.int64)
+        moving = np.zeros(n, dtype=bool)
+        moving[movable] = True
+        touches = moving[us] | moving[vs]
+        us, vs = us[touches], vs[touches]
+    m = len(movable)
+
+    k = 2.0 / np.sqrt(n)  # Ideal edge length in a [-1, 1] box
+    temperature = 0.1
+    cooling = (0.005 / temperature) ** (1 / max(iterations, 1))
+    scale = (n - 1) / samples  # Each sample stands in for this many nodes
+
+    for _ in range(iterations):
+        disp = np.zeros((n, 2))
+
+        # Repulsion: k^2 / d away from each sampled node
+        for _ in range(samples):
+            other = rng.integers(0, n, size=m)
+            delta = pos[movable] - pos[other]
+            dist2 = np.maximum((delta * delta).sum(axis=1), 1e-6)
+            disp[movable] += delta * (k * k * scale / dist2)[:, None] / n
+
+        # Attraction: d^2 / k along every edge
+        if len(us):
+            delta = pos[vs] - pos[us]
+            dist = np.sqrt(np.maximum((delta * delta).sum(axis=1), 1e-12))
+            pull = delta * (dist / k)[:, None]
+            np.add.at(disp, us, pull)
+            np.add.at(disp, vs, -pull)
+
+        # Move at most `temperature` per step, then cool down
+        step = disp[movable]
+        length = np.sqrt(np.maximum((step * step).sum(axis=1), 1e-12))
+        pos[movable] += step * (np.minimum(length, temperature) / length)[:, None]
+        temperature *= cooling
+
+    if m < n:
+        return pos  # Partial update: keep the existing frame of reference
+
+    # Center and normalize into [-1, 1]
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos /= extent
+    return pos
+
+
+def update_layout(base, nodes, us, vs, weights, seed=42):
+    """
+    Layout of an edited graph, starting from base (a LayoutEntry).
+    Only new nodes and the endpoints of added or removed edges move; every
+    other node keeps its position. Returns None when the edit is too large
+    (see INCREMENTAL_MAX_CHANGE) and a full layout is the better choice.
+    """
+    old_index = {node: i for i, node in enumerate(base.nodes)}
+    index = {node: i for i, node in enumerate(nodes)}
+    old_edges = {(base.nodes[u], base.nodes[v]) for u, v in zip(base.us.tolist(), base.vs.tolist())}
+    new_edges = {(nodes[u], nodes[v]) for u, v in zip(us.tolist(), vs.tolist())}
+
+    changed_edges = old_edges ^ new_edges
+    added_nodes = [node for node in nodes if node not in old_index]
+    removed = len(base.nodes) - (len(nodes) - len(added_nodes))
+    change = len(changed_edges) + len(added_nodes) + removed
+    if change > max(INCREMENTAL_MIN_EDITS, INCREMENTAL_MAX_CHANGE * (len(nodes) + len(new_edges))):
+        return None
+
+    # 1. Known nodes keep their old position
+    n = len(nodes)
+    pos = np.zeros((n, 2))
+    placed = np.zeros(n, dtype=bool)
+    for node, i in index.items():
+        if node in old_index:
+            pos[i] = base.pos[old_index[node]]
+            placed[i] = True
+
+    touched = set(added_nodes)
+    for u, v in changed_edges:
+        touched.update((u, v))
+    movable = sorted(index[node] for node in touched if node in index)
+    if not movable:
+        return pos  # Weight-only edits or nothing at all: nothing moves
+
+    # 2. New nodes start next to their placed neighbours (or the center)
+    rng = np.random.default_rng(seed)
+    jitter = 0.05 * (np.abs(pos[placed]).max() if placed.any() else 1.0)
+    for node in added_nodes:
+        i = index[node]
+        neighbors = [j for j in np.concatenate((vs[us == i], us[vs == i])).tolist() if placed[j]]
+        center = pos[neighbors].mean(axis=0) if neighbors else pos[placed].mean(axis=0) if placed.any() else 0
+        pos[i] = center + rng.normal(scale=jitter, size=2)
+
+    # 3. Relax only the touched nodes, in the [-1, 1] frame both layouts share
+    return fast_spring_layout(n, us, vs, iterations=20, seed=seed, pos=pos, movable=movable)
+
+
+def layout_graph(nodes, us, vs, weights, base=None):
+    """Incremental update from base when the edit is small, else a full layout."""
+    if base is not None:
+        pos = update_layout(base, nodes, us, vs, weights)
+        if pos is not None:
+            return pos
+    return compute_layout(nodes, us, vs, weights)
+
+
+class LayoutCache:
+    """
+    LRU cache of layouts keyed by graph content hash (see graph_key).
+
+    With a `path`, entries are also kept as <key>.npz files in that
+    directory, so layouts survive restarts; evicted entries are deleted from
+    disk too, so the directory never holds more than max_entries layouts.
+    """
+
+    def __init__(self, max_entries=16, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> LayoutEntry, or None if still on disk
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            files = [f for f in os.listdir(path) if f.endswith(".npz")]
+            files.sort(key=lambda f: os.path.getmtime(os.path.join(path, f)))
+            for f in files:
+                self._entries[f[:-4]] = None
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """The cached LayoutEntry for key (marked most recently used), or None."""
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        entry = self._entries[key]
+        if entry is None:
+            entry = self._entries[key] = self._load(key)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, nodes, us, vs, weights, pos):
+        entry = LayoutEntry(list(nodes), us, vs, weights, pos)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if self.path is not None:
+            self._save(key, entry)
+        self._evict()
+        return entry
+
+    def latest(self):
+        """Most recently used entry: the base for incremental updates."""
+        key = next(reversed(self._entries), None)
+        if key is None:
+            return None
+        if self._entries[key] is None:
+            self._entries[key] = self._load(key)
+        return self._entries[key]
+
+    def clear(self):
+        for key in list(self._entries):
+            self._remove(key)
+
+    # --- Internals ---
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _save(self, key, entry):
+        np.savez(
+            self._file(key),
+            nodes=np.array(entry.nodes),
+            us=entry.us, vs=entry.vs, weights=entry.weights, pos=entry.pos,
+        )
+
+    def _load(self, key):
+        with np.load(self._file(key)) as data:
+            return LayoutEntry(data["nodes"].tolist(), data["us"], data["vs"], data["weights"], data["pos"])
+
+    def _remove(self, key):
+        del self._entries[key]
+        if self.path is not None and os.path.exists(self._file(key)):
+            os.remove(self._file(key))
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
@@ -8,13 +8,18 @@ from PyQt6.QtWidgets import (
     QLabel,
     QPushButton,
     QHBoxLayout,
+    QComboBox,
+    QCheckBox,
+    QSlider,
+    QFileDialog,
+    QSpinBox,
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
 from visuals import GraphView
 from counter import perf_monitor
-from algorithms import AlgorithmRunner, SAMPLE_GRAPH
+from algorithms import AlgorithmRunner, SAMPLE_GRAPH, draw_arrays, generate_graph, load_graph
 
 
 class MainWindow(QMainWindow):
@@ -28,6 +33,16 @@ class MainWindow(QMainWindow):
         self.runner.update_state.connect(self.handle_state_update)
         self.runner.update_dist.connect(self.handle_dist_update)
         self.runner.metrics_signal.connect(self.handle_metrics_update)
+        self.runner.finished.connect(self.handle_run_finished)
+        self.runner.result_signal.connect(self.handle_result)
+        self.runner.player.position_changed.connect(self.handle_position_update)
+        self.runner.player.playback_finished.connect(
+            lambda: self.btn_play.setText("Play")
+        )
+
+        # A generated or loaded CSRGraph; None while the sample graph is shown
+        self.big_graph = None
+        self.last_result = None
 
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
@@ -66,9 +81,24 @@ class MainWindow(QMainWindow):
             "background-color: #6C757D; color: white; padding: 10px; border-radius: 5px;"
         )
 
+        # Playback speed (applies live, even mid-run)
+        self.speed_box = QComboBox()
+        for speed in ["0.25x", "0.5x", "1x", "2x", "4x", "8x"]:
+            self.speed_box.addItem(speed, float(speed[:-1]))
+        self.speed_box.setCurrentText("1x")
+        self.speed_box.currentIndexChanged.connect(
+            lambda: self.runner.set_speed(self.speed_box.currentData())
+        )
+
+        # No animation: run at full speed and report true algorithm time
+        self.chk_no_anim = QCheckBox("No animation")
+
         controls_layout.addWidget(self.btn_dijkstra)
         controls_layout.addWidget(self.btn_bellman)
         controls_layout.addWidget(self.btn_reset)
+        controls_layout.addWidget(QLabel("Speed:"))
+        controls_layout.addWidget(self.speed_box)
+        controls_layout.addWidget(self.chk_no_anim)
 
         self.metrics_label = QLabel("Ready.")
         self.metrics_label.setFont(QFont("Arial", 12))
@@ -76,47 +106,197 @@ class MainWindow(QMainWindow):
         controls_layout.addWidget(self.metrics_label)
 
         main_layout.addLayout(controls_layout)
+        main_layout.addLayout(self.setup_playback_controls())
+        main_layout.addLayout(self.setup_graph_controls())
         self.tab_viz.setLayout(main_layout)
 
+    def setup_playback_controls(self):
+        """Replay controls for the recorded trace: play/pause, reverse, seek, save/load."""
+        playback_layout = QHBoxLayout()
+
+        self.btn_play = QPushButton("Play")
+        self.btn_play.clicked.connect(self.toggle_playback)
+
+        self.chk_reverse = QCheckBox("Reverse")
+        self.chk_reverse.toggled.connect(self.runner.player.set_reverse)
+
+        self.seek_slider = QSlider(Qt.Orientation.Horizontal)
+        self.seek_slider.setRange(0, 0)
+        self.seek_slider.sliderMoved.connect(self.runner.player.seek)
+
+        self.frame_label = QLabel("0 / 0")
+
+        self.btn_save_trace = QPushButton("Save Trace")
+        self.btn_save_trace.clicked.connect(self.save_trace)
+        self.btn_load_trace = QPushButton("Load Trace")
+        self.btn_load_trace.clicked.connect(self.load_trace)
+
+        playback_layout.addWidget(self.btn_play)
+        playback_layout.addWidget(self.chk_reverse)
+        playback_layout.addWidget(self.seek_slider)
+        playback_layout.addWidget(self.frame_label)
+        playback_layout.addWidget(self.btn_save_trace)
+        playback_layout.addWidget(self.btn_load_trace)
+        return playback_layout
+
+    def setup_graph_controls(self):
+        """Large graphs: generate or open one, pick the source and the result view."""
+        graph_layout = QHBoxLayout()
+
+        self.nodes_box = QSpinBox()
+        self.nodes_box.setRange(2, 10_000_000)
+        self.nodes_box.setSingleStep(1000)
+        self.nodes_box.setValue(10_000)
+
+        self.btn_generate = QPushButton("Generate")
+        self.btn_generate.clicked.connect(
+            lambda: self.show_big_graph(generate_graph(self.nodes_box.value(), seed=0))
+        )
+        self.btn_open_graph = QPushButton("Open .csr")
+        self.btn_open_graph.clicked.connect(self.open_graph)
+        self.btn_sample = QPushButton("Sample Graph")
+        self.btn_sample.clicked.connect(self.show_sample_graph)
+
+        self.source_box = QSpinBox()
+        self.source_box.setRange(0, 0)
+
+        # How a headless result is drawn
+        self.view_box = QComboBox()
+        self.view_box.addItems(["Distance heatmap", "Shortest-path tree"])
+        self.view_box.currentIndexChanged.connect(self.show_result)
+
+        graph_layout.addWidget(QLabel("Nodes:"))
+        graph_layout.addWidget(self.nodes_box)
+        graph_layout.addWidget(self.btn_generate)
+        graph_layout.addWidget(self.btn_open_graph)
+        graph_layout.addWidget(self.btn_sample)
+        graph_layout.addWidget(QLabel("Source:"))
+        graph_layout.addWidget(self.source_box)
+        graph_layout.addWidget(QLabel("View:"))
+        graph_layout.addWidget(self.view_box)
+        return graph_layout
+
+    def open_graph(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Graph", "", "CSR graphs (*.csr)")
+        if path:
+            try:
+                self.show_big_graph(load_graph(path))
+            except ValueError as e:
+                self.metrics_label.setText(f"Cannot load graph: {e}")
+
+    def show_big_graph(self, graph):
+        """Switches to a CSRGraph; runs on it are headless, results drawn at once."""
+        self.reset_graph()
+        self.big_graph = graph
+        self.last_result = None
+        self.source_box.setRange(0, graph.V - 1)
+        self.graph_view.draw_arrays(*draw_arrays(graph), large=True)
+        self.metrics_label.setText(f"{graph.V} nodes, {graph.E} arcs loaded.")
+
+    def show_sample_graph(self):
+        self.reset_graph()
+        self.big_graph = None
+        self.last_result = None
+        self.source_box.setRange(0, 0)
+        self.graph_view.draw_graph(SAMPLE_GRAPH)
+
+    def handle_result(self, result):
+        self.last_result = result
+        self.metrics_label.setText(result.metrics)
+        if result.negative_cycle:
+            self.metrics_label.setText(result.metrics + "\nNegative cycle reachable!")
+        self.show_result()
+
+    def show_result(self):
+        result = self.last_result
+        if result is None:
+            return
+        self.graph_view.reset_nodes()
+        self.graph_view.show_heatmap(result.dist)
+        if self.view_box.currentText() == "Shortest-path tree":
+            self.graph_view.show_tree(result.pred)
+
+    def toggle_playback(self):
+        player = self.runner.player
+        if player.is_playing():
+            player.pause()
+            self.btn_play.setText("Play")
+        elif player.trace is not None:
+            player.play()
+            self.btn_play.setText("Pause")
+
+    def handle_position_update(self, position, frame_count):
+        self.seek_slider.setRange(0, frame_count)
+        if not self.seek_slider.isSliderDown():
+            self.seek_slider.setValue(position)
+        self.frame_label.setText(f"{position} / {frame_count}")
+        self.btn_play.setText("Pause" if self.runner.player.is_playing() else "Play")
+
+    def save_trace(self):
+        if self.runner.trace is None:
+            self.metrics_label.setText("Nothing to save yet.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "trace.npz", "Traces (*.npz)")
+        if path:
+            self.runner.save_trace(path)
+
+    def load_trace(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load Trace", "", "Traces (*.npz)")
+        if path:
+            self.reset_graph()
+            self.runner.load_trace(path)
+
     def handle_state_update(self, node_id, state):
-        if node_id in self.graph_view.node_items:
-            self.graph_view.node_items[node_id].set_state(state)
-            self.graph_view.scene().update()
+        # Items repaint only their own area; no full scene update per event
+        self.graph_view.set_node_state(node_id, state)
 
     def handle_dist_update(self, node_id, new_dist):
-        if node_id in self.graph_view.node_items:
-            self.graph_view.node_items[node_id].update_distance(new_dist)
-            self.graph_view.scene().update()
+        self.graph_view.set_node_distance(node_id, new_dist)
 
     def handle_metrics_update(self, metrics_text):
         self.metrics_label.setText(metrics_text)
 
     def reset_graph(self):
-        for node_item in self.graph_view.node_items.values():
-            node_item.set_state("default")
-            node_item.update_distance("∞")  # Reset text
+        self.runner.player.pause()
+        self.runner.player.invalidate()
+        self.graph_view.reset_nodes()
         self.metrics_label.setText("Graph Reset.")
         perf_monitor.reset()
-        self.graph_view.scene().update()
+
+    def handle_run_finished(self):
+        for button in self.run_buttons():
+            button.setEnabled(True)
+
+    def run_buttons(self):
+        """Buttons that must wait while an algorithm runs."""
+        return [self.btn_dijkstra, self.btn_bellman, self.btn_reset,
+                self.btn_generate, self.btn_open_graph, self.btn_sample]
 
     def run_algorithm(self, algo_type):
         self.reset_graph()
         self.metrics_label.setText(f"Running {algo_type.upper()}...")
-        self.btn_dijkstra.setEnabled(False)
-        self.btn_bellman.setEnabled(False)
-        self.btn_reset.setEnabled(False)
+        for button in self.run_buttons():
+            button.setEnabled(False)
 
-        def start_task():
-            if algo_type == "dijkstra":
-                self.runner.run_dijkstra(SAMPLE_GRAPH, "A")
-            elif algo_type == "bellman":
-                self.runner.run_bellman_ford(SAMPLE_GRAPH, "A")
+        if self.big_graph is not None:
+            # Large graphs run the optimized code headlessly: no animation
+            self.last_result = None
+            self.runner.run_headless(algo_type, self.big_graph, self.source_box.value())
+            return
 
-            self.btn_dijkstra.setEnabled(True)
-            self.btn_bellman.setEnabled(True)
-            self.btn_reset.setEnabled(True)
+        # The runner works on its own thread and returns immediately
+        self.runner.animate = not self.chk_no_anim.isChecked()
+        self.runner.set_speed(self.speed_box.currentData())
+        if algo_type == "dijkstra":
+            self.runner.run_dijkstra(SAMPLE_GRAPH, "A")
+        elif algo_type == "bellman":
+            self.runner.run_bellman_ford(SAMPLE_GRAPH, "A")
 
-        QTimer.singleShot(100, start_task)
+    def closeEvent(self, event):
+        # Don't leave a worker thread running behind a closed window
+        self.runner.stop()
+        self.graph_view.stop_layouts()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+import heapq
+import os
+import sys
+import numpy as np
+from time import perf_counter
+from csr_graph import asCSR, graphFingerprint
+from dijkstra import dijkstra, dijkstraPath, reconstructPath
+from instrument import OperationCounter, phase, record
+from results import compactDtype, toArray, unreachable
+
+INF = sys.maxsize  # Same unreachable sentinel as dijkstra()
+
+# ---------------------------------------------------------
+# A* SEARCH
+# ---------------------------------------------------------
+
+def astar(V, edges, src, target, heuristic, counter=None):
+    """
+    Point-to-point A*: Dijkstra ordered by dist + heuristic(v).
+    heuristic(v) must never overestimate the distance from v to target
+    (and should be consistent, like ALT's); returning INF prunes v.
+    Returns (distance, path); (sys.maxsize, []) if target is unreachable.
+    counter: optional OperationCounter (relaxations, heap pushes/pops).
+    """
+    with phase(counter, "build"):
+        graph = asCSR(V, edges)
+        offsets, targets, weights = graph.buffers()
+
+    dist = {src: 0}
+    pred = {}
+    h = {src: heuristic(src)}  # Memo: each node's bound is computed once
+    pq = [(h[src], src)] if h[src] != INF else []
+    pushes, pops, relaxations = 1, 0, 0
+    search_start = perf_counter()
+
+    def finish(d, path):
+        if counter is not None:
+            counter.add_time("search", perf_counter() - search_start)
+            record(counter, relaxations=relaxations, heap_pushes=pushes, heap_pops=pops)
+        return d, path
+
+    while pq:
+        f, u = heapq.heappop(pq)
+        pops += 1
+        d = dist[u]
+        # OPTIMIZATION: Stale entry check, as in dijkstra (keys are d + h)
+        if f > d + h[u]:
+            continue
+        if u == target:
+            return finish(d, reconstructPath(pred, src, target))
+
+        start, end = offsets[u], offsets[u + 1]
+        relaxations += end - start
+        for v, weight in zip(targets[start:end], weights[start:end]):
+            nd = d + weight
+            if nd < dist.get(v, INF):
+                hv = h.get(v)
+                if hv is None:
+                    hv = h[v] = heuristic(v)
+                if hv == INF:
+                    continue  # Provably cannot reach target
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(pq, (nd + hv, v))
+                pushes += 1
+
+    return finish(INF, [])
+
+# ---------------------------------------------------------
+# LANDMARK TABLES (ALT)
+# ---------------------------------------------------------
+
+def _pack(rows):
+    """(k, V) distance rows -> compact (V, k) table, sys.maxsize -> dtype max."""
+    table = np.asarray(rows, dtype=np.int64).T
+    return np.ascontiguousarray(toArray(table, compactDtype(table)))
+
+
+class LandmarkTable:
+    """
+    Distances between every node and a few landmarks, for ALT lower bounds:
+        d(v, t) >= d(L, t) - d(L, v)   and   d(v, t) >= d(v, L) - d(t, L)
+    to_nodes[v, i] = d(L_i, v); from_nodes[v, i] = d(v, L_i) (the same
+    array on undirected graphs). Tables are (V, k) so one node's k values
+    are contiguous, int32 when they fit, with the dtype's max meaning
+    unreachable. k tables cost k x 4 bytes per node.
+    """
+
+    def __init__(self, landmarks, to_nodes, from_nodes, fingerprint):
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.to_nodes = to_nodes
+        self.from_nodes = from_nodes
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, V, edges, k=16, seed=0, counter=None):
+        """
+        Farthest-point landmark selection: start from the node farthest from
+        a random one, then repeatedly add the node farthest from every
+        landmark so far. Each landmark's dijkstra() run is also its table row.
+        """
+        graph = asCSR(V, edges)
+        k = max(1, min(k, graph.V))
+        rng = np.random.default_rng(seed)
+
+        with phase(counter, "landmarks"):
+            start = np.asarray(dijkstra(graph.V, graph, int(rng.integers(graph.V))), dtype=np.int64)
+            nearest = np.full(graph.V, INF, dtype=np.int64)  # Distance to the closest landmark
+            candidate = start
+            landmarks, rows = [], []
+            for _ in range(k):
+                # Farthest reachable non-landmark (unreached nodes score -1)
+                reached = candidate != INF
+                score = np.where(reached, candidate, -1)
+                score[landmarks] = -2
+                landmark = int(np.argmax(score))
+                row = np.asarray(dijkstra(graph.V, graph, landmark), dtype=np.int64)
+                landmarks.append(landmark)
+                rows.append(row)
+                np.minimum(nearest, row, out=nearest)
+                candidate = nearest
+
+            to_nodes = _pack(rows)
+            if graph.directed:
+                reverse = graph.reverse()
+                from_nodes = _pack([dijkstra(graph.V, reverse, landmark) for landmark in landmarks])
+            else:
+                from_nodes = to_nodes
+        return cls(landmarks, to_nodes, from_nodes, graphFingerprint(graph))
+
+    @property
+    def k(self):
+        return len(self.landmarks)
+
+    @property
+    def nbytes(self):
+        extra = 0 if self.from_nodes is self.to_nodes else self.from_nodes.nbytes
+        return self.to_nodes.nbytes + extra
+
+    def heuristic(self, target):
+        """
+        h(v) lower bound on d(v, target), for astar(). Unreachable table
+        entries give no bound, except where they prove v cannot reach target.
+        """
+        k = self.k
+        to_flat = memoryview(self.to_nodes.reshape(-1))
+        from_flat = memoryview(self.from_nodes.reshape(-1))
+        missing = int(unreachable(self.to_nodes.dtype))
+        to_t = [to_flat[target * k + i] for i in range(k)]
+        from_t = [from_flat[target * k + i] for i in range(k)]
+        lanes = range(k)
+
+        def h(v):
+            base = v * k
+            best = 0
+            for i in lanes:
+                lv, lt = to_flat[base + i], to_t[i]
+                if lt != missing:
+                    if lv != missing and lt - lv > best:
+                        best = lt - lv
+                elif lv != missing:
+                    return INF  # L reaches v but not target: neither can v
+                vl, tl = from_flat[base + i], from_t[i]
+                if vl != missing:
+                    if tl != missing and vl - tl > best:
+                        best = vl - tl
+                elif tl != missing:
+                    return INF  # target reaches L but v cannot: v never reaches target
+            return best
+
+        return h
+
+    # --- Persistence ---
+    def save(self, path):
+        """Writes the tables (uncompressed .npz) next to the graph."""
+        arrays = {"landmarks": self.landmarks, "to_nodes": self.to_nodes,
+                  "fingerprint": np.array(self.fingerprint)}
+        if self.from_nodes is not self.to_nodes:
+            arrays["from_nodes"] = self.from_nodes
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Reads tables written by save(). With graph, raises ValueError if
+        they were built for a different graph.
+        """
+        with np.load(path) as data:
+            to_nodes = data["to_nodes"]
+            from_nodes = data["from_nodes"] if "from_nodes" in data.files else to_nodes
+            table = cls(data["landmarks"], to_nodes, from_nodes, str(data["fingerprint"]))
+        if graph is not None and table.fingerprint != graphFingerprint(graph):
+            raise ValueError(f"Landmark table {path} was built for a different graph")
+        return table
+
+
+def landmarkPath(graph_path):
+    """Where the tables of a .csr file live: big.csr -> big.csr.alt.npz"""
+    return f"{graph_path}.alt.npz"
+
+
+def loadOrBuild(graph_path, graph, k=16, seed=0, counter=None):
+    """Loads the landmark tables saved beside graph_path, (re)building them if missing or stale."""
+    path = landmarkPath(graph_path)
+    try:
+        return LandmarkTable.load(path, graph)
+    except (OSError, ValueError, KeyError):
+        table = LandmarkTable.build(graph.V, graph, k, seed, counter)
+        table.save(path)
+        return table
+
+
+def altPath(V, edges, src, target, table, counter=None):
+    """
+    Goal-directed point-to-point query: astar() with the landmark bounds.
+    Same result as dijkstraPath(), settling far fewer nodes.
+    """
+    return astar(V, edges, src, target, table.heuristic(target), counter)
+
+
+def pruningReport(V, edges, table, pairs):
+    """
+    Runs each (src, target) pair with dijkstraPath() and altPath() and
+    compares the work. pruning_ratio = ALT heap pops / Dijkstra heap pops.
+    """
+    graph = asCSR(V, edges)
+    plain, goal = OperationCounter(), OperationCounter()
+    for src, target in pairs:
+        expected = dijkstraPath(graph.V, graph, src, target, counter=plain)[0]
+        if altPath(graph.V, graph, src, target, table, counter=goal)[0] != expected:
+            raise AssertionError(f"ALT distance differs from Dijkstra for {src} -> {target}")
+    return {
+        "queries": len(pairs),
+        "dijkstra_pops": plain.heap_pops,
+        "alt_pops": goal.heap_pops,
+        "pruning_ratio": goal.heap_pops / max(plain.heap_pops, 1),
+        "dijkstra_s": plain.phases.get("search", 0.0),
+        "alt_s": goal.phases.get("search", 0.0),
+    }
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import random
+    import tempfile
+    from graph_io import saveGraph
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("A* with ALT landmark bounds vs. plain Dijkstra.", default_nodes=100000,
+                          families=["random", "grid", "power-law", "dense", "dag"], profile=False)
+    parser.add_argument("--landmarks", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=200, help="random point-to-point pairs")
+    args = parser.parse_args()
+
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    graph, _ = loadCSR(args)
+    v = graph.V
+    graph_path = args.graph or os.path.join(tempfile.gettempdir(), f"alt_demo_{args.family}_{v}_{args.seed}.csr")
+    if not args.graph:
+        saveGraph(graph_path, graph)
+
+    start = perf_counter()
+    table = LandmarkTable.build(graph.V, graph, k=args.landmarks, seed=args.seed)
+    table.save(landmarkPath(graph_path))
+    print(f"{table.k} landmarks: {perf_counter() - start:.2f}s, {table.nbytes / 1e6:.1f} MB "
+          f"({table.to_nodes.dtype}) -> {landmarkPath(graph_path)}")
+
+    start = perf_counter()
+    table = loadOrBuild(graph_path, graph, k=args.landmarks, seed=args.seed)
+    print(f"Reloaded in {perf_counter() - start:.3f}s")
+
+    rng = random.Random(args.seed)
+    pairs = [(rng.randrange(v), rng.randrange(v)) for _ in range(args.queries)]
+    report = pruningReport(graph.V, graph, table, pairs)
+    print(f"{report['queries']} queries: Dijkstra {report['dijkstra_pops']} pops in {report['dijkstra_s']:.3f}s, "
+          f"ALT {report['alt_pops']} pops in {report['alt_s']:.3f}s")
+    print(f"Pruning ratio: {report['pruning_ratio']:.3f} "
+          f"(ALT searches {1 / max(report['pruning_ratio'], 1e-9):.1f}x fewer nodes)")
@@ -1,82 +1,304 @@
 import sys
+import numpy as np
+from collections import deque
 from time import time
-from graph_generator import createGraph 
+from csr_graph import asCSR
+from instrument import phase, record
+from dijkstra import packOutput
 
-def bellmanFord(V, edges, src):
+def bellmanFord(V, edges, src, engine="python", counter=None, dtype=None, predecessors=False):
+    """
+    Bellman-Ford with early termination.
+    Input: Raw edge list (treated as directed) or a prebuilt CSRGraph.
+    engine: "python" relaxes one edge at a time, "numpy" relaxes every edge
+    of a pass at once as array operations, "spfa" only rescans nodes whose
+    distance changed (use spfa() directly to get the offending cycle).
+    counter: optional OperationCounter (build/search times, relaxations).
+    Returns the distance list, or [-1] if a negative cycle is reachable.
+    dtype / predecessors: return NumPy arrays like dijkstra() does (same
+    unreachable sentinel, see dijkstra.packOutput()), or None for a
+    negative cycle. The numpy engine then never builds the list at all.
+    """
+    # Normalize edge types and compute the true maximum node index in one
+    # vectorized CSR build (V grows if edges fall outside the declared V).
+    # A prebuilt CSRGraph skips this step entirely.
+    with phase(counter, "build"):
+        graph = asCSR(V, edges, directed=True)
+
+    if dtype is not None or predecessors:
+        if engine == "numpy":
+            with phase(counter, "search"):
+                dist = _bellmanFordArray(graph, src, counter)
+        else:
+            dist = bellmanFord(graph.V, graph, src, engine, counter)
+            if dist == [-1]:
+                dist = None
+        if dist is None:
+            return None
+        with phase(counter, "output"):
+            return packOutput(graph, dist, src, dtype, predecessors)
+
+    if engine == "numpy":
+        with phase(counter, "search"):
+            dist = _bellmanFordArray(graph, src, counter)
+        if dist is None:
+            return [-1]
+        # Boxing V ints into a list is its own stage at scale
+        with phase(counter, "output"):
+            return toDistanceList(dist, np.iinfo(np.int64).max)
+    if engine == "spfa":
+        with phase(counter, "search"):
+            dist, cycle = spfa(graph.V, graph, src, counter)
+        return [-1] if cycle else dist
+    if engine != "python":
+        raise ValueError(f"Unknown Bellman-Ford engine: {engine}")
+
+    with phase(counter, "search"):
+        return _bellmanFordPython(graph, src, counter)
+
+
+def _bellmanFordPython(graph, src, counter):
+    """The one-edge-at-a-time engine of bellmanFord()."""
     inf = float('inf')
 
-    # Normalize edge types to python ints and compute the true maximum node index.
-    normalized_edges = []
-    max_node = -1
-    for item in edges:
-        u, v, w = item
-        ui, vi, wi = int(u), int(v), int(w)
-        normalized_edges.append((ui, vi, wi))
-        if ui > max_node:
-            max_node = ui
-        if vi > max_node:
-            max_node = vi
-
-    # If edges contain nodes outside the declared V, expand V to accommodate them.
-    V = max(V, max_node + 1)
+    offsets, targets, weights = graph.buffers()
+    V = graph.V
 
     dist = [inf] * V
     dist[int(src)] = 0
+    relaxations = 0
+
+    def finish(result):
+        record(counter, relaxations=relaxations)
+        return result
 
     # Optimization: Early Termination
     for i in range(V - 1):
         changes = False
-        for u, v, w in normalized_edges:
-            if dist[u] != inf and dist[u] + w < dist[v]:
-                dist[v] = dist[u] + w
-                changes = True
+        for u in range(V):
+            du = dist[u]
+            # OPTIMIZATION: arcs grouped by source, so unreachable nodes
+            # skip their whole arc slice at once.
+            if du == inf:
+                continue
+            start, end = offsets[u], offsets[u + 1]
+            relaxations += end - start
+            for v, w in zip(targets[start:end], weights[start:end]):
+                if du + w < dist[v]:
+                    dist[v] = du + w
+                    changes = True
 
         # If no changes in a full pass, stop.
         if not changes:
-            return dist
+            return finish(dist)
 
     # Negative cycle check
-    for u, v, w in normalized_edges:
-        if dist[u] != inf and dist[u] + w < dist[v]:
-            return [-1]
+    for u in range(V):
+        du = dist[u]
+        if du == inf:
+            continue
+        start, end = offsets[u], offsets[u + 1]
+        relaxations += end - start
+        for v, w in zip(targets[start:end], weights[start:end]):
+            if du + w < dist[v]:
+                return finish([-1])
+
+    return finish(dist)
+
+def bellmanFordNumpy(graph, src, counter=None):
+    """
+    Vectorized Bellman-Ford over a CSRGraph.
+    Each pass gathers dist[u] + w for every arc, then takes the minimum per
+    target node. Same early termination and [-1] negative-cycle result as
+    the Python engine.
+    """
+    dist = _bellmanFordArray(graph, src, counter)
+    if dist is None:
+        return [-1]
+    return toDistanceList(dist, np.iinfo(np.int64).max)
+
+
+def _bellmanFordArray(graph, src, counter):
+    """bellmanFordNumpy() core: int64 distances (sys.maxsize = unreachable) or None on a negative cycle."""
+    V = graph.V
+    INF = np.iinfo(np.int64).max
+
+    # Arcs grouped by their target node: the reversed graph's CSR layout.
+    # Each target's incoming arcs form one contiguous segment for reduceat.
+    incoming = graph.reverse()
+    preds = incoming.targets
+    weights = incoming.weights.astype(np.int64)
+    has_incoming = np.diff(incoming.offsets) > 0
+    heads = np.flatnonzero(has_incoming)
+    segment_starts = incoming.offsets[:-1][has_incoming]
+
+    dist = np.full(V, INF, dtype=np.int64)
+    dist[int(src)] = 0
+    passes = 0
+
+    def finish(result):
+        # Every pass relaxes all arcs at once
+        record(counter, relaxations=passes * graph.E)
+        return result
+
+    if len(heads) == 0:
+        return finish(dist)
+
+    def relax(dist):
+        # Gather dist[u] + w; unreachable sources stay at INF (no overflow)
+        du = dist[preds]
+        cand = np.where(du == INF, INF, du + weights)
+        # Scatter-min: best incoming candidate per target node
+        best = np.minimum.reduceat(cand, segment_starts)
+        return np.minimum(dist[heads], best)
+
+    # Optimization: Early Termination
+    for i in range(V - 1):
+        new_heads = relax(dist)
+        passes += 1
+        # If no changes in a full pass, stop.
+        if np.array_equal(new_heads, dist[heads]):
+            return finish(dist)
+        dist[heads] = new_heads
+
+    # Negative cycle check: one more pass must not improve anything
+    passes += 1
+    if not np.array_equal(relax(dist), dist[heads]):
+        return finish(None)
+
+    return finish(dist)
 
-    return dist
+
+def spfa(V, edges, src, counter=None):
+    """
+    Queue-based Bellman-Ford (Shortest Path Faster Algorithm).
+    Only nodes whose distance changed are put back in the queue, so sparse
+    graphs converge in far fewer relaxations than full passes.
+    Returns (dist, cycle). cycle is None, or the nodes of a reachable negative
+    cycle in edge order (the last node links back to the first).
+    counter: optional OperationCounter (relaxations).
+    """
+    graph = asCSR(V, edges, directed=True)
+    offsets, targets, weights = graph.buffers()
+    V = graph.V
+    inf = float('inf')
+
+    dist = [inf] * V
+    pred = [-1] * V
+    # hops[v] = edges on the path that produced dist[v]. A simple path has
+    # at most V - 1 edges, so reaching V means the path loops on a cycle.
+    hops = [0] * V
+    in_queue = [False] * V
+
+    src = int(src)
+    dist[src] = 0
+    queue = deque([src])
+    in_queue[src] = True
+    relaxations = 0
+
+    def finish(cycle):
+        record(counter, relaxations=relaxations)
+        return dist, cycle
+
+    while queue:
+        u = queue.popleft()
+        in_queue[u] = False
+        du = dist[u]
+
+        start, end = offsets[u], offsets[u + 1]
+        relaxations += end - start
+        for v, w in zip(targets[start:end], weights[start:end]):
+            if du + w < dist[v]:
+                dist[v] = du + w
+                pred[v] = u
+                hops[v] = hops[u] + 1
+
+                # Negative cycle check (relaxation-count style)
+                if hops[v] >= V:
+                    cycle = extractCycle(pred, v, V)
+                    if cycle:
+                        return finish(cycle)
+
+                if not in_queue[v]:
+                    in_queue[v] = True
+                    queue.append(v)
+
+    return finish(None)
+
+
+def extractCycle(pred, v, V):
+    """
+    Follows predecessor links from v. After V steps the walk must be inside
+    a cycle of the predecessor graph (always a negative one), which is then
+    traced once. Returns the cycle in edge order, or None if the walk ends.
+    """
+    for _ in range(V):
+        v = pred[v]
+        if v == -1:
+            return None
+
+    cycle = [v]
+    u = pred[v]
+    while u != v:
+        if u == -1:
+            return None
+        cycle.append(u)
+        u = pred[u]
+
+    cycle.reverse()
+    return cycle
+
+
+def toDistanceList(dist, sentinel):
+    """Converts an int64 distance array to the list format (inf = unreachable)."""
+    result = dist.tolist()
+    inf = float('inf')
+    for node in np.flatnonzero(dist == sentinel).tolist():
+        result[node] = inf
+    return result
 
 if __name__ == '__main__':
-    src = 0
-    
-    # 1. USE A SMALLER NUMBER FOR THE REAL TEST
-    # Bellman-Ford is slow. 2,000 is a good stress test. 
-    # 500,000 will hang your machine forever.
-    try:
-        val = input("Enter nodes (Recommended: 2000): ")
-        v = int(val)
-    except ValueError:
-        v = 2000
-
-    print(f"Generating raw graph for {v} nodes...")
-    raw_edges = createGraph(v)
+    from profiling import driverParser, loadInput, profileRun, timeRepeats
+
+    # The Python engine is slow. 2,000 is a good stress test.
+    # 500,000 will hang your machine forever, so use the numpy engine there.
+    parser = driverParser("Run Bellman-Ford on a generated or saved (.csr) graph.",
+                          engines=["python", "numpy", "spfa"], default_nodes=2000, default_engine="python")
+    args = parser.parse_args()
+    src = args.src
+
+    if args.profile:
+        # Raw edges get the same undirected CSR build as below, timed as "build"
+        def profiled(V, edges, counter):
+            with phase(counter, "build"):
+                graph = asCSR(V, edges)
+            return bellmanFord(V, graph, src, engine=args.engine, counter=counter, dtype=args.dtype)
+        profileRun(args, profiled, "Bellman-Ford")
+        sys.exit(0)
+
+    print(f"Loading {args.graph}..." if args.graph else f"Generating raw {args.family} graph for {args.nodes} nodes...")
+    v, raw_edges, generate_s = loadInput(args)
 
     # 2. CRITICAL FIX: MAKE IT UNDIRECTED
     # We must double the edges (u->v AND v->u) to match Dijkstra's environment
-    # and ensure we can actually leave node 0. Normalize to ints while doing so.
+    # and ensure we can actually leave node 0. The undirected CSR build does
+    # exactly that, normalizing to ints once instead of on every call.
     print("Converting to Undirected graph...")
-    undirected_edges = []
-    for item in raw_edges:
-        u, w_v, w = item
-        u, w_v, w = int(u), int(w_v), int(w)
-        undirected_edges.append([u, w_v, w])
-        undirected_edges.append([w_v, u, w]) # Add the reverse path
-    
-    print(f"Total Edges to process: {len(undirected_edges)}")
-
-    print(f"Running Bellman-Ford...")
-    start = time()  
-    ans = bellmanFord(v, undirected_edges, src)
-    end = time()
+    build_start = time()
+    graph = asCSR(v, raw_edges)
+    build_s = time() - build_start
+
+    print(f"Total Edges to process: {graph.E} ({graph})")
+
+    print(f"Running Bellman-Ford ({args.engine} engine, {args.repeats} repeats)...")
+    ans = bellmanFord(v, graph, src, engine=args.engine, dtype=args.dtype)
+    median_s, min_s = timeRepeats(
+        lambda: bellmanFord(v, graph, src, engine=args.engine, dtype=args.dtype), args.repeats)
 
     print("-" * 30)
-    print(f"Algorithm Finished.")
-    print(f"Time Taken: {end-start:.4f} seconds")
+    print("Algorithm Finished.")
+    print(f"Graph: {generate_s:.4f}s to {'load' if args.graph else 'generate'}, {build_s:.4f}s to build")
+    print(f"Time Taken: {median_s:.4f} seconds (median, min {min_s:.4f}s)")
     print("-" * 30)
-    print(f"Sample output: {ans[:5]}")
\ No newline at end of file
+    negative = ans is None or (isinstance(ans, list) and ans == [-1])
+    print("Sample output: negative cycle" if negative else f"Sample output: {ans[:5]}")
@@ -0,0 +1,406 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tracemalloc
+import numpy as np
+from time import perf_counter
+from graph_generator import FAMILIES, createFamily
+from csr_graph import CSRGraph
+from dijkstra import dijkstra, dijkstraBatch, dijkstraMany, dijkstraPath
+from bellman_ford import bellmanFord
+from contraction import buildHierarchy
+from parallel import breakEven, parallelDijkstraMany
+from instrument import OperationCounter
+
+# ---------------------------------------------------------
+# BENCHMARKED ALGORITHMS
+# ---------------------------------------------------------
+# Each entry: name -> (run(graph, src, counter), max nodes it is sane to run at)
+ALGORITHMS = {
+    "dijkstra": (lambda g, s, c: dijkstra(g.V, g, s, counter=c), None),
+    "dijkstra-dial": (lambda g, s, c: dijkstra(g.V, g, s, counter=c, engine="dial"), None),
+    "bellman-python": (lambda g, s, c: bellmanFord(g.V, g, s, counter=c), 20_000),
+    "bellman-numpy": (lambda g, s, c: bellmanFord(g.V, g, s, engine="numpy", counter=c), None),
+    "bellman-spfa": (lambda g, s, c: bellmanFord(g.V, g, s, engine="spfa", counter=c), None),
+}
+# Only these are correct on graph families with negative weights
+NEGATIVE_SAFE = {"bellman-python", "bellman-numpy", "bellman-spfa"}
+
+FIELDS = [
+    "algorithm", "family", "nodes", "density", "seed", "edges", "arcs", "graph_mb",
+    "generate_s", "build_s", "search_s", "search_min_s", "peak_mb", "relaxations",
+    "heap_pushes", "heap_pops", "stale_pops", "peak_heap",
+]
+
+
+def timeSearch(run, graph, src, repeats):
+    """
+    Median/min wall time over `repeats` uninstrumented runs, plus the
+    counters of one extra instrumented run (so counting never skews timing).
+    """
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        run(graph, src, None)
+        times.append(perf_counter() - start)
+
+    with OperationCounter() as counter:
+        run(graph, src, counter)
+    return statistics.median(times), min(times), counter
+
+
+def peakMemory(run, graph, src):
+    """
+    Peak traced allocation (MB) of one search, measured in a separate run
+    because tracemalloc itself slows the search down.
+    """
+    tracemalloc.start()
+    try:
+        run(graph, src, None)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def runSweep(nodes, densities, algorithms, seed=0, repeats=3, src=0, log=print, families=("random",)):
+    """
+    Runs every algorithm on every (family, node count, density) graph.
+    Graph generation and CSR build are timed separately from the search.
+    Returns a list of result rows (dicts with FIELDS keys).
+    """
+    rows = []
+    for family in families:
+        _, directed, negative = FAMILIES[family]
+        for n, density in itertools.product(nodes, densities):
+            # Same seed -> same graph on every run, so results are diffable
+            start = perf_counter()
+            edges = createFamily(family, n, seed=seed, density=density)
+            generated = perf_counter()
+            graph = CSRGraph.fromEdges(n, edges, directed=directed)
+            built = perf_counter()
+
+            for name in algorithms:
+                run, max_nodes = ALGORITHMS[name]
+                if negative and name not in NEGATIVE_SAFE:
+                    log(f"  skip {name} on {family} (negative weights)")
+                    continue
+                if max_nodes is not None and n > max_nodes:
+                    log(f"  skip {name} at {n} nodes (limit {max_nodes})")
+                    continue
+
+                search_s, search_min_s, counter = timeSearch(run, graph, src, repeats)
+                row = {
+                    "algorithm": name,
+                    "family": family,
+                    "nodes": n,
+                    "density": density,
+                    "seed": seed,
+                    "edges": len(edges),
+                    "arcs": graph.E,
+                    "graph_mb": round(graph.nbytes / 1e6, 3),
+                    "generate_s": round(generated - start, 6),
+                    "build_s": round(built - generated, 6),
+                    "search_s": round(search_s, 6),
+                    "search_min_s": round(search_min_s, 6),
+                    "peak_mb": round(peakMemory(run, graph, src), 3),
+                    "relaxations": counter.relaxations,
+                    "heap_pushes": counter.heap_pushes,
+                    "heap_pops": counter.heap_pops,
+                    "stale_pops": counter.stale_pops,
+                    "peak_heap": counter.peak_heap,
+                }
+                rows.append(row)
+                log(f"  {name:<15} {family:<9} n={n:<8} d={density:<4} search {search_s:.4f}s "
+                    f"relax {counter.relaxations} peak {row['peak_mb']:.1f} MB")
+    return rows
+
+
+HIERARCHY_FIELDS = [
+    "family", "nodes", "density", "seed", "arcs", "graph_mb", "preprocess_s", "hierarchy_mb",
+    "shortcuts", "core", "queries", "dijkstra_ms", "hierarchy_ms", "speedup",
+]
+
+
+def runHierarchySweep(nodes, densities, seed=0, queries=100, log=print, families=("random",)):
+    """
+    Contraction-hierarchy preprocessing cost and point-to-point query speed
+    against dijkstraPath(), on the same graphs as runSweep().
+    Returns a list of result rows (dicts with HIERARCHY_FIELDS keys).
+    """
+    rows = []
+    for family in families:
+        if FAMILIES[family][2]:
+            log(f"  skip hierarchy on {family} (negative weights)")
+            continue
+        for n, density in itertools.product(nodes, densities):
+            graph = createFamily(family, n, seed=seed, density=density, csr=True)
+            rng = np.random.default_rng(seed)
+            pairs = rng.integers(0, n, size=(queries, 2)).tolist()
+
+            start = perf_counter()
+            hierarchy = buildHierarchy(graph.V, graph)
+            preprocess_s = perf_counter() - start
+
+            start = perf_counter()
+            expected = [dijkstraPath(graph.V, graph, s, t)[0] for s, t in pairs]
+            plain_s = perf_counter() - start
+            start = perf_counter()
+            got = [hierarchy.distance(s, t) for s, t in pairs]
+            hierarchy_s = perf_counter() - start
+            if got != expected:
+                raise AssertionError(f"Hierarchy distances differ from Dijkstra on {family} n={n} d={density}")
+
+            row = {
+                "family": family,
+                "nodes": n,
+                "density": density,
+                "seed": seed,
+                "arcs": graph.E,
+                "graph_mb": round(graph.nbytes / 1e6, 3),
+                "preprocess_s": round(preprocess_s, 3),
+                "hierarchy_mb": round(hierarchy.nbytes / 1e6, 3),
+                "shortcuts": hierarchy.shortcuts,
+                "core": hierarchy.core,
+                "queries": queries,
+                "dijkstra_ms": round(plain_s / queries * 1000, 4),
+                "hierarchy_ms": round(hierarchy_s / queries * 1000, 4),
+                "speedup": round(plain_s / hierarchy_s, 2),
+            }
+            rows.append(row)
+            slower = ", SLOWER than dijkstraPath" if row["speedup"] < 1 else ""
+            log(f"  hierarchy {family:<9} n={n:<8} d={density:<4} preprocess {preprocess_s:.2f}s "
+                f"{row['hierarchy_mb']:.1f} MB, core {hierarchy.core}, query {row['hierarchy_ms']:.3f} ms "
+                f"vs {row['dijkstra_ms']:.3f} ms ({row['speedup']}x{slower})")
+    return rows
+
+
+BATCH_FIELDS = [
+    "family", "nodes", "density", "seed", "arcs", "mode", "sources",
+    "batch_qps", "single_qps", "speedup",
+]
+
+
+def nearbySources(graph, target, limit):
+    """Up to `limit` nodes within two hops of target (short queries to it)."""
+    ring = set(graph.neighbors(target)[0].tolist())
+    for u in list(ring):
+        ring.update(graph.neighbors(u)[0].tolist())
+    ring.discard(target)
+    return sorted(ring)[:limit]
+
+
+def runBatchSweep(nodes, densities, sources=20, seed=0, repeats=3, log=print, families=("random",)):
+    """
+    Queries/sec of dijkstraBatch() against one dijkstra() call per source,
+    in two modes: "full" rows from spread-out sources, and "nearby" sources
+    two hops from one target (early exit, so per-query setup dominates and
+    the batch's reused scratch buffers pay off). Best of `repeats` runs.
+    Returns a list of result rows (dicts with BATCH_FIELDS keys).
+    """
+    rows = []
+    for family in families:
+        if FAMILIES[family][2]:
+            log(f"  skip batch on {family} (negative weights)")
+            continue
+        for n, density in itertools.product(nodes, densities):
+            graph = createFamily(family, n, seed=seed, density=density, csr=True)
+            spread = list(range(0, n, max(1, n // sources)))[:sources]
+            modes = {
+                "full": (spread, None),
+                "nearby": (nearbySources(graph, 0, sources * 10), [0]),
+            }
+            for mode, (batch, targets) in modes.items():
+                target = None if targets is None else targets[0]
+                timings = {"batch": [], "single": []}
+                for _ in range(repeats):
+                    start = perf_counter()
+                    for _ in dijkstraBatch(graph.V, graph, batch, targets):
+                        pass
+                    timings["batch"].append(perf_counter() - start)
+                    start = perf_counter()
+                    for src in batch:
+                        dijkstra(graph.V, graph, src, target=target, dtype=np.int64)
+                    timings["single"].append(perf_counter() - start)
+
+                batch_s, single_s = min(timings["batch"]), min(timings["single"])
+                row = {
+                    "family": family,
+                    "nodes": n,
+                    "density": density,
+                    "seed": seed,
+                    "arcs": graph.E,
+                    "mode": mode,
+                    "sources": len(batch),
+                    "batch_qps": round(len(batch) / batch_s, 1),
+                    "single_qps": round(len(batch) / single_s, 1),
+                    "speedup": round(single_s / batch_s, 2),
+                }
+                rows.append(row)
+                log(f"  batch {family:<9} n={n:<8} d={density:<4} {mode:<6} {len(batch)} sources: "
+                    f"{row['batch_qps']} q/s vs {row['single_qps']} q/s single ({row['speedup']}x)")
+    return rows
+
+
+PARALLEL_FIELDS = [
+    "family", "nodes", "density", "seed", "arcs", "sources", "workers", "cpus",
+    "serial_s", "pool_s", "speedup", "overhead_s", "break_even_sources",
+]
+
+
+def runParallelSweep(nodes, densities, sources=64, workers=(2, 4), seed=0, log=print, families=("random",)):
+    """
+    Process-pool many-source Dijkstra against the serial dijkstraMany() on
+    the same sources, with the pool overhead and break-even source count
+    from parallel.breakEven(). Returns a list of result rows (dicts with
+    PARALLEL_FIELDS keys).
+    """
+    rows = []
+    for family in families:
+        if FAMILIES[family][2]:
+            log(f"  skip parallel on {family} (negative weights)")
+            continue
+        for n, density in itertools.product(nodes, densities):
+            graph = createFamily(family, n, seed=seed, density=density, csr=True)
+            batch = list(range(0, n, max(1, n // sources)))[:sources]
+
+            start = perf_counter()
+            serial = dijkstraMany(graph.V, graph, batch)
+            serial_s = perf_counter() - start
+
+            for count in workers:
+                start = perf_counter()
+                matrix = parallelDijkstraMany(graph.V, graph, batch, workers=count)
+                pool_s = perf_counter() - start
+                if not np.array_equal(matrix, serial):
+                    raise AssertionError(f"Pool rows differ from dijkstraMany on {family} n={n} d={density}")
+
+                overhead, even = breakEven(serial_s, pool_s, len(batch), count)
+                row = {
+                    "family": family,
+                    "nodes": n,
+                    "density": density,
+                    "seed": seed,
+                    "arcs": graph.E,
+                    "sources": len(batch),
+                    "workers": count,
+                    "cpus": os.cpu_count(),
+                    "serial_s": round(serial_s, 4),
+                    "pool_s": round(pool_s, 4),
+                    "speedup": round(serial_s / pool_s, 2),
+                    "overhead_s": round(overhead, 4),
+                    "break_even_sources": even,
+                }
+                rows.append(row)
+                even = "never" if even is None else f"{even} sources"
+                log(f"  parallel {family:<9} n={n:<8} d={density:<4} {count} workers: {pool_s:.3f}s "
+                    f"vs serial {serial_s:.3f}s ({row['speedup']}x), overhead {overhead:.3f}s, "
+                    f"break-even {even}")
+    return rows
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def writeJSON(path, rows, **meta):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), **meta, "results": rows}, f, indent=2, sort_keys=True)
+
+
+def writeCSV(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def compareRuns(baseline_rows, rows, tolerance):
+    """
+    Matches rows by (algorithm, family, nodes, density, seed) and returns
+    the ones whose median search time grew by more than `tolerance` (0.2 = +20%).
+    Baselines from before graph families count as the "random" family.
+    """
+    key = lambda r: (r["algorithm"], r.get("family", "random"), r["nodes"], r["density"], r["seed"])
+    baseline = {key(r): r for r in baseline_rows}
+    regressions = []
+    for row in rows:
+        old = baseline.get(key(row))
+        if old is None or old["search_s"] <= 0:
+            continue
+        ratio = row["search_s"] / old["search_s"]
+        if ratio > 1 + tolerance:
+            regressions.append((row, old, ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shortest-path algorithms across graph sizes.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--density", type=float, nargs="+", default=[1.0],
+                        help="density passed to the graph generator (extra-edge factor for random)")
+    parser.add_argument("--family", nargs="+", default=["random"], choices=list(FAMILIES),
+                        help="graph families to sweep (see graph_generator.FAMILIES)")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write results as JSON")
+    parser.add_argument("--csv", help="write results as CSV")
+    parser.add_argument("--compare", help="baseline JSON; exit 1 on search-time regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown vs. --compare baseline (0.2 = 20%%)")
+    parser.add_argument("--hierarchy", type=int, metavar="QUERIES", default=0,
+                        help="also time contraction-hierarchy preprocessing and this many queries")
+    parser.add_argument("--batch", type=int, metavar="SOURCES", default=0,
+                        help="also compare dijkstraBatch against single dijkstra() calls on this many sources")
+    parser.add_argument("--parallel", type=int, metavar="SOURCES", default=0,
+                        help="also time parallelDijkstraMany against serial on this many sources")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4],
+                        help="pool sizes for --parallel")
+    args = parser.parse_args()
+
+    print(f"Benchmarking {', '.join(args.algorithms)} on {', '.join(args.family)} graphs "
+          f"(seed {args.seed}, {args.repeats} repeats)")
+    rows = runSweep(args.nodes, args.density, args.algorithms, args.seed, args.repeats, families=args.family)
+    hierarchy_rows = []
+    if args.hierarchy:
+        print(f"Contraction hierarchies ({args.hierarchy} point-to-point queries)")
+        hierarchy_rows = runHierarchySweep(args.nodes, args.density, args.seed, args.hierarchy, families=args.family)
+
+    batch_rows = []
+    if args.batch:
+        print(f"Batched vs. single-source Dijkstra ({args.batch} sources)")
+        batch_rows = runBatchSweep(args.nodes, args.density, args.batch, args.seed, args.repeats, families=args.family)
+
+    parallel_rows = []
+    if args.parallel:
+        print(f"Process pool ({args.parallel} sources, {os.cpu_count()} CPUs)")
+        parallel_rows = runParallelSweep(args.nodes, args.density, args.parallel, args.workers, args.seed,
+                                         families=args.family)
+
+    if args.json:
+        writeJSON(args.json, rows, hierarchy=hierarchy_rows, batch=batch_rows, parallel=parallel_rows)
+        print(f"Wrote {args.json}")
+    if args.csv:
+        writeCSV(args.csv, rows)
+        print(f"Wrote {args.csv}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline_rows = json.load(f)["results"]
+        regressions = compareRuns(baseline_rows, rows, args.tolerance)
+        for row, old, ratio in regressions:
+            print(f"REGRESSION {row['algorithm']} {row.get('family', 'random')} n={row['nodes']} d={row['density']}: "
+                  f"{old['search_s']:.4f}s -> {row['search_s']:.4f}s ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
@@ -0,0 +1,159 @@
+import asyncio
+import itertools
+import json
+import random
+import statistics
+from time import perf_counter
+from server import DEFAULT_PORT
+
+# ---------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------
+
+class QueryClient:
+    """
+    Async client for QueryServer. Requests are pipelined on one connection:
+    many can be in flight at once, and replies are matched back by id.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_PORT, unix=None):
+        if unix is not None:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, **fields):
+        """Sends one request and waits for its reply (a dict)."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(json.dumps(dict(fields, id=request_id)).encode() + b"\n")
+        await self._writer.drain()
+        reply = await future
+        if "error" in reply:
+            raise ValueError(reply["error"])
+        return reply
+
+    async def distance(self, src, target):
+        """Shortest distance, or None if target is unreachable."""
+        return (await self.request(op="distance", src=src, target=target))["distance"]
+
+    async def path(self, src, target):
+        """(distance, path); (None, []) if target is unreachable."""
+        reply = await self.request(op="path", src=src, target=target)
+        return reply["distance"], reply["path"]
+
+    async def stats(self):
+        return await self.request(op="stats")
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._listener.cancel()
+
+    async def _listen(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._waiting.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Server closed the connection"))
+
+# ---------------------------------------------------------
+# LOAD GENERATOR
+# ---------------------------------------------------------
+
+def percentile(values, q):
+    """q-th percentile (0-100) of a non-empty list, nearest rank."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def runLoad(nodes, requests=2000, concurrency=64, sources=50, path_ratio=0.1,
+                  seed=0, host="127.0.0.1", port=DEFAULT_PORT, unix=None):
+    """
+    Closed-loop load: `concurrency` simulated users each send a query,
+    wait for the reply, and send the next, until `requests` are done.
+    Sources come from a pool of `sources` nodes (repeat sources are what
+    batching and caching exploit); targets are uniform.
+    Returns a dict of latency percentiles (ms) and throughput (queries/s).
+    """
+    rng = random.Random(seed)
+    pool = [rng.randrange(nodes) for _ in range(sources)]
+    queries = [
+        ("path" if rng.random() < path_ratio else "distance", rng.choice(pool), rng.randrange(nodes))
+        for _ in range(requests)
+    ]
+    latencies = []
+    client = await QueryClient.connect(host, port, unix)
+    next_query = iter(queries)
+
+    async def user():
+        for op, src, target in next_query:
+            start = perf_counter()
+            await client.request(op=op, src=src, target=target)
+            latencies.append(perf_counter() - start)
+
+    before = await client.stats()
+    start = perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    after = await client.stats()
+    await client.close()
+    batches = after["batches"] - before["batches"]
+
+    ms = [t * 1000 for t in latencies]
+    return {
+        "requests": len(ms),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "mean_batch": round((after["queries"] - before["queries"]) / max(batches, 1), 1),
+    }
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test a running QueryServer.")
+    parser.add_argument("--nodes", type=int, required=True, help="node count of the served graph")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--sources", type=int, default=50, help="distinct query sources")
+    parser.add_argument("--path-ratio", type=float, default=0.1, help="share of path queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="connect to this Unix socket path instead of TCP")
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        result = asyncio.run(runLoad(
+            args.nodes, args.requests, concurrency, args.sources, args.path_ratio,
+            args.seed, args.host, args.port, args.unix,
+        ))
+        print(f"concurrency {concurrency:>4}: {result['throughput_qps']:>8.1f} q/s  "
+              f"p50 {result['p50_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms  "
+              f"mean batch {result['mean_batch']}")
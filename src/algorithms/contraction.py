@@ -0,0 +1,495 @@
+import heapq
+import sys
+import numpy as np
+from time import perf_counter
+from csr_graph import asCSR, graphFingerprint, nodeDtype
+from instrument import phase, record
+
+INF = sys.maxsize  # Same unreachable sentinel as dijkstra()
+
+# Witness searches give up after settling this many nodes; a missed
+# witness only costs an unneeded shortcut, never a wrong answer
+WITNESS_LIMIT = 60
+ESTIMATE_LIMIT = 20
+
+# Nodes with more arcs than this are not contracted.
+# Random graphs (like createGraph's) end in a dense core where every
+# further contraction adds O(degree^2) shortcuts; queries search the core
+# with plain bidirectional Dijkstra instead.
+CORE_DEGREE = 32
+
+# Witness-search relaxations allowed per arc of the input graph. Once they
+# are spent, the nodes left become the core, so preprocessing stays linear
+# in the graph size. Grids need about 300-400 per arc; random and
+# power-law graphs thousands, growing with n.
+WITNESS_BUDGET = 500
+
+# ---------------------------------------------------------
+# PREPROCESSING
+# ---------------------------------------------------------
+
+class _Work:
+    """Witness-search relaxations spent so far, against an optional cap."""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.spent = 0
+
+    @property
+    def exhausted(self):
+        return self.cap is not None and self.spent > self.cap
+
+
+def _witness(out, src, skip, targets, max_dist, limit, work):
+    """
+    Local Dijkstra from src avoiding `skip`, up to max_dist or `limit`
+    settled nodes, stopping early once every node in `targets` is settled.
+    Relaxations are added to work.spent.
+    """
+    dist = {src: 0}
+    pq = [(0, src)]
+    settled = 0
+    remaining = set(targets)
+    while pq and settled < limit:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if d > max_dist:
+            break
+        # OPTIMIZATION: Every candidate's distance is final
+        remaining.discard(u)
+        if not remaining:
+            break
+        settled += 1
+        work.spent += len(out[u])
+        for v, w in out[u].items():
+            nd = d + w
+            # OPTIMIZATION: Paths longer than the longest candidate can't be witnesses
+            if nd <= max_dist and v != skip and nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def _shortcuts(out, inc, v, directed, limit, work):
+    """
+    Arcs u -> x (weight, through v) that must be added when v is removed:
+    those where no path avoiding v is as short.
+    """
+    needed = []
+    outgoing = out[v]
+    for u, wu in inc[v].items():
+        candidates = {x: wu + wx for x, wx in outgoing.items() if x != u and (directed or u < x)}
+        if not candidates:
+            continue
+        dist = _witness(out, u, v, candidates, max(candidates.values()), limit, work)
+        for x, d in candidates.items():
+            if dist.get(x, INF) > d:
+                needed.append((u, x, d))
+    return needed
+
+
+def _priority(out, inc, v, directed, deleted, core_degree, work):
+    """
+    Edge difference (shortcuts added - arcs removed) plus contracted
+    neighbours; INF for nodes too dense to contract (left in the core).
+    """
+    removed = len(out[v]) + (len(inc[v]) if directed else 0)
+    if core_degree is not None and removed > core_degree:
+        return INF
+    added = len(_shortcuts(out, inc, v, directed, ESTIMATE_LIMIT, work))
+    if not directed:
+        added *= 2  # Each undirected shortcut is two arcs
+    return 2 * (added - removed) + deleted[v]
+
+
+def buildHierarchy(V, edges, core_degree=CORE_DEGREE, witness_budget=WITNESS_BUDGET, counter=None):
+    """
+    Contraction hierarchy of a static graph.
+    Nodes are contracted one by one in order of importance (lazy edge-
+    difference priority); removing node v adds a shortcut u -> x of weight
+    w(u, v) + w(v, x) wherever no other path is as short. Each node keeps
+    only its arcs to higher-ranked nodes, which is all a query needs.
+    Nodes with more than core_degree arcs wait; once only such nodes are
+    left, or witness searches have used witness_budget relaxations per
+    input arc, the rest form the core (None disables either limit).
+    Input: Raw edge list (undirected) or a prebuilt CSRGraph.
+    counter: optional OperationCounter ("order" and "contract" phases).
+    """
+    with phase(counter, "build"):
+        graph = asCSR(V, edges)
+        V, directed = graph.V, graph.directed
+        offsets, targets, weights = graph.buffers()
+
+        # Mutable adjacency of the remaining graph, parallel arcs merged
+        out = [{} for _ in range(V)]
+        inc = [{} for _ in range(V)] if directed else out
+        for u in range(V):
+            for i in range(offsets[u], offsets[u + 1]):
+                v, w = targets[i], weights[i]
+                if v != u and w < out[u].get(v, INF):
+                    out[u][v] = w
+                    inc[v][u] = w
+
+    rank = np.empty(V, dtype=np.int64)
+    middle = {}  # (u, x) -> contracted node a shortcut bypasses
+    up_out = [None] * V  # Arcs to higher-ranked nodes: {x: w}
+    up_in = [None] * V   # Arcs from higher-ranked nodes: {u: w}
+    deleted = [0] * V
+    rank_set = [False] * V
+    shortcuts = 0
+    work = _Work(None if witness_budget is None else witness_budget * max(graph.E, 1))
+
+    # 1. Initial order by simulated contraction
+    with phase(counter, "order"):
+        pq = [(_priority(out, inc, v, directed, deleted, core_degree, work), v) for v in range(V)]
+        heapq.heapify(pq)
+
+    # 2. Contract, re-checking each node's priority when it reaches the top
+    # and refreshing its neighbours' after it is removed
+    with phase(counter, "contract"):
+        priority = [p for p, _ in sorted(pq, key=lambda item: item[1])]
+        level = 0
+        while pq:
+            p, v = heapq.heappop(pq)
+            if rank_set[v] or p != priority[v]:
+                continue  # Contracted, or a stale heap entry
+            if work.exhausted:
+                break  # Out of witness budget: the rest is the core
+            current = _priority(out, inc, v, directed, deleted, core_degree, work)
+            if pq and current > pq[0][0]:
+                priority[v] = current
+                heapq.heappush(pq, (current, v))
+                continue
+            if current == INF:
+                break  # Everything left is too dense: the core
+
+            for u, x, w in _shortcuts(out, inc, v, directed, WITNESS_LIMIT, work):
+                if w < out[u].get(x, INF):
+                    if x not in out[u]:
+                        shortcuts += 1
+                    out[u][x] = w
+                    inc[x][u] = w
+                    middle[(u, x)] = v
+                    if not directed:
+                        middle[(x, u)] = v
+
+            rank[v] = level
+            level += 1
+            up_out[v] = out[v]
+            up_in[v] = inc[v]
+            for x in out[v]:
+                del inc[x][v]
+                deleted[x] += 1
+            if directed:
+                for u in inc[v]:
+                    del out[u][v]
+                    deleted[u] += 1
+            out[v] = {}
+            if directed:
+                inc[v] = {}
+            rank_set[v] = True
+
+            for x in set(up_out[v]) | set(up_in[v]):
+                priority[x] = _priority(out, inc, x, directed, deleted, core_degree, work)
+                heapq.heappush(pq, (priority[x], x))
+
+        # 3. The core keeps every remaining arc, in both directions
+        core_rank = level
+        for v in range(V):
+            if not rank_set[v]:
+                rank[v] = level
+                level += 1
+                up_out[v] = out[v]
+                up_in[v] = inc[v]
+
+    return ContractionHierarchy.fromArcs(V, directed, rank, core_rank, up_out, up_in, middle,
+                                         shortcuts, graphFingerprint(graph))
+
+# ---------------------------------------------------------
+# QUERY STRUCTURE
+# ---------------------------------------------------------
+
+def _packArcs(V, arcs, middle, flip):
+    """[{x: w}, ...] per node -> CSR arrays (offsets, nodes, weights, middles)."""
+    counts = np.fromiter((len(a) for a in arcs), dtype=np.int64, count=V)
+    offsets = np.zeros(V + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    nodes = np.empty(offsets[-1], dtype=nodeDtype(V))
+    weights = np.empty(offsets[-1], dtype=np.int64)
+    middles = np.full(offsets[-1], -1, dtype=nodeDtype(V))
+    i = 0
+    for v, adj in enumerate(arcs):
+        for x, w in adj.items():
+            nodes[i], weights[i] = x, w
+            m = middle.get((x, v) if flip else (v, x))
+            if m is not None:
+                middles[i] = m
+            i += 1
+    return offsets, nodes, weights, middles
+
+
+class ContractionHierarchy:
+    """
+    Upward graphs of a contraction hierarchy, as two CSR structures:
+      up:   for each v, arcs v -> x with rank[x] > rank[v]
+      down: for each v, arcs u -> v with rank[u] > rank[v] (stored at v)
+    Core nodes (rank >= core_rank) also keep their arcs to each other in
+    both structures. middle[i] is the node a shortcut arc bypasses (-1 for
+    original arcs), used to unpack paths. On undirected graphs down is the
+    same as up.
+    """
+
+    FIELDS = ("rank", "up_offsets", "up_nodes", "up_weights", "up_middle",
+              "down_offsets", "down_nodes", "down_weights", "down_middle")
+
+    def __init__(self, directed, core_rank, shortcuts, fingerprint, **arrays):
+        self.directed = directed
+        self.core_rank = core_rank
+        self.shortcuts = shortcuts
+        self.fingerprint = fingerprint
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+        self.V = len(self.rank)
+        self._buffers = None
+
+    @classmethod
+    def fromArcs(cls, V, directed, rank, core_rank, up_out, up_in, middle, shortcuts, fingerprint):
+        up = _packArcs(V, up_out, middle, flip=False)
+        down = _packArcs(V, up_in, middle, flip=True) if directed else up
+        names = ("offsets", "nodes", "weights", "middle")
+        arrays = {f"up_{n}": a for n, a in zip(names, up)}
+        arrays.update({f"down_{n}": a for n, a in zip(names, down)})
+        return cls(directed, core_rank, shortcuts, fingerprint, rank=rank, **arrays)
+
+    @property
+    def core(self):
+        """Nodes left uncontracted."""
+        return self.V - self.core_rank
+
+    @property
+    def arcs(self):
+        return len(self.up_nodes) + (len(self.down_nodes) if self.directed else 0)
+
+    @property
+    def nbytes(self):
+        arrays = {id(getattr(self, name)): getattr(self, name) for name in self.FIELDS}
+        return sum(a.nbytes for a in arrays.values())
+
+    def __repr__(self):
+        kind = "directed" if self.directed else "undirected"
+        return (f"ContractionHierarchy(V={self.V}, arcs={self.arcs}, {self.shortcuts} shortcuts, "
+                f"core {self.core}, {kind}, {self.nbytes / 1e6:.1f} MB)")
+
+    def buffers(self):
+        """memoryviews of both upward graphs (fast element access, like CSRGraph)."""
+        if self._buffers is None:
+            self._buffers = tuple(memoryview(getattr(self, name)) for name in self.FIELDS[1:])
+        return self._buffers
+
+    # --- Queries ---
+    def query(self, src, target, counter=None):
+        """
+        Two phases. First a bidirectional upward search: forward from src over
+        `up`, backward from target over `down`, each only climbing in rank,
+        with nodes reached more cheaply from above stalled (not expanded).
+        Core nodes they reach are labelled but not expanded. Then plain
+        bidirectional Dijkstra inside the core, started from those labels.
+        The best meeting node gives the distance. Returns (distance, meeting
+        node, forward preds, backward preds); sys.maxsize if unreachable.
+        """
+        (up_off, up_nodes, up_w, _, down_off, down_nodes, down_w, _) = self.buffers()
+        rank, core_rank = memoryview(self.rank), self.core_rank
+        dist = ({src: 0}, {target: 0})
+        pred = ({src: -1}, {target: -1})
+        queues = ([(0, src)], [(0, target)])
+        entries = ([], [])  # Core nodes settled by each upward search
+        # Forward climbs `up` and is stalled via `down`; backward the reverse
+        sides = ((up_off, up_nodes, up_w, down_off, down_nodes, down_w),
+                 (down_off, down_nodes, down_w, up_off, up_nodes, up_w))
+        best, meet = (0, src) if src == target else (INF, -1)
+        pops = relaxations = 0
+
+        # 1. Upward searches below the core. Each side's keys are only upward
+        # distances, so a side may stop only once its own key reaches best
+        while queues[0] or queues[1]:
+            tops = [q[0][0] if q else INF for q in queues]
+            side = 0 if tops[0] <= tops[1] else 1
+            if tops[side] >= best:
+                break
+            d, u = heapq.heappop(queues[side])
+            pops += 1
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[u]:
+                continue
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            if rank[u] >= core_rank:
+                entries[side].append((d, u))  # Expanded in phase 2
+                continue
+
+            off, nodes, w, stall_off, stall_nodes, stall_w = sides[side]
+            # Stall-on-demand: a higher node already reaches u more cheaply
+            stalled = False
+            for i in range(stall_off[u], stall_off[u + 1]):
+                x = stall_nodes[i]
+                if x in mine and mine[x] + stall_w[i] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+
+            relaxations += off[u + 1] - off[u]
+            for i in range(off[u], off[u + 1]):
+                x = nodes[i]
+                nd = d + w[i]
+                if nd < mine.get(x, INF):
+                    mine[x] = nd
+                    pred[side][x] = u
+                    heapq.heappush(queues[side], (nd, x))
+
+        # 2. Bidirectional Dijkstra over the core arcs, from the entry labels.
+        # Both searches now run on the same graph, so the usual rule holds:
+        # OPTIMIZATION: stop once the two frontier keys together reach best,
+        # not each of them (on random graphs most nodes are core)
+        queues = entries
+        for queue in queues:
+            heapq.heapify(queue)
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            d, u = heapq.heappop(queues[side])
+            pops += 1
+            mine, other = dist[side], dist[1 - side]
+            if d > mine[u]:
+                continue
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+
+            off, nodes, w = sides[side][:3]
+            relaxations += off[u + 1] - off[u]
+            for i in range(off[u], off[u + 1]):
+                x = nodes[i]
+                nd = d + w[i]
+                if nd < mine.get(x, INF):
+                    mine[x] = nd
+                    pred[side][x] = u
+                    heapq.heappush(queues[side], (nd, x))
+                    if x in other and nd + other[x] < best:
+                        best, meet = nd + other[x], x
+
+        record(counter, relaxations=relaxations, heap_pops=pops, queries=1)
+        return best, meet, pred[0], pred[1]
+
+    def distance(self, src, target, counter=None):
+        """Shortest distance, sys.maxsize if target is unreachable."""
+        return self.query(src, target, counter)[0]
+
+    def path(self, src, target, counter=None):
+        """(distance, path) like dijkstraPath(), with shortcuts unpacked."""
+        best, meet, forward, backward = self.query(src, target, counter)
+        if best == INF:
+            return INF, []
+        # Climb: src ... meet (forward preds), then meet ... target (backward)
+        up_chain = [meet]
+        while forward[up_chain[-1]] != -1:
+            up_chain.append(forward[up_chain[-1]])
+        up_chain.reverse()
+        down_chain = [meet]
+        while backward[down_chain[-1]] != -1:
+            down_chain.append(backward[down_chain[-1]])
+        chain = up_chain + down_chain[1:]
+
+        path = [src]
+        for u, x in zip(chain, chain[1:]):
+            self._unpack(u, x, path)
+        return best, path
+
+    def _arcMiddle(self, u, x):
+        """Middle node of the hierarchy arc u -> x (-1 for an original arc)."""
+        rank_u, rank_x = self.rank[u], self.rank[x]
+        if rank_x > rank_u or min(rank_u, rank_x) >= self.core_rank:
+            offsets, nodes, middles, node, other = self.up_offsets, self.up_nodes, self.up_middle, u, x
+        else:
+            offsets, nodes, middles, node, other = self.down_offsets, self.down_nodes, self.down_middle, x, u
+        start, end = offsets[node], offsets[node + 1]
+        i = start + int(np.flatnonzero(nodes[start:end] == other)[0])
+        return int(middles[i])
+
+    def _unpack(self, u, x, path):
+        """Appends the original nodes of arc u -> x (after u) to path."""
+        stack = [(u, x)]
+        while stack:
+            a, b = stack.pop()
+            m = self._arcMiddle(a, b)
+            if m < 0:
+                path.append(int(b))
+            else:
+                stack.append((m, b))  # Second half, expanded after the first
+                stack.append((a, m))
+
+    # --- Persistence ---
+    def save(self, path):
+        """Writes the hierarchy as an uncompressed .npz (e.g. big.csr.ch.npz)."""
+        with open(path, "wb") as f:
+            np.savez(f, directed=self.directed, core_rank=self.core_rank, shortcuts=self.shortcuts,
+                     fingerprint=np.array(self.fingerprint),
+                     **{name: getattr(self, name) for name in self.FIELDS})
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Reads a saved hierarchy. With graph, raises ValueError if it was
+        built for a different graph.
+        """
+        with np.load(path) as data:
+            hierarchy = cls(bool(data["directed"]), int(data["core_rank"]), int(data["shortcuts"]),
+                            str(data["fingerprint"]),
+                            **{name: data[name] for name in cls.FIELDS})
+        if graph is not None and hierarchy.fingerprint != graphFingerprint(graph):
+            raise ValueError(f"Hierarchy {path} was built for a different graph")
+        return hierarchy
+
+
+def hierarchyPath(graph_path):
+    """Where the hierarchy of a .csr file lives: big.csr -> big.csr.ch.npz"""
+    return f"{graph_path}.ch.npz"
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import random
+    from dijkstra import dijkstraPath
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("Contraction hierarchy preprocessing and queries vs. dijkstraPath.",
+                          default_nodes=10000, default_family="grid",
+                          families=["random", "grid", "power-law", "dense", "dag"], profile=False)
+    parser.add_argument("--queries", type=int, default=200, help="random point-to-point pairs")
+    parser.add_argument("--witness-budget", type=int, default=WITNESS_BUDGET,
+                        help="witness relaxations per arc before the rest becomes the core (0: unlimited)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    graph, _ = loadCSR(args)
+    v = graph.V
+
+    start = perf_counter()
+    hierarchy = buildHierarchy(graph.V, graph, witness_budget=args.witness_budget or None)
+    print(f"Preprocessing: {perf_counter() - start:.2f}s -> {hierarchy}")
+
+    rng = random.Random(args.seed)
+    pairs = [(rng.randrange(v), rng.randrange(v)) for _ in range(args.queries)]
+    start = perf_counter()
+    expected = [dijkstraPath(graph.V, graph, s, t)[0] for s, t in pairs]
+    plain_s = perf_counter() - start
+    start = perf_counter()
+    got = [hierarchy.distance(s, t) for s, t in pairs]
+    ch_s = perf_counter() - start
+
+    same = "ok" if got == expected else "MISMATCH"
+    slower = ", SLOWER than dijkstraPath" if ch_s > plain_s else ""
+    print(f"{len(pairs)} queries: dijkstraPath {plain_s / len(pairs) * 1000:.2f} ms, "
+          f"hierarchy {ch_s / len(pairs) * 1000:.3f} ms ({plain_s / ch_s:.2f}x{slower}) {same}")
@@ -0,0 +1,174 @@
+import hashlib
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Compressed Sparse Row graph, built once and reused across many queries.
+
+    The arcs leaving node u live in targets[offsets[u]:offsets[u + 1]] with
+    matching weights. Undirected graphs store every edge in both directions.
+    """
+
+    def __init__(self, offsets, targets, weights, directed=False):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+        self.V = len(offsets) - 1
+        self.E = len(targets)  # Stored arcs (2x the edges when undirected)
+
+        # Lazily built, cached helpers
+        self._buffers = None
+        self._sources = None
+        self._reverse = None
+
+    @classmethod
+    def fromEdges(cls, V, edges, directed=False):
+        """
+        Builds the CSR arrays from a raw [[u, v, w], ...] list or (m, 3) array.
+        V grows automatically if the edges mention a larger node index.
+        Weights are stored as integers; raises ValueError on a non-integral
+        weight (e.g. 2.5) instead of truncating it.
+        """
+        arr = np.asarray(edges)
+        if arr.size == 0:
+            arr = arr.reshape(0, 3)
+        if arr.dtype.kind == "f":
+            whole = np.isfinite(arr) & (arr == np.trunc(arr))
+            if not whole[:, 2].all():
+                bad = arr[np.flatnonzero(~whole[:, 2])[0], 2]
+                raise ValueError(f"CSRGraph needs integer edge weights, got {bad}")
+            if not whole.all():
+                raise ValueError("CSRGraph needs integer node ids")
+        arr = arr.astype(np.int64, copy=False)
+
+        u, v, w = arr[:, 0], arr[:, 1], arr[:, 2]
+        if len(arr):
+            V = max(V, int(max(u.max(), v.max())) + 1)
+
+        if not directed:
+            # Each undirected edge becomes two arcs: u->v and v->u
+            u, v = np.concatenate((u, v)), np.concatenate((v, u))
+            w = np.concatenate((w, w))
+
+        return cls.fromArcs(V, u, v, w, directed=directed)
+
+    @classmethod
+    def fromArcs(cls, V, sources, targets, weights, directed=True):
+        """
+        Builds a CSR graph from parallel arc arrays (already expanded).
+        """
+        # Counting sort by source node. A stable sort keeps the input order
+        # of each node's arcs, so results match the list-based adjacency.
+        order = np.argsort(sources, kind="stable")
+        counts = np.bincount(sources, minlength=V)
+
+        offsets = np.zeros(V + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(
+            offsets,
+            np.ascontiguousarray(targets[order], dtype=nodeDtype(V)),
+            np.ascontiguousarray(weights[order], dtype=weightDtype(weights)),
+            directed=directed,
+        )
+
+    # ---------------------------------------------------------
+    # ACCESS
+    # ---------------------------------------------------------
+
+    def buffers(self):
+        """
+        Returns (offsets, targets, weights) as memoryviews.
+        Indexing a memoryview yields plain Python ints at close to list speed,
+        without copying the arrays into millions of boxed objects.
+        """
+        if self._buffers is None:
+            self._buffers = (
+                memoryview(self.offsets),
+                memoryview(self.targets),
+                memoryview(self.weights),
+            )
+        return self._buffers
+
+    def neighbors(self, u):
+        """Returns (targets, weights) array slices for node u."""
+        start, end = self.offsets[u], self.offsets[u + 1]
+        return self.targets[start:end], self.weights[start:end]
+
+    def arcSources(self):
+        """
+        The source node of every stored arc, aligned with targets/weights.
+        Cached, since vectorized edge relaxation needs it on every call.
+        """
+        if self._sources is None:
+            self._sources = np.repeat(
+                np.arange(self.V, dtype=self.targets.dtype), np.diff(self.offsets)
+            )
+        return self._sources
+
+    def reverse(self):
+        """
+        The graph with every arc flipped (cached), for backward searches.
+        An undirected graph is its own reverse.
+        """
+        if not self.directed:
+            return self
+        if self._reverse is None:
+            self._reverse = CSRGraph.fromArcs(
+                self.V, self.targets, self.arcSources(), self.weights, directed=True
+            )
+            self._reverse._reverse = self
+        return self._reverse
+
+    # ---------------------------------------------------------
+    # MEMORY REPORTING
+    # ---------------------------------------------------------
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes
+
+    @property
+    def bytesPerEdge(self):
+        return self.nbytes / self.E if self.E else 0.0
+
+    def __repr__(self):
+        kind = "directed" if self.directed else "undirected"
+        return (
+            f"CSRGraph(V={self.V}, arcs={self.E}, {kind}, "
+            f"{self.nbytes / 1e6:.1f} MB, {self.bytesPerEdge:.1f} B/arc)"
+        )
+
+
+def nodeDtype(V):
+    """Smallest integer dtype that can hold every node id."""
+    return np.int32 if V <= np.iinfo(np.int32).max else np.int64
+
+
+def weightDtype(weights):
+    """int32 weights when they fit, otherwise int64."""
+    info = np.iinfo(np.int32)
+    if len(weights) == 0 or (weights.min() >= info.min and weights.max() <= info.max):
+        return np.int32
+    return np.int64
+
+
+def asCSR(V, edges, directed=False):
+    """
+    Passes a prebuilt CSRGraph through untouched, or builds one from a raw
+    edge list. Lets every algorithm accept both input styles.
+    """
+    if isinstance(edges, CSRGraph):
+        return edges
+    return CSRGraph.fromEdges(V, edges, directed=directed)
+
+
+def graphFingerprint(graph):
+    """Short hash of a CSRGraph, so saved tables are never used on another graph."""
+    digest = hashlib.sha1()
+    for array in (graph.offsets, graph.targets, graph.weights):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(b"d" if graph.directed else b"u")
+    return digest.hexdigest()
@@ -0,0 +1,324 @@
+import heapq
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from csr_graph import CSRGraph
+from instrument import record
+
+INF = sys.maxsize  # Same unreachable sentinel as dijkstra()
+
+# ---------------------------------------------------------
+# MUTABLE GRAPH
+# ---------------------------------------------------------
+
+class DynamicGraph:
+    """
+    Graph that changes a few edges at a time.
+
+    Adjacency is kept as one {neighbor: weight} dict per node, in both
+    directions (out and in), so edits are O(1). Parallel edges are merged,
+    keeping the lightest. Attached trackers (IncrementalSSSP) are told about
+    every arc that changed; inside batch() they are told once, at the end.
+    """
+
+    def __init__(self, V=0, directed=False):
+        self.directed = directed
+        self.out = [{} for _ in range(V)]
+        self.inc = self.out if not directed else [{} for _ in range(V)]
+        self.E = 0        # Edges (not arcs) currently in the graph
+        self.version = 0  # Bumped on every edit
+        self._trackers = []
+        self._pending = None  # Arc changes collected by batch()
+
+    @classmethod
+    def fromEdges(cls, V, edges, directed=False):
+        """Builds from a raw [[u, v, w], ...] list, (m, 3) array or CSRGraph."""
+        if isinstance(edges, CSRGraph):
+            graph = cls(max(V, edges.V), edges.directed)
+            sources, targets, weights = edges.arcSources(), edges.targets, edges.weights
+            arcs = zip(sources.tolist(), targets.tolist(), weights.tolist())
+            if not edges.directed:
+                arcs = ((u, v, w) for u, v, w in arcs if u <= v)  # Stored twice
+        else:
+            graph = cls(V, directed)
+            arcs = ((int(u), int(v), int(w)) for u, v, w in edges)
+        for u, v, w in arcs:
+            old = graph.weight(u, v)
+            if old is None or w < old:
+                graph._setArcs(u, v, w)
+        graph.version = 0
+        return graph
+
+    @property
+    def V(self):
+        return len(self.out)
+
+    def weight(self, u, v):
+        """Weight of the u -> v edge, or None if there is none."""
+        if u >= self.V:
+            return None
+        return self.out[u].get(v)
+
+    def neighbors(self, u):
+        """{v: weight} of the arcs leaving u (do not modify)."""
+        return self.out[u]
+
+    # --- Edits ---
+    def setEdge(self, u, v, w):
+        """Inserts the u -> v edge, or changes its weight. Returns the old weight."""
+        if w < 0:
+            raise ValueError("DynamicGraph only supports non-negative weights")
+        old = self.weight(u, v)
+        if old == w:
+            return old
+        self._setArcs(u, v, w)
+        self._changed(u, v, old, w)
+        return old
+
+    def removeEdge(self, u, v):
+        """Deletes the u -> v edge. Returns its weight (None if absent)."""
+        old = self.weight(u, v)
+        if old is None:
+            return None
+        del self.out[u][v]
+        if self.directed:
+            del self.inc[v][u]
+        elif u != v:
+            del self.out[v][u]
+        self.E -= 1
+        self._changed(u, v, old, None)
+        return old
+
+    def applyEdits(self, edits):
+        """Applies [(u, v, w), ...] as one batch; w = None deletes the edge."""
+        with self.batch():
+            for u, v, w in edits:
+                if w is None:
+                    self.removeEdge(u, v)
+                else:
+                    self.setEdge(u, v, w)
+
+    @contextmanager
+    def batch(self):
+        """Groups edits: trackers repair once, after the last one."""
+        if self._pending is not None:
+            yield  # Already batching
+            return
+        self._pending = []
+        try:
+            yield
+        finally:
+            changes, self._pending = self._pending, None
+            if changes:
+                for tracker in self._trackers:
+                    tracker.repair(changes)
+
+    def toCSR(self):
+        """Snapshot as a CSRGraph, for the static algorithms."""
+        edges = [(u, v, w) for u in range(self.V) for v, w in self.out[u].items()
+                 if self.directed or u <= v]
+        return CSRGraph.fromEdges(self.V, edges or [], directed=self.directed)
+
+    # --- Internals ---
+    def attach(self, tracker):
+        self._trackers.append(tracker)
+
+    def detach(self, tracker):
+        self._trackers.remove(tracker)
+
+    def _grow(self, V):
+        while len(self.out) < V:
+            self.out.append({})
+            if self.directed:
+                self.inc.append({})
+
+    def _setArcs(self, u, v, w):
+        self._grow(max(u, v) + 1)
+        if v not in self.out[u]:
+            self.E += 1
+        self.out[u][v] = w
+        if self.directed:
+            self.inc[v][u] = w
+        else:
+            self.out[v][u] = w
+
+    def _changed(self, u, v, old, new):
+        self.version += 1
+        # Undirected edges are two arcs, and both may carry shortest paths
+        arcs = [(u, v, old, new)]
+        if not self.directed and u != v:
+            arcs.append((v, u, old, new))
+        if self._pending is not None:
+            self._pending.extend(arcs)
+        else:
+            for tracker in self._trackers:
+                tracker.repair(arcs)
+
+# ---------------------------------------------------------
+# INCREMENTAL SINGLE-SOURCE SHORTEST PATHS
+# ---------------------------------------------------------
+
+class IncrementalSSSP:
+    """
+    Distances and shortest-path tree from one source, kept up to date as
+    the DynamicGraph changes.
+
+    Only the affected part is repaired (Ramalingam-Reps style):
+    - a lighter or new arc starts a Dijkstra from its head, which stops as
+      soon as nothing improves;
+    - a heavier or deleted tree arc invalidates just the subtree below it,
+      which is reseeded from its unaffected in-neighbors and re-settled.
+    Non-tree arcs that get heavier cost nothing.
+    dist uses sys.maxsize for unreachable nodes and pred -1 for "no parent",
+    like dijkstra() and reconstructPath().
+    counter: optional OperationCounter, counts each repair's relaxations and
+    heap operations.
+    """
+
+    def __init__(self, graph, src, counter=None):
+        self.graph = graph
+        self.src = src
+        self.counter = counter
+        self.recompute()
+        graph.attach(self)
+
+    def close(self):
+        """Stops following the graph's edits."""
+        self.graph.detach(self)
+
+    def recompute(self):
+        """Full Dijkstra from scratch (what every repair avoids)."""
+        V = self.graph.V
+        self.dist = [INF] * V
+        self.pred = [-1] * V
+        self.children = [set() for _ in range(V)]
+        self.dist[self.src] = 0
+        self._propagate([(0, self.src)])
+
+    # --- Repair ---
+    def repair(self, arcs):
+        """Updates dist/pred after the (u, v, old, new) arc changes."""
+        self._grow(self.graph.V)
+        dist, pred = self.dist, self.pred
+
+        # 1. Tree arcs that got heavier or vanished: their subtrees are stale
+        affected = set()
+        for u, v, old, new in arcs:
+            if old is not None and (new is None or new > old) and pred[v] == u and v not in affected:
+                self._collectSubtree(v, affected)
+
+        for x in affected:
+            parent = pred[x]
+            if parent >= 0 and parent not in affected:
+                self.children[parent].discard(x)
+            self.children[x].clear()
+            dist[x] = INF
+            pred[x] = -1
+
+        # 2. Seeds: best entry into each stale node from outside, plus every
+        # arc that got lighter or appeared
+        heap = []
+        inc = self.graph.inc
+        for x in affected:
+            for y, w in inc[x].items():
+                if y not in affected and dist[y] != INF and dist[y] + w < dist[x]:
+                    dist[x] = dist[y] + w
+                    self._setPred(x, y)
+            if dist[x] != INF:
+                heap.append((dist[x], x))
+
+        for u, v, old, new in arcs:
+            if new is not None and (old is None or new < old):
+                # A batch may have changed the arc again since: use its weight now
+                w = self.graph.weight(u, v)
+                if w is not None and dist[u] != INF and dist[u] + w < dist[v]:
+                    dist[v] = dist[u] + w
+                    self._setPred(v, u)
+                    heap.append((dist[v], v))
+
+        # 3. Dijkstra over the affected region only
+        if heap:
+            heapq.heapify(heap)
+            self._propagate(heap)
+
+    def _propagate(self, heap):
+        dist, out = self.dist, self.graph.out
+        pushes, pops, relaxations = len(heap), 0, 0
+        while heap:
+            d, u = heapq.heappop(heap)
+            pops += 1
+            if d > dist[u]:
+                continue
+            relaxations += len(out[u])
+            for v, w in out[u].items():
+                if d + w < dist[v]:
+                    dist[v] = d + w
+                    self._setPred(v, u)
+                    heapq.heappush(heap, (dist[v], v))
+                    pushes += 1
+        record(self.counter, relaxations=relaxations, heap_pushes=pushes, heap_pops=pops)
+
+    def _setPred(self, v, u):
+        old = self.pred[v]
+        if old >= 0:
+            self.children[old].discard(v)
+        self.pred[v] = u
+        self.children[u].add(v)
+
+    def _collectSubtree(self, root, into):
+        stack = [root]
+        while stack:
+            x = stack.pop()
+            if x not in into:
+                into.add(x)
+                stack.extend(self.children[x])
+
+    def _grow(self, V):
+        while len(self.dist) < V:
+            self.dist.append(INF)
+            self.pred.append(-1)
+            self.children.append(set())
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import random
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("Incremental shortest paths under edge edits.", default_nodes=100000,
+                          families=["random", "grid", "power-law", "dense"], profile=False)
+    parser.add_argument("--edits", type=int, default=1000, help="single edits and batched deletions")
+    args = parser.parse_args()
+
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    csr, _ = loadCSR(args)
+    v = csr.V
+    graph = DynamicGraph.fromEdges(v, csr)
+
+    start = perf_counter()
+    sssp = IncrementalSSSP(graph, args.src)
+    full_s = perf_counter() - start
+    print(f"Initial full Dijkstra: {full_s:.4f}s")
+
+    rng = random.Random(args.seed)
+    edits = args.edits
+    start = perf_counter()
+    for _ in range(edits):
+        a, b = rng.randrange(v), rng.randrange(v)
+        if a != b:
+            graph.setEdge(a, b, rng.randint(1, 19))
+    single_s = (perf_counter() - start) / edits
+    print(f"Single edge edits: {single_s * 1e6:.1f} us each ({full_s / max(single_s, 1e-9):.0f}x faster than a rerun)")
+
+    # Delete existing edges, preferring shortest-path tree edges (the
+    # expensive case: their whole subtree must be repaired)
+    deletions = []
+    for _ in range(edits):
+        b = rng.randrange(v)
+        if sssp.pred[b] >= 0:
+            deletions.append((sssp.pred[b], b, None))
+    start = perf_counter()
+    graph.applyEdits(deletions)
+    batch_s = perf_counter() - start
+    print(f"Batch of {len(deletions)} tree-edge deletions: {batch_s:.4f}s")
@@ -1,50 +1,292 @@
 import numpy as np
+from csr_graph import CSRGraph, nodeDtype
 
-def createGraph(n: int) -> list:
+# Edges per block in streaming mode (~12 MB per block of int32 triples)
+CHUNK_EDGES = 1_000_000
+
+def createGraph(n: int, csr: bool = False, seed=None, density: float = 1.0):
     """
     Generates a raw list of edges using NumPy for maximum speed.
     Returns: List of lists [[u, v, weight], ...]
+    With csr=True, returns an undirected CSRGraph built straight from the
+    NumPy arrays, skipping the Python list entirely.
+    The same seed always produces the same graph (also in streaming mode).
+    density scales the extra random edges: between n*density/2 and n*density.
+    """
+    all_edges_np = randomGraph(n, seed=seed, density=density)
+
+    if csr:
+        return CSRGraph.fromEdges(n, all_edges_np)
+
+    # Convert numpy array back to python list of lists for your algorithm
+    # (Dijkstra expects standard python types)
+    return all_edges_np.tolist()
+
+
+def randomGraph(n: int, seed=None, density: float = 1.0):
+    """createGraph's graph as one (m, 3) NumPy array: random spanning tree plus extra edges."""
+    blocks = list(createGraphChunks(n, seed=seed, density=density))
+    if blocks:
+        return np.concatenate(blocks)
+    return np.empty((0, 3), dtype=nodeDtype(n))
+
+
+def _graphStreams(seed, count=6):
     """
-    
+    One independent RNG per random quantity. Each stream is consumed in
+    order, so the graph for a seed does not depend on the chunk size.
+    """
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [np.random.default_rng(child) for child in children]
+
+
+def _extraCount(rng, n, density):
+    top = int(n * density)
+    return int(rng.integers(top // 2, top)) if top > 0 else 0
+
+
+def countGraphEdges(n: int, seed, density: float = 1.0) -> int:
+    """Exact number of edges createGraphChunks(n, seed=seed) will yield."""
+    return (n - 1) + _extraCount(_graphStreams(seed)[0], n, density)
+
+
+def createGraphChunks(n: int, chunk_size: int = CHUNK_EDGES, seed=None, density: float = 1.0):
+    """
+    Streaming version of createGraph for graphs larger than RAM.
+    Yields (k, 3) NumPy blocks [[u, v, weight], ...] of at most chunk_size
+    edges, so no full edge set or Python list is ever materialized.
+    """
+    count_rng, target_rng, tree_w_rng, ex_u_rng, ex_v_rng, ex_w_rng = _graphStreams(seed)
+    dtype = nodeDtype(n)
+
     # -----------------------------------------
     # PART 1: The Spanning Tree (Guaranteed Connectivity)
     # -----------------------------------------
     # We need to connect nodes 1..N-1 to a random previous node.
-    
-    # Create source nodes [1, 2, ..., n-1]
-    sources = np.arange(1, n)
-    
-    # Vectorized trick to pick a target < source:
-    # Generate floats [0.0, 1.0), multiply by the source index, and floor it.
-    # E.g., for node 10, random 0.4 -> 4.0 -> connects to node 4.
-    targets = (np.random.random(n - 1) * sources).astype(int)
-    
-    # Random weights for these edges (1-19)
-    weights = np.random.randint(1, 20, size=n - 1)
-    
-    # Stack them into columns: [[1, 0, w], [2, 1, w]...]
-    spanning_edges = np.column_stack((sources, targets, weights))
+    for lo in range(1, n, chunk_size):
+        hi = min(n, lo + chunk_size)
+
+        # Create source nodes [lo, lo + 1, ..., hi - 1]
+        sources = np.arange(lo, hi, dtype=np.int64)
+
+        # Vectorized trick to pick a target < source:
+        # Generate floats [0.0, 1.0), multiply by the source index, and floor it.
+        # E.g., for node 10, random 0.4 -> 4.0 -> connects to node 4.
+        targets = (target_rng.random(hi - lo) * sources).astype(np.int64)
+
+        # Random weights for these edges (1-19)
+        weights = tree_w_rng.integers(1, 20, size=hi - lo, dtype=np.int64)
+
+        # Stack them into columns: [[1, 0, w], [2, 1, w]...]
+        yield np.column_stack((sources, targets, weights)).astype(dtype)
 
     # -----------------------------------------
     # PART 2: Extra Random Edges
     # -----------------------------------------
-    extra_count = np.random.randint(n // 2, n)
-    
-    # Generate all random sources, targets, and weights at once
-    ex_u = np.random.randint(0, n, size=extra_count)
-    ex_v = np.random.randint(0, n, size=extra_count)
-    ex_w = np.random.randint(1, 20, size=extra_count)
-    
-    # Filter out self-loops (where u == v) efficiently using boolean masking
-    mask = ex_u != ex_v
-    random_edges = np.column_stack((ex_u[mask], ex_v[mask], ex_w[mask]))
+    extra_count = _extraCount(count_rng, n, density)
 
-    # -----------------------------------------
-    # PART 3: Merge and Export
-    # -----------------------------------------
-    # Combine the mandatory edges with the random edges
-    all_edges_np = np.vstack((spanning_edges, random_edges))
-    
-    # Convert numpy array back to python list of lists for your algorithm
-    # (Dijkstra expects standard python types)
-    return all_edges_np.tolist()
\ No newline at end of file
+    for lo in range(0, extra_count, chunk_size):
+        k = min(chunk_size, extra_count - lo)
+
+        ex_u = ex_u_rng.integers(0, n, size=k, dtype=np.int64)
+        # No self-loops: shift by 1..n-1 around the ring instead of masking,
+        # which keeps the edge count exact (writers can preallocate).
+        ex_v = (ex_u + 1 + ex_v_rng.integers(0, n - 1, size=k, dtype=np.int64)) % n
+        ex_w = ex_w_rng.integers(1, 20, size=k, dtype=np.int64)
+
+        yield np.column_stack((ex_u, ex_v, ex_w)).astype(dtype)
+
+
+def writeGraphChunks(path, n: int, chunk_size: int = CHUNK_EDGES, seed=None, density: float = 1.0) -> int:
+    """
+    Streams a generated graph straight to a .npy file of shape (m, 3),
+    one block at a time. Returns m.
+    Load it back lazily with np.load(path, mmap_mode="r").
+    """
+    # Pin the seed so the edge count and the edges come from the same graph
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    m = countGraphEdges(n, seed, density)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=nodeDtype(n), shape=(m, 3))
+
+    pos = 0
+    for block in createGraphChunks(n, chunk_size, seed, density):
+        out[pos:pos + len(block)] = block
+        pos += len(block)
+
+    out.flush()
+    del out
+    return m
+
+# ---------------------------------------------------------
+# GRAPH FAMILIES
+# ---------------------------------------------------------
+# Seeded, vectorized generators for workloads unlike createGraph's random
+# graph. Each takes (n, seed, density) and returns one (m, 3) NumPy array
+# [[u, v, weight], ...] with weights 1-19 (except negativeGraph), so the
+# same seed always gives the same graph and Dial's engine stays usable.
+
+# Share of all n*(n-1)/2 node pairs denseGraph connects at density 1.0
+DENSE_FRACTION = 0.05
+# Degree distribution exponent of powerLawGraph: P(degree = k) ~ k^-2.5
+POWER_LAW_EXPONENT = 2.5
+# negativeGraph's node potentials are drawn from [0, POTENTIAL_RANGE)
+POTENTIAL_RANGE = 30
+
+
+def _treeEdges(n, target_rng, weight_rng, bias=1.0):
+    """
+    Random recursive tree: node i > 0 links to floor(i * r**bias), r uniform.
+    bias > 1 pulls links towards low ids (older nodes become hubs).
+    """
+    sources = np.arange(1, n, dtype=np.int64)
+    targets = (target_rng.random(n - 1) ** bias * sources).astype(np.int64)
+    weights = weight_rng.integers(1, 20, size=n - 1, dtype=np.int64)
+    return sources, targets, weights
+
+
+def _stack(n, u, v, w):
+    return np.column_stack((u, v, w)).astype(nodeDtype(n))
+
+
+def gridGraph(n: int, seed=None, density: float = 1.0):
+    """
+    Road-like graph: nodes on a near-square grid (id = row * cols + col),
+    each linked to its right and lower neighbour, plus diagonal shortcuts
+    in a random density/4 share of the cells. Low degree, high diameter
+    and strong locality: the structure contraction hierarchies exploit.
+    The last row may be partial; the graph is always connected.
+    """
+    weight_rng, diagonal_rng, diagonal_w_rng = _graphStreams(seed, 3)
+    cols = max(1, int(np.ceil(np.sqrt(n))))
+    ids = np.arange(n, dtype=np.int64)
+    last_col = ids % cols == cols - 1
+
+    right = ids[~last_col & (ids + 1 < n)]
+    down = ids[ids + cols < n]
+    u = np.concatenate((right, down))
+    v = np.concatenate((right + 1, down + cols))
+    w = weight_rng.integers(1, 20, size=len(u), dtype=np.int64)
+
+    cells = ids[~last_col & (ids + cols + 1 < n)]
+    cells = cells[diagonal_rng.random(len(cells)) < min(1.0, density / 4)]
+    u = np.concatenate((u, cells))
+    v = np.concatenate((v, cells + cols + 1))
+    w = np.concatenate((w, diagonal_w_rng.integers(1, 20, size=len(cells), dtype=np.int64)))
+    return _stack(n, u, v, w)
+
+
+def powerLawGraph(n: int, seed=None, density: float = 1.0):
+    """
+    Scale-free graph: a hub-biased spanning tree plus n*density extra edges
+    whose endpoints are drawn in proportion to fixed node weights
+    (i + 1)^(-1 / (POWER_LAW_EXPONENT - 1)) (the Chung-Lu model). Node 0
+    is the biggest hub; degrees follow a power law with a few huge hubs.
+    """
+    target_rng, tree_w_rng, ex_u_rng, ex_v_rng, ex_w_rng = _graphStreams(seed, 5)
+    if n < 2:
+        return np.empty((0, 3), dtype=nodeDtype(n))
+    u, v, w = _treeEdges(n, target_rng, tree_w_rng, bias=2.0)
+
+    # Inverse-CDF sampling: searchsorted on the cumulative node weights
+    cumulative = np.cumsum(np.arange(1, n + 1, dtype=np.float64) ** (-1.0 / (POWER_LAW_EXPONENT - 1)))
+    k = int(n * density)
+    ex_u = np.searchsorted(cumulative, ex_u_rng.random(k) * cumulative[-1], side="right")
+    ex_v = np.searchsorted(cumulative, ex_v_rng.random(k) * cumulative[-1], side="right")
+    ex_v = np.where(ex_u == ex_v, (ex_v + 1) % n, ex_v)  # No self-loops
+    ex_w = ex_w_rng.integers(1, 20, size=k, dtype=np.int64)
+    return _stack(n, np.concatenate((u, ex_u)), np.concatenate((v, ex_v)), np.concatenate((w, ex_w)))
+
+
+def denseGraph(n: int, seed=None, density: float = 1.0):
+    """
+    Dense graph: a random spanning tree plus about DENSE_FRACTION * density
+    of all n*(n-1)/2 node pairs (distinct pairs, so m grows as n^2).
+    Memory grows as n^2 too: 20,000 nodes is about 10M edges.
+    """
+    target_rng, tree_w_rng, pair_rng, ex_w_rng = _graphStreams(seed, 4)
+    if n < 2:
+        return np.empty((0, 3), dtype=nodeDtype(n))
+    u, v, w = _treeEdges(n, target_rng, tree_w_rng)
+
+    # Sample pair indices with replacement, then sort and drop repeats (no n^2 table)
+    pairs = n * (n - 1) // 2
+    k = min(pairs, int(pairs * min(1.0, DENSE_FRACTION * density)))
+    index = np.sort(pair_rng.integers(0, pairs, size=k, dtype=np.int64))
+    first = np.ones(len(index), dtype=bool)
+    first[1:] = index[1:] != index[:-1]
+    index = index[first]
+    # Index -> (row, col) with col < row: index = row * (row - 1) / 2 + col
+    row = ((1 + np.sqrt(8 * index.astype(np.float64) + 1)) / 2).astype(np.int64)
+    row -= row * (row - 1) // 2 > index   # Undo float rounding either way
+    row += (row + 1) * row // 2 <= index
+    col = index - row * (row - 1) // 2
+    ex_w = ex_w_rng.integers(1, 20, size=len(index), dtype=np.int64)
+    return _stack(n, np.concatenate((u, row)), np.concatenate((v, col)), np.concatenate((w, ex_w)))
+
+
+def dagGraph(n: int, seed=None, density: float = 1.0):
+    """
+    Directed acyclic graph: every arc goes from a lower id to a higher one,
+    so 0..n-1 is a topological order. A spanning tree of arcs (parent ->
+    child) lets node 0 reach every node; n*density extra arcs add shortcuts.
+    """
+    target_rng, tree_w_rng, ex_a_rng, ex_b_rng, ex_w_rng = _graphStreams(seed, 5)
+    if n < 2:
+        return np.empty((0, 3), dtype=nodeDtype(n))
+    child, parent, w = _treeEdges(n, target_rng, tree_w_rng)
+
+    k = int(n * density)
+    a = ex_a_rng.integers(0, n, size=k, dtype=np.int64)
+    b = (a + 1 + ex_b_rng.integers(0, n - 1, size=k, dtype=np.int64)) % n  # b != a
+    ex_w = ex_w_rng.integers(1, 20, size=k, dtype=np.int64)
+    u = np.concatenate((parent, np.minimum(a, b)))
+    v = np.concatenate((child, np.maximum(a, b)))
+    return _stack(n, u, v, np.concatenate((w, ex_w)))
+
+
+def negativeGraph(n: int, seed=None, density: float = 1.0):
+    """
+    Directed graph with negative arcs but no negative cycle, for
+    Bellman-Ford and Johnson: createGraph's edges as arcs both ways, each
+    reweighted w + p[u] - p[v] with random node potentials p. Every cycle
+    keeps its original (positive) total, and node 0 still reaches all.
+    """
+    # Pin the seed so the edges and the potentials come from the same graph
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    edges = randomGraph(n, seed=seed, density=density).astype(np.int64)
+    potential_rng = _graphStreams(seed, 7)[6]  # Not one of createGraph's 6 streams
+    p = potential_rng.integers(0, POTENTIAL_RANGE, size=n, dtype=np.int64)
+
+    u = np.concatenate((edges[:, 0], edges[:, 1]))
+    v = np.concatenate((edges[:, 1], edges[:, 0]))
+    w = np.concatenate((edges[:, 2], edges[:, 2])) + p[u] - p[v]
+    return _stack(n, u, v, w)
+
+
+# Each entry: name -> (generator(n, seed, density), directed, has negative weights)
+FAMILIES = {
+    "random": (randomGraph, False, False),
+    "grid": (gridGraph, False, False),
+    "power-law": (powerLawGraph, False, False),
+    "dense": (denseGraph, False, False),
+    "dag": (dagGraph, True, False),
+    "negative": (negativeGraph, True, True),
+}
+
+
+def createFamily(name: str, n: int, seed=None, density: float = 1.0, csr: bool = False):
+    """
+    Generates a FAMILIES graph: the (m, 3) edge array, or with csr=True a
+    CSRGraph built with the family's directedness (directed families must
+    not go through the undirected raw-edge path).
+    """
+    if name not in FAMILIES:
+        raise ValueError(f"Unknown graph family: {name} (use one of {', '.join(FAMILIES)})")
+    generator, directed, _ = FAMILIES[name]
+    edges = generator(n, seed=seed, density=density)
+    if csr:
+        return CSRGraph.fromEdges(n, edges, directed=directed)
+    return edges
@@ -0,0 +1,202 @@
+import struct
+import sys
+import numpy as np
+from time import time
+from csr_graph import CSRGraph, nodeDtype
+from graph_generator import CHUNK_EDGES, writeGraphChunks
+
+# ---------------------------------------------------------
+# FILE FORMAT (.csr)
+# ---------------------------------------------------------
+# [ header: 64 bytes ]
+#   magic    8s   b"CSRGRAPH"
+#   version  u32
+#   flags    u32  (bit 0 = directed)
+#   V        u64  node count
+#   E        u64  stored arc count
+#   dtypes   8s + 8s  targets / weights dtype strings, e.g. b"<i4"
+# [ offsets: (V + 1) x int64 ]  [ targets: E ]  [ weights: E ]
+# Every array starts on a 64-byte boundary so it can be memory-mapped
+# in place, with zero copies, and shared by every process that opens it.
+
+MAGIC = b"CSRGRAPH"
+VERSION = 1
+FLAG_DIRECTED = 1
+HEADER = struct.Struct("<8sIIQQ8s8s")
+HEADER_SIZE = 64
+ALIGN = 64
+OFFSET_DTYPE = np.dtype("<i8")
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _layout(V, E, target_dtype, weight_dtype):
+    """Byte positions of the offsets, targets and weights arrays, and file size."""
+    offsets_at = HEADER_SIZE
+    targets_at = _align(offsets_at + (V + 1) * OFFSET_DTYPE.itemsize)
+    weights_at = _align(targets_at + E * target_dtype.itemsize)
+    end = weights_at + E * weight_dtype.itemsize
+    return offsets_at, targets_at, weights_at, end
+
+
+def _mapArray(path, dtype, offset, count, mode):
+    # np.memmap refuses zero-length maps, so empty arrays live in memory
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(count,))
+
+
+def _createFile(path, V, E, directed, target_dtype, weight_dtype):
+    """
+    Writes the header, sizes the file, and returns writable memmaps for
+    (offsets, targets, weights) so builders can fill them in place.
+    """
+    target_dtype = np.dtype(target_dtype).newbyteorder("<")
+    weight_dtype = np.dtype(weight_dtype).newbyteorder("<")
+    offsets_at, targets_at, weights_at, end = _layout(V, E, target_dtype, weight_dtype)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, FLAG_DIRECTED if directed else 0, V, E,
+            target_dtype.str.encode(), weight_dtype.str.encode(),
+        ).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(end)
+
+    return (
+        _mapArray(path, OFFSET_DTYPE, offsets_at, V + 1, "r+"),
+        _mapArray(path, target_dtype, targets_at, E, "r+"),
+        _mapArray(path, weight_dtype, weights_at, E, "r+"),
+    )
+
+
+def saveGraph(path, graph):
+    """Writes a CSRGraph to `path` in the binary .csr format."""
+    offsets, targets, weights = _createFile(
+        path, graph.V, graph.E, graph.directed, graph.targets.dtype, graph.weights.dtype
+    )
+    offsets[:] = graph.offsets
+    targets[:] = graph.targets
+    weights[:] = graph.weights
+    for arr in (offsets, targets, weights):
+        if isinstance(arr, np.memmap):
+            arr.flush()
+
+
+def loadGraph(path, mmap=True):
+    """
+    Opens a .csr file as a CSRGraph.
+    With mmap=True (default) the arrays are read-only views of the file:
+    opening is O(1) and the OS page cache is shared between processes.
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: file too small to be a .csr graph")
+
+    magic, version, flags, V, E, t_str, w_str = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a .csr graph file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported .csr version {version}")
+
+    target_dtype = np.dtype(t_str.rstrip(b"\0").decode())
+    weight_dtype = np.dtype(w_str.rstrip(b"\0").decode())
+    offsets_at, targets_at, weights_at, _ = _layout(V, E, target_dtype, weight_dtype)
+
+    if mmap:
+        load = lambda dtype, at, count: _mapArray(path, dtype, at, count, "r")
+    else:
+        load = lambda dtype, at, count: np.fromfile(path, dtype=dtype, count=count, offset=at)
+
+    return CSRGraph(
+        load(OFFSET_DTYPE, offsets_at, V + 1),
+        load(target_dtype, targets_at, E),
+        load(weight_dtype, weights_at, E),
+        directed=bool(flags & FLAG_DIRECTED),
+    )
+
+
+def csrFromEdgeFile(path, edge_path, V=None, directed=False, chunk_size=CHUNK_EDGES):
+    """
+    Builds a .csr file from a (m, 3) .npy edge file (see writeGraphChunks)
+    in two streaming passes, holding only one chunk of edges at a time:
+      1. count the out-degree of every node -> offsets
+      2. scatter each chunk's arcs into their slots in the mapped file
+    """
+    edges = np.load(edge_path, mmap_mode="r")
+    m = len(edges)
+
+    def arcs(lo):
+        block = np.asarray(edges[lo:lo + chunk_size])
+        u, v, w = block[:, 0], block[:, 1], block[:, 2]
+        if directed:
+            return u, v, w
+        return np.concatenate((u, v)), np.concatenate((v, u)), np.concatenate((w, w))
+
+    # PASS 1: degree counts (and the true node count)
+    counts = np.zeros(V or 0, dtype=np.int64)
+    for lo in range(0, m, chunk_size):
+        u, v, _ = arcs(lo)
+        block_counts = np.bincount(u, minlength=len(counts))
+        if len(block_counts) > len(counts):
+            counts = np.concatenate((counts, np.zeros(len(block_counts) - len(counts), np.int64)))
+        counts += block_counts
+        if len(v):
+            top = int(v.max()) + 1
+            if top > len(counts):
+                counts = np.concatenate((counts, np.zeros(top - len(counts), np.int64)))
+    V = len(counts)
+    E = int(counts.sum())
+
+    weight_dtype = np.int32 if edges.dtype.itemsize <= 4 else np.int64
+    offsets, targets, weights = _createFile(path, V, E, directed, nodeDtype(V), weight_dtype)
+    offsets[0] = 0
+    np.cumsum(counts, out=offsets[1:])
+
+    # PASS 2: place arcs. Within a chunk, a stable sort by source plus each
+    # arc's rank inside its source's run gives its slot after the cursor.
+    cursor = np.array(offsets[:-1])
+    for lo in range(0, m, chunk_size):
+        u, v, w = arcs(lo)
+        order = np.argsort(u, kind="stable")
+        us = u[order]
+
+        run_starts = np.flatnonzero(np.r_[True, us[1:] != us[:-1]]) if len(us) else us
+        run_lengths = np.diff(np.r_[run_starts, len(us)])
+        rank = np.arange(len(us)) - np.repeat(run_starts, run_lengths)
+
+        slots = cursor[us] + rank
+        targets[slots] = v[order]
+        weights[slots] = w[order]
+        cursor += np.bincount(us, minlength=V)
+
+    for arr in (offsets, targets, weights):
+        if isinstance(arr, np.memmap):
+            arr.flush()
+    return E
+
+
+if __name__ == "__main__":
+    # Usage: python graph_io.py <out.csr> <nodes> [seed]
+    if len(sys.argv) < 3:
+        print("Usage: python graph_io.py <out.csr> <nodes> [seed]")
+        sys.exit(1)
+
+    out_path = sys.argv[1]
+    n = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    edge_path = out_path + ".edges.npy"
+    start = time()
+    m = writeGraphChunks(edge_path, n, seed=seed)
+    gen_end = time()
+    arcs_written = csrFromEdgeFile(out_path, edge_path)
+    build_end = time()
+    graph = loadGraph(out_path)
+    load_end = time()
+
+    print(f"Generated {m} edges in {gen_end-start:.2f}s -> {edge_path}")
+    print(f"Built {arcs_written} arcs in {build_end-gen_end:.2f}s -> {out_path}")
+    print(f"Loaded {graph} in {(load_end-build_end)*1000:.2f} ms")
@@ -0,0 +1,32 @@
+import os
+import sys
+from contextlib import nullcontext
+
+# OperationCounter lives with the GUI at the repository root; the algorithm
+# modules import it (and the GUI's shared perf_monitor) from here
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from counter import OperationCounter, perf_monitor
+
+__all__ = ["OperationCounter", "perf_monitor", "phase", "record"]
+
+# ---------------------------------------------------------
+# INSTRUMENTATION HOOKS
+# ---------------------------------------------------------
+# The algorithms accept an optional `counter` (counter.OperationCounter, or
+# anything with the same phase()/add()/add_time() methods). These helpers
+# keep the disabled case to a single `is None` check per call.
+
+_NO_PHASE = nullcontext()
+
+
+def phase(counter, name):
+    """Times a block into counter's phase `name`; a shared no-op when counter is None."""
+    if counter is None:
+        return _NO_PHASE
+    return counter.phase(name)
+
+
+def record(counter, **counts):
+    """Adds a batch of counts to counter in one call (no-op when None)."""
+    if counter is not None:
+        counter.add(**counts)
@@ -0,0 +1,135 @@
+import numpy as np
+from time import perf_counter
+from csr_graph import CSRGraph, asCSR
+from bellman_ford import bellmanFord
+from dijkstra import dijkstraBatch
+from instrument import phase
+from parallel import parallelDijkstra
+
+# Same unreachable sentinel as dijkstra() (sys.maxsize, as an int64)
+INF = np.iinfo(np.int64).max
+
+# ---------------------------------------------------------
+# ALGORITHM IMPLEMENTATION
+# ---------------------------------------------------------
+
+def potentials(V, edges, engine="numpy", counter=None):
+    """
+    Johnson's vertex potentials h: shortest distances from a virtual node
+    joined to every node by a 0-weight arc, found with one bellmanFord run.
+    Every arc then satisfies w(u, v) + h[u] - h[v] >= 0.
+    Returns an int64 array, or None if the graph has a negative cycle.
+    """
+    graph = asCSR(V, edges, directed=True)
+    V = graph.V
+
+    # The virtual node V, with an arc to every real node
+    sources = np.concatenate((graph.arcSources(), np.full(V, V, dtype=graph.targets.dtype)))
+    targets = np.concatenate((graph.targets, np.arange(V, dtype=graph.targets.dtype)))
+    weights = np.concatenate((graph.weights.astype(np.int64), np.zeros(V, dtype=np.int64)))
+    augmented = CSRGraph.fromArcs(V + 1, sources, targets, weights, directed=True)
+
+    dist = bellmanFord(V + 1, augmented, V, engine=engine, counter=counter)
+    if dist == [-1]:
+        return None
+    return np.array(dist[:V], dtype=np.int64)
+
+
+def reweight(graph, h):
+    """The graph with w'(u, v) = w(u, v) + h[u] - h[v] (all non-negative)."""
+    weights = graph.weights.astype(np.int64) + h[graph.arcSources()] - h[graph.targets]
+    return CSRGraph(graph.offsets, graph.targets, weights, directed=graph.directed)
+
+
+def johnsonRows(V, edges, sources=None, engine="numpy", workers=None, counter=None):
+    """
+    All-pairs shortest paths on a graph that may have negative weights.
+    Input: Raw edge list (treated as directed) or a prebuilt CSRGraph.
+    Yields (source, distances) per source (default: every node) as int64
+    rows, with INF (= sys.maxsize) for unreachable nodes.
+    workers > 1 runs the Dijkstra stage with parallelDijkstra(); rows then
+    arrive in completion order.
+    Raises ValueError if the graph has a negative cycle.
+    counter: optional OperationCounter (potentials/reweight phases plus the
+    Bellman-Ford and Dijkstra counts).
+    """
+    with phase(counter, "build"):
+        graph = asCSR(V, edges, directed=True)
+
+    # 1. One Bellman-Ford pass for the potentials
+    with phase(counter, "potentials"):
+        h = potentials(graph.V, graph, engine, counter)
+    if h is None:
+        raise ValueError("Graph contains a negative cycle")
+
+    # 2. Non-negative weights, so Dijkstra is valid from every source
+    with phase(counter, "reweight"):
+        positive = reweight(graph, h)
+
+    # 3. Dijkstra per source, then undo the reweighting:
+    # d(s, v) = d'(s, v) - h[s] + h[v]
+    if sources is None:
+        sources = range(graph.V)
+    if workers is not None and workers > 1:
+        rows = parallelDijkstra(graph.V, positive, sources, workers=workers, counter=counter)
+    else:
+        rows = dijkstraBatch(graph.V, positive, sources, counter=counter)
+    for src, row in rows:
+        reached = row != INF
+        row[reached] += h[reached] - h[src]
+        yield src, row
+
+
+def johnson(V, edges, sources=None, engine="numpy", workers=None, out=None, block_rows=256, counter=None):
+    """
+    Distance matrix of johnsonRows(): shape (len(sources), V), int64.
+    With out (a .npy path) the matrix is written into a memory-mapped file
+    instead of RAM, flushed every block_rows rows, so V x V results larger
+    than memory work; the returned array is then a read-only memmap.
+    """
+    graph = asCSR(V, edges, directed=True)
+    sources = list(range(graph.V)) if sources is None else [int(s) for s in sources]
+    shape = (len(sources), graph.V)
+    row_of = {src: i for i, src in enumerate(sources)}
+
+    if out is None:
+        matrix = np.empty(shape, dtype=np.int64)
+    else:
+        matrix = np.lib.format.open_memmap(out, mode="w+", dtype=np.int64, shape=shape)
+
+    rows = johnsonRows(graph.V, graph, sources, engine, workers, counter)
+    for done, (src, row) in enumerate(rows, 1):
+        matrix[row_of[src]] = row
+        # Write finished blocks out, so dirty pages never pile up in RAM
+        if out is not None and done % block_rows == 0:
+            matrix.flush()
+
+    if out is None:
+        return matrix
+    matrix.flush()
+    del matrix
+    return np.load(out, mmap_mode="r")
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("All-pairs shortest paths with Johnson's algorithm.", default_nodes=2000,
+                          default_family="negative", profile=False)
+    args = parser.parse_args()
+
+    # Default: directed graph with negative arcs but no negative cycles
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    graph, _ = loadCSR(args)
+    v = graph.V
+    print(f"{graph}, {int((graph.weights < 0).sum())} negative arcs")
+
+    start = perf_counter()
+    matrix = johnson(v, graph)
+    elapsed = perf_counter() - start
+    reached = matrix != INF
+    print(f"All-pairs: {elapsed:.3f}s, {matrix.nbytes / 1e6:.1f} MB, "
+          f"{int(reached.sum())} reachable pairs")
+    print(f"Sample row {args.src}: {matrix[args.src, :5].tolist()}")
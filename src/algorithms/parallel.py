@@ -0,0 +1,304 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing import shared_memory, util
+from time import perf_counter
+from csr_graph import CSRGraph, asCSR
+from dijkstra import dijkstraBatch, dijkstraMany
+from instrument import phase, record
+
+# ---------------------------------------------------------
+# SHARED-MEMORY GRAPH
+# ---------------------------------------------------------
+
+class SharedArrays:
+    """
+    NumPy arrays copied once into shared memory blocks.
+    spec is a small picklable description; worker processes rebuild views
+    of the same memory from it with attachArrays(), nothing else is copied.
+    Use as a context manager so the blocks are always released.
+    """
+
+    def __init__(self, *arrays):
+        self.spec = []
+        self._blocks = []
+        for array in arrays:
+            # Zero-size blocks are not allowed; empty arrays still get one byte
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.spec.append((block.name, array.shape, array.dtype.str))
+
+    def arrays(self):
+        """Views of the shared blocks (valid until close())."""
+        return [
+            np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for block, (_, shape, dtype) in zip(self._blocks, self.spec)
+        ]
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def attachArrays(spec):
+    """
+    Views of the arrays described by a SharedArrays spec.
+    Returns (arrays, blocks); keep blocks referenced while using the arrays.
+    """
+    blocks, arrays = [], []
+    for name, shape, dtype in spec:
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays.append(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    return arrays, blocks
+
+
+# ---------------------------------------------------------
+# WORKER PROCESS SIDE
+# ---------------------------------------------------------
+
+# Set once per worker process by _attachWorker()
+_graph = None
+_output = None
+_blocks = []
+
+
+def _attachWorker(graph_spec, directed, output_spec):
+    """Pool initializer: attach to the shared graph (and output matrix) once."""
+    global _graph, _output, _blocks
+    (offsets, targets, weights), graph_blocks = attachArrays(graph_spec)
+    _graph = CSRGraph(offsets, targets, weights, directed=directed)
+    _blocks = graph_blocks
+    if output_spec is not None:
+        (_output,), output_blocks = attachArrays(output_spec)
+        _blocks += output_blocks
+    # Pool workers leave through os._exit() under fork, which skips atexit;
+    # multiprocessing runs its own finalizers on every worker exit path
+    util.Finalize(None, _detachWorker, exitpriority=10)
+
+
+def _detachWorker():
+    """Closes this worker's shared-memory handles (the caller unlinks them)."""
+    global _graph, _output, _blocks
+    # Drop the views first: a block with exported buffers cannot be closed
+    _graph = _output = None
+    for block in _blocks:
+        block.close()
+    _blocks = []
+
+
+class _TaskCounts:
+    """Collects one task's counts in the worker; merged into the caller's counter."""
+
+    def __init__(self):
+        self.counts = {}
+        self.peak_heap = 0
+        self.phases = {}
+
+    def add(self, peak_heap=0, **counts):
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+        self.peak_heap = max(self.peak_heap, peak_heap)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, perf_counter() - start)
+
+
+def _runSources(sources, first_row, targets, counting):
+    """
+    One task: a batch of sources through dijkstraBatch on the shared graph.
+    With a shared output matrix, rows are written in place from first_row
+    on and only the source ids travel back; otherwise the rows do.
+    """
+    counts = _TaskCounts() if counting else None
+    rows = []
+    batch = dijkstraBatch(_graph.V, _graph, sources, targets, counter=counts)
+    for i, (src, row) in enumerate(batch):
+        if _output is not None:
+            _output[first_row + i] = row
+            rows.append((src, None))
+        else:
+            rows.append((src, row))
+    return rows, counts
+
+
+# ---------------------------------------------------------
+# CALLER SIDE
+# ---------------------------------------------------------
+
+def _chunks(sources, workers, chunk_size, width):
+    """
+    Splits sources into tasks: about 4 per worker for load balancing, and
+    small enough that one task's rows stay around 64 MB.
+    """
+    if chunk_size is None:
+        by_balance = -(-len(sources) // (workers * 4))
+        by_memory = max(1, (64 << 20) // max(8 * width, 1))
+        chunk_size = max(1, min(by_balance, by_memory))
+    return [(i, sources[i:i + chunk_size]) for i in range(0, len(sources), chunk_size)]
+
+
+def _merge(counter, counts):
+    if counter is None or counts is None:
+        return
+    record(counter, peak_heap=counts.peak_heap, **counts.counts)
+    for name, seconds in counts.phases.items():
+        counter.add_time(name, seconds)
+
+
+def _poolSize(workers):
+    """Requested worker count (default: os.cpu_count())."""
+    return workers or os.cpu_count() or 1
+
+
+def breakEven(serial_s, pool_s, sources, workers):
+    """
+    Pool overhead (seconds) and the source count at which a pool of
+    `workers` starts to beat the serial batch, from one timing of each.
+    Models pool time as overhead + serial time / usable cores, where usable
+    cores is min(workers, os.cpu_count()). break-even is None when the pool
+    can never win (a single usable core).
+    """
+    cores = min(workers, os.cpu_count() or 1)
+    overhead = max(pool_s - serial_s / cores, 0.0)
+    if cores <= 1 or not sources:
+        return overhead, None
+    saved_per_source = serial_s / sources * (1 - 1 / cores)
+    return overhead, int(np.ceil(overhead / saved_per_source)) if saved_per_source else None
+
+
+def _runPool(graph, sources, targets, workers, chunk_size, counter, output):
+    """Yields (src, row or None) per source as the worker tasks complete."""
+    width = graph.V if targets is None else len(targets)
+    tasks = _chunks(sources, workers, chunk_size, width)
+
+    with SharedArrays(graph.offsets, graph.targets, graph.weights) as shared:
+        output_spec = None if output is None else output.spec
+        with ProcessPoolExecutor(
+            max_workers=min(workers, max(len(tasks), 1)),
+            initializer=_attachWorker,
+            initargs=(shared.spec, graph.directed, output_spec),
+        ) as pool:
+            futures = [
+                pool.submit(_runSources, chunk, first, targets, counter is not None)
+                for first, chunk in tasks
+            ]
+            try:
+                for future in as_completed(futures):
+                    rows, counts = future.result()
+                    _merge(counter, counts)
+                    yield from rows
+            finally:
+                # Stopping early: don't start tasks nobody will read
+                for future in futures:
+                    future.cancel()
+
+
+def parallelDijkstra(V, edges, sources, targets=None, workers=None, chunk_size=None, counter=None):
+    """
+    Many-source Dijkstra spread across a process pool.
+    With workers=1 (or a single CPU by default) it runs dijkstraBatch()
+    in-process instead; see breakEven() for when a pool pays off.
+    Speedup has only been measured on a single core, where the pool ran at
+    0.29-0.95x of serial; scaling with more cores is unverified.
+    The graph is copied once into shared memory; every worker attaches to it
+    when it starts instead of receiving the edges with each task.
+    Yields (source, distances) as tasks finish, so the order differs from
+    `sources`. Rows are the same as dijkstraBatch() (sys.maxsize = unreachable).
+    workers defaults to os.cpu_count(); chunk_size is the sources per task.
+    counter: optional OperationCounter; worker counts are merged into it and
+    its phases hold summed worker time, not wall time.
+    """
+    with phase(counter, "build"):
+        graph = asCSR(V, edges)
+    sources = [int(s) for s in sources]
+    targets = None if targets is None else [int(t) for t in targets]
+    workers = _poolSize(workers)
+    if workers == 1:
+        # OPTIMIZATION: one worker only adds process start-up and the
+        # shared-memory copy on top of the same serial batch
+        yield from dijkstraBatch(graph.V, graph, sources, targets, counter=counter)
+        return
+    yield from _runPool(graph, sources, targets, workers, chunk_size, counter, None)
+
+
+def parallelDijkstraMany(V, edges, sources, targets=None, workers=None, chunk_size=None, counter=None):
+    """
+    Distance matrix version of parallelDijkstra(), in `sources` order.
+    Workers write their rows straight into a shared output matrix, so the
+    rows are never pickled back to this process.
+    """
+    with phase(counter, "build"):
+        graph = asCSR(V, edges)
+    sources = [int(s) for s in sources]
+    targets = None if targets is None else [int(t) for t in targets]
+    workers = _poolSize(workers)
+    if workers == 1:
+        return dijkstraMany(graph.V, graph, sources, targets, counter)
+    width = graph.V if targets is None else len(targets)
+
+    matrix = np.empty((len(sources), width), dtype=np.int64)
+    with SharedArrays(matrix) as output:
+        for _ in _runPool(graph, sources, targets, workers, chunk_size, counter, output):
+            pass
+        matrix[...] = output.arrays()[0]
+    return matrix
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("Many-source Dijkstra: serial vs. a process pool.", default_nodes=100000,
+                          families=["random", "grid", "power-law", "dense", "dag"], profile=False)
+    parser.add_argument("--sources", type=int, default=64, help="number of sources")
+    parser.add_argument("--workers", type=int, nargs="+", help="pool sizes to time (default: 1, 2, 4, CPUs)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    graph, _ = loadCSR(args)
+    v = graph.V
+    sources = list(range(0, v, max(1, v // args.sources)))[:args.sources]
+
+    cpus = os.cpu_count() or 1
+    # Pool speedups have only been measured with nproc=1 so far
+    print(f"{cpus} CPU(s). Pool timings so far come from a single core only (0.29-0.95x of serial); "
+          f"{'a pool can only add overhead here' if cpus == 1 else 'multi-core scaling is unverified'}.")
+    print(f"Serial: {len(sources)} sources...")
+    start = perf_counter()
+    serial = dijkstraMany(graph.V, graph, sources)
+    serial_s = perf_counter() - start
+    print(f"  {serial_s:.3f}s")
+
+    for workers in args.workers or sorted({1, 2, 4, cpus}):
+        start = perf_counter()
+        matrix = parallelDijkstraMany(graph.V, graph, sources, workers=workers)
+        elapsed = perf_counter() - start
+        same = "ok" if np.array_equal(matrix, serial) else "MISMATCH"
+        overhead, even = breakEven(serial_s, elapsed, len(sources), workers)
+        if workers == 1:
+            print(f"  1 worker (serial fallback): {elapsed:.3f}s ({serial_s / elapsed:.2f}x) {same}")
+            continue
+        even = "never on this machine" if even is None else f"about {even} sources"
+        print(f"  {workers} workers: {elapsed:.3f}s ({serial_s / elapsed:.2f}x) {same}, "
+              f"pool overhead {overhead:.3f}s, break-even {even}")
@@ -0,0 +1,206 @@
+import argparse
+import cProfile
+import pstats
+import statistics
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+from graph_generator import FAMILIES, createFamily, createGraph
+from graph_io import loadGraph
+from csr_graph import asCSR
+from instrument import OperationCounter
+
+# ---------------------------------------------------------
+# SHARED COMMAND LINE FOR THE ALGORITHM DRIVERS
+# ---------------------------------------------------------
+# Stages of one run, in order. "build" (normalization + CSR adjacency),
+# "init", "search" and "output" (result conversion) are the phases the
+# algorithms already report into a counter; "generate" is the driver's.
+STAGES = ("generate", "build", "init", "search", "output")
+
+
+def driverParser(description, default_nodes, engines=None, default_engine=None, families=None,
+                 default_family="random", profile=True):
+    """
+    argparse parser with the options every algorithm driver shares.
+    engines: choices for --engine (None: the driver has no engines).
+    families: the graph_generator.FAMILIES the algorithm is correct on (default: all).
+    profile: add --dtype and the --profile options (single-source drivers
+    that run through profileRun()).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--nodes", type=int, default=default_nodes, help="generated graph size")
+    parser.add_argument("--graph", help="load a .csr graph file instead of generating one")
+    parser.add_argument("--seed", type=int, default=0, help="generator seed (same seed, same graph)")
+    parser.add_argument("--family", choices=families or list(FAMILIES), default=default_family,
+                        help="generated graph family (random is createGraph's)")
+    parser.add_argument("--density", type=float, default=1.0, help="density passed to the graph generator")
+    if engines is not None:
+        parser.add_argument("--engine", choices=engines, default=default_engine)
+    parser.add_argument("--src", type=int, default=0, help="source node")
+    parser.add_argument("--repeats", type=int, default=3, help="timed searches on the prebuilt graph")
+    if not profile:
+        return parser
+    parser.add_argument("--dtype", choices=["int32", "int64", "float32", "float64"],
+                        help="return a NumPy array of this dtype instead of a list")
+    parser.add_argument("--profile", action="store_true",
+                        help="break one run down into generate/build/init/search/output")
+    parser.add_argument("--cprofile", nargs="?", const="-", metavar="FILE",
+                        help="with --profile: cProfile the run; print the top functions, or dump stats to FILE")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="with --profile: peak memory per stage and the top allocation sites")
+    parser.add_argument("--top", type=int, default=15, help="rows of cProfile/tracemalloc output")
+    return parser
+
+
+def loadInput(args):
+    """
+    (V, edges, seconds): the raw edge list from createGraph, a family's edge
+    array, or a mapped .csr file. Directed families come back as a CSRGraph,
+    since raw edges are read as undirected.
+    """
+    start = perf_counter()
+    if args.graph:
+        edges = loadGraph(args.graph)  # Already a CSRGraph: nothing left to build
+        V = edges.V
+    elif args.family == "random":
+        V = args.nodes
+        edges = createGraph(V, seed=args.seed, density=args.density)
+    else:
+        V = args.nodes
+        directed = FAMILIES[args.family][1]
+        edges = createFamily(args.family, V, seed=args.seed, density=args.density, csr=directed)
+    return V, edges, perf_counter() - start
+
+
+def loadCSR(args):
+    """(CSRGraph, seconds): loadInput(), with raw edges built as an undirected CSRGraph."""
+    start = perf_counter()
+    V, edges, _ = loadInput(args)
+    return asCSR(V, edges), perf_counter() - start
+
+
+def timeRepeats(run, repeats):
+    """(median, min) wall time of `repeats` uninstrumented calls of run()."""
+    times = []
+    for _ in range(max(repeats, 1)):
+        start = perf_counter()
+        run()
+        times.append(perf_counter() - start)
+    return statistics.median(times), min(times)
+
+# ---------------------------------------------------------
+# PROFILE MODE
+# ---------------------------------------------------------
+
+class StageProfile:
+    """
+    Wall time (and with trace_memory, peak traced memory) per stage.
+    Stages timed by the driver are added with stage(); the algorithm's own
+    phases are merged from its OperationCounter with addPhases().
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = {}
+        self.peak_mb = {}
+        if trace_memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + perf_counter() - start
+            if self.trace_memory:
+                self.peak_mb[name] = tracemalloc.get_traced_memory()[1] / 1e6
+
+    def addPhases(self, counter, total, stage="algorithm"):
+        """Splits the timed `stage` into the counter's phases; the remainder is "other"."""
+        self.seconds.pop(stage, None)
+        for name, seconds in counter.phases.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        other = total - sum(counter.phases.values())
+        if other > 1e-6:
+            self.seconds["other"] = other
+
+    def report(self, out=print):
+        total = sum(self.seconds.values())
+        order = [s for s in STAGES if s in self.seconds] + [s for s in self.seconds if s not in STAGES]
+        out(f"{'stage':<10} {'seconds':>10} {'share':>7}" + ("   peak MB" if self.peak_mb else ""))
+        for name in order:
+            seconds = self.seconds[name]
+            line = f"{name:<10} {seconds:>10.4f} {seconds / max(total, 1e-12):>7.1%}"
+            if name in self.peak_mb:
+                line += f" {self.peak_mb[name]:>9.1f}"
+            out(line)
+        dominant = max(self.seconds, key=self.seconds.get)
+        out(f"{'total':<10} {total:>10.4f}   dominant stage: {dominant}")
+
+    def topAllocations(self, limit, out=print):
+        """Largest live allocations by source line (needs trace_memory)."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        out(f"Top {limit} live allocation sites:")
+        for stat in snapshot.statistics("lineno")[:limit]:
+            out(f"  {stat.size / 1e6:8.2f} MB  {stat.count:>8} blocks  {stat.traceback}")
+
+    def close(self):
+        if self.trace_memory:
+            tracemalloc.stop()
+
+
+def profileRun(args, run, label):
+    """
+    --profile: generates (or loads) the graph, then runs run(V, edges, counter)
+    once from the raw input with an OperationCounter, so the algorithm's
+    build/init/search/output phases land in the breakdown. Optional cProfile
+    and tracemalloc output. Returns the algorithm's result.
+    """
+    profile = StageProfile(trace_memory=args.tracemalloc)
+    with profile.stage("generate"):
+        V, edges, _ = loadInput(args)
+
+    counter = OperationCounter()
+    profiler = cProfile.Profile() if args.cprofile else None
+    start = perf_counter()
+    with profile.stage("algorithm"):
+        if profiler is not None:
+            profiler.enable()
+        result = run(V, edges, counter)
+        if profiler is not None:
+            profiler.disable()
+    total = perf_counter() - start
+
+    # tracemalloc can only see the whole algorithm stage, not each phase
+    algorithm_peak = profile.peak_mb.pop("algorithm", None)
+    profile.addPhases(counter, total)
+    graph_name = args.graph or f"{args.family} graph, seed {args.seed}"
+    print(f"{label} profile ({V} nodes, {graph_name}, engine {args.engine}):")
+    profile.report()
+    if args.tracemalloc:
+        print("(times include tracemalloc overhead; profile without it for timing)")
+    if algorithm_peak is not None:
+        print(f"Algorithm peak traced memory (build..output): {algorithm_peak:.1f} MB")
+    counts = {name: value for name, value in counter.summary().items()
+              if isinstance(value, int) and value and name != "steps"}
+    if counts:
+        print("Counts: " + ", ".join(f"{name} {value}" for name, value in counts.items()))
+
+    if profiler is not None:
+        if args.cprofile == "-":
+            print(f"cProfile, top {args.top} by cumulative time:")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.top)
+        else:
+            profiler.dump_stats(args.cprofile)
+            print(f"Wrote cProfile stats to {args.cprofile} (view with python -m pstats)")
+    if args.tracemalloc:
+        profile.topAllocations(args.top)
+    profile.close()
+    return result
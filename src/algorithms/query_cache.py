@@ -0,0 +1,286 @@
+import sys
+import weakref
+import numpy as np
+from collections import OrderedDict
+from time import perf_counter
+from csr_graph import CSRGraph, nodeDtype
+from dijkstra import dijkstra, reconstructPath, shortestPathTree
+from dynamic import DynamicGraph
+from instrument import perf_monitor, record
+from results import compactDtype, toArray, unreachable
+
+INF = sys.maxsize  # Same unreachable sentinel as dijkstra()
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+# ---------------------------------------------------------
+# CACHED RESULT
+# ---------------------------------------------------------
+
+class CachedPaths:
+    """
+    One source's shortest-path result, stored compactly and read-only.
+    dist is int32 when every finite distance fits (int64 otherwise) and
+    marks unreachable nodes with its dtype's maximum; pred uses the
+    smallest node dtype with -1 for "no parent".
+    """
+
+    __slots__ = ("src", "dist", "pred")
+
+    def __init__(self, src, dist, pred):
+        self.src = src
+        self.dist = dist
+        self.pred = pred
+        dist.flags.writeable = False  # Shared by every hit
+        pred.flags.writeable = False
+
+    @classmethod
+    def fromSearch(cls, V, src, dist, pred):
+        """Packs dijkstra()'s list and shortestPathTree()'s array."""
+        packed = toArray(dist, compactDtype(dist))
+        return cls(src, packed, np.asarray(pred).astype(nodeDtype(V)))
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes + self.pred.nbytes
+
+    @property
+    def unreachable(self):
+        """The value dist uses for unreachable nodes."""
+        return unreachable(self.dist.dtype)
+
+    def distance(self, v):
+        """Distance to v, sys.maxsize if unreachable (like dijkstra())."""
+        d = int(self.dist[v])
+        return INF if d == self.unreachable else d
+
+    def distances(self):
+        """The full dijkstra()-style list (sys.maxsize = unreachable)."""
+        dist = self.dist.astype(np.int64)
+        dist[self.dist == self.unreachable] = INF
+        return dist.tolist()
+
+    def path(self, target):
+        """Node list from src to target, [] if unreachable."""
+        return [int(u) for u in reconstructPath(self.pred, self.src, target)]
+
+# ---------------------------------------------------------
+# THE CACHE
+# ---------------------------------------------------------
+
+class _Invalidator:
+    """DynamicGraph tracker that drops a graph's entries on every edit."""
+
+    def __init__(self, cache, token):
+        self.cache = weakref.ref(cache)
+        self.token = token
+
+    def repair(self, arcs):
+        cache = self.cache()
+        if cache is not None:
+            cache.invalidate(token=self.token)
+
+
+def _forget(cache_ref, graph_id, token):
+    """weakref.finalize callback: a graph was garbage collected."""
+    cache = cache_ref()
+    if cache is not None:
+        cache.invalidate(token=token)
+        cache._tokens.pop(graph_id, None)
+        _, untrack = cache._graphs.pop(token, (None, None))
+        if untrack is not None:
+            untrack.detach()  # Nothing left to detach from
+
+
+def _detachTracker(graph_ref, tracker):
+    """weakref.finalize callback: a cache went away while its graph lives on."""
+    graph = graph_ref()
+    if graph is not None:
+        graph.detach(tracker)
+
+
+class QueryCache:
+    """
+    LRU cache of single-source shortest paths, keyed by (graph, version, source).
+
+    - CSRGraph inputs are treated as immutable and keyed by identity; their
+      entries go away when the graph is garbage collected.
+    - DynamicGraph inputs are keyed by their version, and the cache attaches
+      itself as a tracker so every edit (or batch) drops that graph's entries.
+    Raw edge lists are rejected: build a CSRGraph once instead, so a hit
+    never has to look at the edges.
+    Entries are CachedPaths; the least recently used ones are evicted once
+    their arrays exceed max_bytes. Hits, misses and evictions are added to
+    counter (perf_monitor by default) as cache_hits / cache_misses /
+    cache_evictions.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, engine="heap", counter=perf_monitor):
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self.counter = counter
+        self.nbytes = 0
+        self._entries = OrderedDict()  # (token, version, src) -> CachedPaths
+        self._tokens = {}              # id(graph) -> token, for live graphs
+        self._graphs = {}              # token -> (graph gc hook, tracker detach hook or None)
+        self._snapshots = {}           # token -> (version, CSRGraph) of a DynamicGraph
+        self._next_token = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- Queries ---
+    def query(self, V, edges, src):
+        """
+        Shortest paths from src as a CachedPaths, computed with dijkstra()
+        on a miss. edges: CSRGraph or DynamicGraph.
+        """
+        token, version = self._key(V, edges)
+        key = (token, version, src)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            record(self.counter, cache_hits=1)
+            return entry
+
+        record(self.counter, cache_misses=1)
+        graph = self._graph(V, edges, token, version)
+        dist = dijkstra(graph.V, graph, src, engine=self.engine)
+        entry = CachedPaths.fromSearch(graph.V, src, dist, shortestPathTree(graph.V, graph, dist, src))
+        self._store(key, entry)
+        return entry
+
+    def path(self, V, edges, src, target):
+        """(distance, path) like dijkstraPath(), served from the cache."""
+        entry = self.query(V, edges, src)
+        distance = entry.distance(target)
+        return distance, entry.path(target) if distance != INF else []
+
+    # --- Invalidation ---
+    def invalidate(self, graph=None, token=None):
+        """
+        Drops the entries of one graph, or everything with no argument.
+        A graph passed here is also unregistered (a DynamicGraph loses the
+        cache's tracker); its next query registers it again.
+        """
+        if graph is not None:
+            token = self._tokens.pop(id(graph), None)
+            if token is None:
+                return
+            self._unregister(token)
+        if token is None:
+            self._entries.clear()
+            self._snapshots.clear()
+            self.nbytes = 0
+            return
+        for key in [key for key in self._entries if key[0] == token]:
+            self.nbytes -= self._entries.pop(key).nbytes
+        self._snapshots.pop(token, None)
+
+    def clear(self):
+        """Drops every entry and detaches the cache from every graph."""
+        for token in list(self._graphs):
+            self._unregister(token)
+        self._tokens.clear()
+        self.invalidate()
+
+    def stats(self):
+        """Entry count and memory use (hit/miss counts live in the counter)."""
+        return {"entries": len(self._entries), "nbytes": self.nbytes, "max_bytes": self.max_bytes}
+
+    # --- Internals ---
+    def _key(self, V, edges):
+        # OPTIMIZATION: identity keys keep a hit O(1); hashing raw edges
+        # would cost O(m) on every query, hits included
+        if not isinstance(edges, (CSRGraph, DynamicGraph)):
+            raise TypeError("QueryCache needs a CSRGraph or DynamicGraph; build raw edges once with CSRGraph.fromEdges")
+        token = self._tokens.get(id(edges))
+        if token is None:
+            token = self._register(edges)
+        return token, getattr(edges, "version", 0)
+
+    def _register(self, graph):
+        token = self._next_token
+        self._next_token += 1
+        self._tokens[id(graph)] = token
+        forget = weakref.finalize(graph, _forget, weakref.ref(self), id(graph), token)
+        untrack = None
+        if isinstance(graph, DynamicGraph):
+            tracker = _Invalidator(self, token)
+            graph.attach(tracker)
+            # Also detach if this cache is discarded before the graph
+            untrack = weakref.finalize(self, _detachTracker, weakref.ref(graph), tracker)
+        self._graphs[token] = (forget, untrack)
+        return token
+
+    def _unregister(self, token):
+        """Cancels the graph's gc hook and detaches the tracker, if any."""
+        forget, untrack = self._graphs.pop(token, (None, None))
+        if forget is not None:
+            forget.detach()
+        if untrack is not None:
+            untrack()  # Runs once: detaches the tracker now
+
+    def _graph(self, V, edges, token, version):
+        if not isinstance(edges, DynamicGraph):
+            return edges
+        # One CSR snapshot per DynamicGraph, rebuilt after edits
+        snapshot = self._snapshots.get(token)
+        if snapshot is None or snapshot[0] != version:
+            snapshot = (version, edges.toCSR())
+            self._snapshots[token] = snapshot
+        return snapshot[1]
+
+    def _store(self, key, entry):
+        if entry.nbytes > self.max_bytes:
+            return  # Would evict everything and still not fit
+        self._entries[key] = entry
+        self.nbytes += entry.nbytes
+        evicted = 0
+        while self.nbytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+            evicted += 1
+        if evicted:
+            record(self.counter, cache_evictions=evicted)
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import random
+    from profiling import driverParser, loadCSR
+
+    parser = driverParser("LRU shortest-path cache under a skewed query load.", default_nodes=100000,
+                          engines=["heap", "dial"], default_engine="heap",
+                          families=["random", "grid", "power-law", "dense", "dag"], profile=False)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cache-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"Generating {args.family} graph for {args.nodes} nodes..." if not args.graph else f"Loading {args.graph}...")
+    graph, _ = loadCSR(args)
+    v = graph.V
+    cache = QueryCache(max_bytes=args.cache_mb << 20, engine=args.engine)
+    perf_monitor.reset()
+
+    # Skewed workload: most queries come from a few popular sources
+    rng = random.Random(args.seed)
+    popular = [rng.randrange(v) for _ in range(20)]
+    queries = [rng.choice(popular) if rng.random() < 0.9 else rng.randrange(v) for _ in range(args.queries)]
+
+    start = perf_counter()
+    for src in queries:
+        cache.query(v, graph, src)
+    elapsed = perf_counter() - start
+
+    summary = perf_monitor.summary()
+    print(f"{len(queries)} queries: {elapsed:.3f}s, {summary['cache_hits']} hits, "
+          f"{summary['cache_misses']} misses, {summary['cache_evictions']} evictions")
+    print(f"Cache: {len(cache)} entries, {cache.nbytes / 1e6:.1f} MB")
+
+    dynamic = DynamicGraph.fromEdges(v, graph)
+    before = cache.query(v, dynamic, 0).distance(v - 1)
+    dynamic.setEdge(0, v - 1, 1)
+    after = cache.query(v, dynamic, 0).distance(v - 1)
+    print(f"After an edit, dist(0, {v - 1}): {before} -> {after} (entries dropped automatically)")
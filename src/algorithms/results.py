@@ -0,0 +1,78 @@
+import sys
+import numpy as np
+
+# ---------------------------------------------------------
+# COMPACT DISTANCE ARRAYS
+# ---------------------------------------------------------
+# Array outputs use one unreachable sentinel per dtype, whichever algorithm
+# produced them: the dtype's maximum for integers (for int64 that is
+# sys.maxsize, what dijkstra() already uses) and inf for floats.
+
+DTYPES = ("int32", "int64", "float32", "float64")
+
+
+def unreachable(dtype):
+    """The value marking unreachable nodes in a `dtype` distance array."""
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return dtype.type(np.inf)
+    return np.iinfo(dtype).max
+
+
+def compactDtype(dist):
+    """
+    int32 when every finite distance fits below int32's sentinel, otherwise
+    int64: the smallest integer dtype toArray() can store dist in.
+    """
+    raw, missing = _split(dist)
+    finite = raw[~missing]
+    info = np.iinfo(np.int32)
+    if len(finite) and (finite.max() >= info.max or finite.min() < info.min):
+        return np.dtype(np.int64)
+    return np.dtype(np.int32)
+
+
+def toArray(dist, dtype="int64"):
+    """
+    Distances as a NumPy array of `dtype` with the unreachable() sentinel.
+    dist: a list using sys.maxsize or float('inf') for unreachable nodes
+    (dijkstra() / bellmanFord()), or an int64 array using sys.maxsize.
+    Raises ValueError if a finite distance does not fit an integer dtype;
+    float32 keeps distances exact only up to 2**24.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.name not in DTYPES:
+        raise ValueError(f"Unsupported distance dtype: {dtype} (use one of {', '.join(DTYPES)})")
+
+    raw, missing = _split(dist)
+    if dtype.kind == "i":
+        info = np.iinfo(dtype)
+        finite = raw[~missing]
+        # The dtype's max is reserved for the sentinel
+        if len(finite) and (finite.max() >= info.max or finite.min() < info.min):
+            raise ValueError(f"Distances do not fit in {dtype}; use a wider dtype")
+
+    out = np.empty(raw.shape, dtype=dtype)
+    np.copyto(out, raw, casting="unsafe", where=~missing)
+    out[missing] = unreachable(dtype)
+    return out
+
+
+def _split(dist):
+    """(raw array, mask of unreachable entries) for any accepted dist input."""
+    raw = np.asarray(dist)
+    if raw.dtype.kind == "f" and not isinstance(dist, np.ndarray) and _integral(dist):
+        # A list mixing ints with float('inf') (bellmanFord) becomes float64
+        # under np.asarray, rounding distances above 2**53; map inf first
+        inf = float("inf")
+        raw = np.fromiter((sys.maxsize if d == inf else d for d in dist), dtype=np.int64, count=len(raw))
+    if raw.dtype.kind == "f":
+        return raw, np.isinf(raw) & (raw > 0)
+    raw = raw.astype(np.int64, copy=False)
+    return raw, raw == np.iinfo(np.int64).max
+
+
+def _integral(dist):
+    """True when every entry of a distance list is an int or +inf."""
+    inf = float("inf")
+    return all(isinstance(d, (int, np.integer)) or d == inf for d in dist)
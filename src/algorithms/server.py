@@ -0,0 +1,293 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from graph_generator import createGraph
+from graph_io import loadGraph
+from parallel import SharedArrays, attachArrays
+from csr_graph import CSRGraph
+from query_cache import QueryCache, INF
+
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.002  # Seconds to wait for more requests after the first
+MAX_BATCH = 256
+
+# ---------------------------------------------------------
+# WORKER PROCESS SIDE
+# ---------------------------------------------------------
+
+# Set once per worker process by _attachWorker()
+_graph = None
+_cache = None
+_blocks = []
+
+
+def _attachWorker(path, graph_spec, directed, engine, cache_bytes):
+    """
+    Pool initializer: open the graph once per worker, either by mapping the
+    .csr file (shared through the OS page cache) or by attaching to the
+    server's shared memory copy.
+    """
+    global _graph, _cache, _blocks
+    if path is not None:
+        _graph = loadGraph(path)
+    else:
+        (offsets, targets, weights), _blocks = attachArrays(graph_spec)
+        _graph = CSRGraph(offsets, targets, weights, directed=directed)
+    _cache = QueryCache(max_bytes=cache_bytes, engine=engine, counter=None)
+
+
+def _answerSources(groups):
+    """
+    One task: [(src, [(target, want_path), ...]), ...].
+    Each source is searched once (or served from this worker's cache) and
+    answers all of its targets. Returns [(distance, path or None), ...]
+    per group, in order.
+    """
+    answers = []
+    for src, targets in groups:
+        entry = _cache.query(_graph.V, _graph, src)
+        results = []
+        for target, want_path in targets:
+            distance = entry.distance(target)
+            path = None
+            if want_path:
+                path = entry.path(target) if distance != INF else []
+            results.append((None if distance == INF else distance, path))
+        answers.append(results)
+    return answers
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+
+class QueryServer:
+    """
+    Long-lived shortest-path service over newline-delimited JSON.
+
+    Requests: {"id": any, "op": "distance" | "path" | "stats", "src": int,
+    "target": int}. Responses echo "id" with "distance" (null when
+    unreachable) and, for "path", the node list; bad requests get "error".
+
+    Requests that arrive within BATCH_WINDOW of each other (up to MAX_BATCH)
+    form one micro-batch: queries sharing a source share one search, and the
+    sources are spread over a process pool so the event loop only parses
+    and routes. Each worker keeps its own QueryCache of recent sources.
+    """
+
+    def __init__(self, graph, path=None, workers=None, engine="heap",
+                 cache_bytes=64 << 20, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.graph = graph
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+
+        # Workers map the .csr file themselves; otherwise share one copy
+        self._shared = None if path is not None else SharedArrays(graph.offsets, graph.targets, graph.weights)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attachWorker,
+            initargs=(path, None if self._shared is None else self._shared.spec,
+                      graph.directed, engine, cache_bytes),
+        )
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self._tasks = set()
+        self._connections = set()
+        self.stats = {"queries": 0, "batches": 0, "searches": 0, "errors": 0}
+
+    # --- Lifecycle ---
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT, unix=None):
+        """Starts listening on localhost TCP, or on a Unix socket path."""
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batchLoop())
+        if unix is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_forever(self, host="127.0.0.1", port=DEFAULT_PORT, unix=None):
+        server = await self.start(host, port, unix)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        # Connection handlers return quietly when cancelled; batches just stop
+        tasks = list(self._connections) + list(self._tasks)
+        if self._batcher is not None:
+            tasks.append(self._batcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._pool.shutdown(cancel_futures=True)
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    # --- Connections ---
+    async def _handle(self, reader, writer):
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled by close(): the stream server would log a re-raised
+            # CancelledError as an unhandled exception, so end quietly
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            reply = await self._dispatch(request)
+        except (ValueError, KeyError, TypeError) as e:
+            self.stats["errors"] += 1
+            reply = {"error": str(e)}
+        reply["id"] = request_id
+        if not writer.is_closing():
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+    async def _dispatch(self, request):
+        op = request.get("op", "distance")
+        if op == "stats":
+            return dict(self.stats, workers=self.workers, nodes=self.graph.V)
+        if op not in ("distance", "path"):
+            raise ValueError(f"Unknown op: {op}")
+        src, target = self._node(request, "src"), self._node(request, "target")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((src, target, op == "path", future))
+        distance, path = await future
+        reply = {"distance": distance}
+        if path is not None:
+            reply["path"] = path
+        return reply
+
+    def _node(self, request, field):
+        """A node id field: an int in range (1.7 or "3" are rejected, not truncated)."""
+        if field not in request:
+            raise ValueError(f"Missing {field}")
+        node = request[field]
+        if isinstance(node, bool) or not isinstance(node, int):
+            raise ValueError(f"{field} must be an integer node id")
+        if not 0 <= node < self.graph.V:
+            raise ValueError(f"Node out of range (0..{self.graph.V - 1})")
+        return node
+
+    # --- Micro-batching ---
+    async def _batchLoop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                # Take what is already queued, then wait out the window
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Run it without waiting, so the next batch can form meanwhile
+            task = asyncio.create_task(self._runBatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _runBatch(self, batch):
+        # 1. Group by source: one search answers every target of a source
+        groups = {}
+        for src, target, want_path, future in batch:
+            groups.setdefault(src, []).append((target, want_path, future))
+        self.stats["queries"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["searches"] += len(groups)
+
+        # 2. Spread the sources over the workers, one task per worker
+        sources = list(groups)
+        per_task = -(-len(sources) // self.workers)
+        loop = asyncio.get_running_loop()
+        chunks, calls = [], []
+        for i in range(0, len(sources), per_task):
+            chunk = sources[i:i + per_task]
+            work = [(src, [(t, p) for t, p, _ in groups[src]]) for src in chunk]
+            chunks.append(chunk)
+            calls.append(loop.run_in_executor(self._pool, _answerSources, work))
+
+        # 3. Hand every answer back to the connection waiting for it
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for chunk, answers in zip(chunks, results):
+            for i, src in enumerate(chunk):
+                for j, (_, _, future) in enumerate(groups[src]):
+                    if future.done():
+                        continue
+                    if isinstance(answers, BaseException):
+                        future.set_exception(ValueError(f"Search failed: {answers}"))
+                    else:
+                        future.set_result(answers[i][j])
+
+# ---------------------------------------------------------
+# DRIVER CODE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve shortest-path queries over a socket.")
+    parser.add_argument("--graph", help=".csr file to serve (default: generate one)")
+    parser.add_argument("--nodes", type=int, default=100000, help="generated graph size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", choices=["heap", "dial"], default="heap")
+    parser.add_argument("--cache-mb", type=int, default=64, help="per-worker result cache")
+    parser.add_argument("--batch-ms", type=float, default=BATCH_WINDOW * 1000)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    if args.graph:
+        graph = loadGraph(args.graph)
+    else:
+        graph = createGraph(args.nodes, csr=True, seed=args.seed)
+    print(f"Loaded {graph} in {perf_counter() - start:.2f}s")
+
+    server = QueryServer(graph, path=args.graph, workers=args.workers, engine=args.engine,
+                         cache_bytes=args.cache_mb << 20, batch_window=args.batch_ms / 1000)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {where} with {server.workers} workers (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
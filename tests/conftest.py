@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The algorithm modules import each other by flat name (run from src/algorithms)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "algorithms"))
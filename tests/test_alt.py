@@ -0,0 +1,45 @@
+import pytest
+
+from alt import LandmarkTable, altPath
+from dijkstra import dijkstraPath
+from graph_generator import createFamily
+
+PAIRS = [(0, 199), (5, 5), (17, 140), (199, 0), (60, 61)]
+
+
+def _length(graph, path):
+    """Total weight of a node path (cheapest arc between each pair)."""
+    total = 0
+    for u, v in zip(path, path[1:]):
+        targets, weights = graph.neighbors(u)
+        total += int(weights[targets == v].min())
+    return total
+
+
+@pytest.mark.parametrize("family", ["random", "grid", "dag"])
+def test_alt_matches_dijkstra_path(family):
+    graph = createFamily(family, 200, seed=12, csr=True)
+    table = LandmarkTable.build(graph.V, graph, k=4, seed=12)
+    for src, target in PAIRS:
+        expected = dijkstraPath(graph.V, graph, src, target)
+        distance, path = altPath(graph.V, graph, src, target, table)
+        assert distance == expected[0]
+        if path:
+            assert path[0] == src and path[-1] == target
+            assert _length(graph, path) == distance
+
+
+def test_save_load_round_trip(tmp_path):
+    graph = createFamily("dag", 200, seed=13, csr=True)  # Directed: separate from_nodes
+    table = LandmarkTable.build(graph.V, graph, k=3)
+    path = tmp_path / "g.csr.alt.npz"
+    table.save(path)
+    loaded = LandmarkTable.load(path, graph)
+    assert loaded.landmarks.tolist() == table.landmarks.tolist()
+    assert (loaded.to_nodes == table.to_nodes).all() and (loaded.from_nodes == table.from_nodes).all()
+    for src, target in PAIRS:
+        assert altPath(graph.V, graph, src, target, loaded) == altPath(graph.V, graph, src, target, table)
+
+    other = createFamily("dag", 200, seed=14, csr=True)
+    with pytest.raises(ValueError):
+        LandmarkTable.load(path, other)
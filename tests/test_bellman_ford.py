@@ -0,0 +1,39 @@
+from bellman_ford import bellmanFord, spfa
+from graph_generator import createFamily
+
+# A reachable negative cycle 1 -> 2 -> 3 -> 1 (total -1)
+CYCLE_EDGES = [[0, 1, 4], [1, 2, -2], [2, 3, 1], [3, 1, 0], [3, 4, 2]]
+
+
+def test_numpy_engine_matches_python():
+    for family in ("random", "dag", "negative"):
+        graph = createFamily(family, 200, seed=1, csr=True)
+        for src in (0, 57):
+            assert bellmanFord(graph.V, graph, src, engine="numpy") == bellmanFord(graph.V, graph, src)
+
+
+def test_numpy_engine_reports_negative_cycle():
+    assert bellmanFord(5, CYCLE_EDGES, 0) == [-1]
+    assert bellmanFord(5, CYCLE_EDGES, 0, engine="numpy") == [-1]
+    # Unreachable from 4, so no cycle to report
+    assert bellmanFord(5, CYCLE_EDGES, 4, engine="numpy") == bellmanFord(5, CYCLE_EDGES, 4)
+
+
+def test_spfa_matches_python():
+    for family in ("random", "dag", "negative"):
+        graph = createFamily(family, 200, seed=2, csr=True)
+        for src in (0, 99):
+            expected = bellmanFord(graph.V, graph, src)
+            assert bellmanFord(graph.V, graph, src, engine="spfa") == expected
+            assert spfa(graph.V, graph, src) == (expected, None)
+
+
+def test_spfa_returns_the_negative_cycle():
+    assert bellmanFord(5, CYCLE_EDGES, 0, engine="spfa") == [-1]
+    _, cycle = spfa(5, CYCLE_EDGES, 0)
+    assert sorted(cycle) == [1, 2, 3]
+    # Edge order: each node links to the next, the last back to the first
+    weight = {(u, v): w for u, v, w in CYCLE_EDGES}
+    arcs = list(zip(cycle, cycle[1:] + cycle[:1]))
+    assert all(arc in weight for arc in arcs)
+    assert sum(weight[arc] for arc in arcs) < 0
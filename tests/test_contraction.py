@@ -0,0 +1,49 @@
+import pytest
+
+from contraction import ContractionHierarchy, buildHierarchy
+from dijkstra import dijkstraPath
+from graph_generator import createFamily
+
+
+def _length(graph, path):
+    """Total weight of a node path (cheapest arc between each pair)."""
+    total = 0
+    for u, v in zip(path, path[1:]):
+        targets, weights = graph.neighbors(u)
+        total += int(weights[targets == v].min())
+    return total
+
+
+# core_degree / witness_budget settings from a full hierarchy to an all-core one
+SETTINGS = [{}, {"core_degree": 4}, {"witness_budget": 1}]
+
+
+@pytest.mark.parametrize("family", ["random", "grid", "power-law", "dag"])
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_query_and_path_match_dijkstra_path(family, settings):
+    graph = createFamily(family, 150, seed=15, csr=True)
+    hierarchy = buildHierarchy(graph.V, graph, **settings)
+    for src in range(0, 150, 13):
+        for target in range(0, 150, 17):
+            expected = dijkstraPath(graph.V, graph, src, target)[0]
+            assert hierarchy.distance(src, target) == expected
+            distance, path = hierarchy.path(src, target)
+            assert distance == expected
+            if path:
+                assert path[0] == src and path[-1] == target
+                assert _length(graph, path) == expected
+
+
+def test_save_load_round_trip(tmp_path):
+    graph = createFamily("grid", 150, seed=16, csr=True)
+    hierarchy = buildHierarchy(graph.V, graph, core_degree=6)
+    path = tmp_path / "g.csr.ch.npz"
+    hierarchy.save(path)
+    loaded = ContractionHierarchy.load(path, graph)
+    assert (loaded.V, loaded.core, loaded.shortcuts) == (hierarchy.V, hierarchy.core, hierarchy.shortcuts)
+    for src, target in [(0, 149), (20, 77), (149, 3)]:
+        assert loaded.path(src, target) == hierarchy.path(src, target)
+
+    other = createFamily("grid", 150, seed=17, csr=True)
+    with pytest.raises(ValueError):
+        ContractionHierarchy.load(path, other)
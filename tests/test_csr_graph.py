@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+
+
+def test_integral_float_weights_are_stored_as_integers():
+    graph = CSRGraph.fromEdges(3, [[0, 1, 2.0], [1, 2, 3.0]])
+    assert graph.weights.dtype.kind == "i"
+    assert sorted(graph.weights.tolist()) == [2, 2, 3, 3]
+
+
+def test_fractional_weight_is_rejected():
+    with pytest.raises(ValueError, match="2.5"):
+        CSRGraph.fromEdges(3, [[0, 1, 1], [1, 2, 2.5]])
+    with pytest.raises(ValueError):
+        CSRGraph.fromEdges(2, np.array([[0, 1, np.inf]]))
@@ -0,0 +1,41 @@
+import numpy as np
+
+from dijkstra import dijkstra, dijkstraBatch, dijkstraMany, reconstructPath
+from graph_generator import createFamily
+
+
+def test_zero_weight_predecessors_form_a_tree():
+    dist, pred = dijkstra(3, [[0, 1, 1], [1, 2, 0]], 0, predecessors=True)
+    assert dist.tolist() == [0, 1, 1]
+    assert pred.tolist() == [-1, 0, 1]
+
+
+def test_zero_weight_cycle_of_ties():
+    edges = [[0, 1, 0], [1, 2, 0], [2, 3, 0], [3, 1, 0], [2, 4, 5]]
+    for engine in ("heap", "dial"):
+        _, pred = dijkstra(5, edges, 0, engine=engine, predecessors=True)
+        for v in range(5):
+            assert reconstructPath(pred.tolist(), 0, v)[0] == 0
+
+
+def test_batch_and_many_match_single_calls():
+    graph = createFamily("random", 300, seed=3, csr=True)
+    sources = [0, 17, 150, 17, 299]
+    expected = [dijkstra(graph.V, graph, src) for src in sources]
+
+    rows = list(dijkstraBatch(graph.V, graph, sources))
+    assert [src for src, _ in rows] == sources
+    for (_, row), dist in zip(rows, expected):
+        assert row.tolist() == dist
+
+    assert dijkstraMany(graph.V, graph, sources).tolist() == expected
+    targets = [5, 0, 299]
+    assert dijkstraMany(graph.V, graph, sources, targets).tolist() == [[d[t] for t in targets] for d in expected]
+    assert np.array_equal(dijkstraMany(graph.V, graph, sources, dtype=np.int32), np.array(expected))
+
+
+def test_batch_keeps_unreachable_sentinel_between_queries():
+    edges = [[0, 1, 2], [2, 3, 1]]  # Two components
+    rows = list(dijkstraBatch(4, edges, [0, 2, 0]))
+    for src, row in rows:
+        assert row.tolist() == dijkstra(4, edges, src)
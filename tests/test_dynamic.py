@@ -0,0 +1,53 @@
+import random
+import sys
+
+import pytest
+
+from dijkstra import dijkstra
+from dynamic import DynamicGraph, IncrementalSSSP
+from graph_generator import createFamily
+
+
+def _check(sssp, graph):
+    """Repaired state equals a full recompute, and pred is a tight tree."""
+    expected = dijkstra(graph.V, graph.toCSR(), sssp.src)
+    assert sssp.dist == expected
+    for v, u in enumerate(sssp.pred):
+        if u >= 0:
+            assert sssp.dist[u] + graph.weight(u, v) == sssp.dist[v]
+        else:
+            assert v == sssp.src or sssp.dist[v] == sys.maxsize
+
+
+@pytest.mark.parametrize("family", ["random", "dag"])
+def test_repairs_match_recompute(family):
+    edges = createFamily(family, 80, seed=10)
+    directed = family == "dag"
+    graph = DynamicGraph.fromEdges(80, edges, directed=directed)
+    sssp = IncrementalSSSP(graph, 0)
+    rng = random.Random(10)
+    for step in range(150):
+        u, v = rng.randrange(80), rng.randrange(80)
+        if u == v:
+            continue
+        if rng.random() < 0.3 and graph.weight(u, v) is not None:
+            graph.removeEdge(u, v)
+        else:
+            graph.setEdge(u, v, rng.randrange(0, 20))
+        _check(sssp, graph)
+
+
+def test_batched_edits_repair_once():
+    graph = DynamicGraph.fromEdges(5, [[0, 1, 1], [1, 2, 1], [2, 3, 1], [3, 4, 1]])
+    sssp = IncrementalSSSP(graph, 0)
+    with graph.batch():
+        graph.setEdge(1, 2, 10)
+        graph.setEdge(0, 3, 2)
+        graph.removeEdge(3, 4)
+        assert sssp.dist == [0, 1, 2, 3, 4]  # Not repaired yet
+    _check(sssp, graph)
+    assert sssp.dist[3] == 2 and sssp.dist[4] == sys.maxsize
+
+    sssp.close()
+    graph.setEdge(0, 4, 1)
+    assert sssp.dist[4] == sys.maxsize  # No longer following edits
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from bellman_ford import bellmanFord
+from graph_generator import FAMILIES, createFamily
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_dag_arcs_follow_id_order(seed):
+    edges = createFamily("dag", 300, seed=seed)
+    assert edges.shape[1] == 3
+    assert (edges[:, 0] < edges[:, 1]).all()  # 0..n-1 is a topological order
+    assert (edges[:, 2] > 0).all()
+
+
+def test_dag_root_reaches_every_node():
+    graph = createFamily("dag", 300, seed=4, csr=True)
+    dist = bellmanFord(graph.V, graph, 0, engine="numpy")
+    assert max(dist) != float("inf")
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_negative_has_no_negative_cycle(seed):
+    graph = createFamily("negative", 300, seed=seed, csr=True)
+    assert graph.weights.min() < 0
+    dist = bellmanFord(graph.V, graph, 0, engine="numpy")
+    assert dist != [-1]  # Node 0 reaches every node, so any cycle would show
+    assert max(dist) != float("inf")
+
+
+@pytest.mark.parametrize("name", list(FAMILIES))
+def test_seed_reproduces_graph(name):
+    assert np.array_equal(createFamily(name, 200, seed=5), createFamily(name, 200, seed=5))
+
+
+def test_unknown_family_rejected():
+    with pytest.raises(ValueError):
+        createFamily("torus", 10)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from csr_graph import CSRGraph
+from graph_generator import createFamily, writeGraphChunks
+from graph_io import csrFromEdgeFile, loadGraph, saveGraph
+
+
+def _arcs(graph):
+    """Every arc as a sorted (source, target, weight) list (order-free)."""
+    return sorted(zip(graph.arcSources().tolist(), graph.targets.tolist(), graph.weights.tolist()))
+
+
+@pytest.mark.parametrize("family", ["random", "dag"])
+def test_save_load_round_trip(tmp_path, family):
+    graph = createFamily(family, 500, seed=4, csr=True)
+    path = tmp_path / "g.csr"
+    saveGraph(path, graph)
+    for mmap in (True, False):
+        loaded = loadGraph(path, mmap=mmap)
+        assert (loaded.V, loaded.E, loaded.directed) == (graph.V, graph.E, graph.directed)
+        for name in ("offsets", "targets", "weights"):
+            original, copy = getattr(graph, name), getattr(loaded, name)
+            assert copy.dtype == original.dtype
+            assert np.array_equal(copy, original)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "not.csr"
+    path.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        loadGraph(path)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_csr_from_edge_file_matches_from_edges(tmp_path, directed):
+    edge_path = tmp_path / "edges.npy"
+    writeGraphChunks(edge_path, 400, chunk_size=64, seed=5)
+    csr_path = tmp_path / "g.csr"
+    E = csrFromEdgeFile(csr_path, edge_path, directed=directed, chunk_size=50)
+
+    expected = CSRGraph.fromEdges(400, np.load(edge_path), directed=directed)
+    loaded = loadGraph(csr_path)
+    assert E == expected.E
+    assert np.array_equal(loaded.offsets, expected.offsets)
+    assert _arcs(loaded) == _arcs(expected)
@@ -0,0 +1,35 @@
+import sys
+
+import numpy as np
+import pytest
+
+from bellman_ford import bellmanFord
+from graph_generator import createFamily
+from johnson import johnson
+
+
+def _bellmanRow(graph, src):
+    """bellmanFord() distances with johnson()'s sys.maxsize for unreachable."""
+    return [sys.maxsize if d == float("inf") else d for d in bellmanFord(graph.V, graph, src)]
+
+
+def test_matches_bellman_ford_per_source():
+    graph = createFamily("negative", 120, seed=8, csr=True)
+    matrix = johnson(graph.V, graph)
+    for src in range(0, graph.V, 11):
+        assert matrix[src].tolist() == _bellmanRow(graph, src)
+
+
+def test_selected_sources_and_memmap_output(tmp_path):
+    graph = createFamily("dag", 100, seed=9, csr=True)  # Many unreachable pairs
+    sources = [99, 0, 42]
+    matrix = johnson(graph.V, graph, sources, out=tmp_path / "apsp.npy", block_rows=2)
+    assert matrix.shape == (3, graph.V)
+    for i, src in enumerate(sources):
+        assert matrix[i].tolist() == _bellmanRow(graph, src)
+    assert np.array_equal(np.load(tmp_path / "apsp.npy"), matrix)
+
+
+def test_negative_cycle_raises():
+    with pytest.raises(ValueError):
+        johnson(3, [[0, 1, 1], [1, 2, -3], [2, 0, 1]])
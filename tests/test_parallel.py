@@ -0,0 +1,27 @@
+import numpy as np
+
+from dijkstra import dijkstraMany
+from graph_generator import createFamily
+from parallel import parallelDijkstra, parallelDijkstraMany
+
+
+def test_pool_matches_serial():
+    graph = createFamily("random", 400, seed=6, csr=True)
+    sources = list(range(0, 400, 37))
+    expected = dijkstraMany(graph.V, graph, sources)
+
+    for workers in (1, 2):
+        matrix = parallelDijkstraMany(graph.V, graph, sources, workers=workers, chunk_size=3)
+        assert np.array_equal(matrix, expected)
+
+        rows = dict(parallelDijkstra(graph.V, graph, sources, workers=workers, chunk_size=3))
+        assert sorted(rows) == sorted(sources)
+        for i, src in enumerate(sources):
+            assert np.array_equal(rows[src], expected[i])
+
+
+def test_pool_with_targets():
+    graph = createFamily("dag", 300, seed=7, csr=True)
+    sources, targets = [0, 5, 100], [299, 0, 150]
+    expected = dijkstraMany(graph.V, graph, sources, targets)
+    assert np.array_equal(parallelDijkstraMany(graph.V, graph, sources, targets, workers=2), expected)
@@ -0,0 +1,103 @@
+import gc
+
+import pytest
+
+from csr_graph import CSRGraph
+from dynamic import DynamicGraph
+from instrument import OperationCounter, perf_monitor
+from query_cache import QueryCache
+
+
+def test_cached_path_after_zero_weight_edit():
+    graph = DynamicGraph.fromEdges(3, [[0, 1, 1], [1, 2, 5]])
+    cache = QueryCache(counter=None)
+    assert cache.path(3, graph, 0, 2) == (6, [0, 1, 2])
+    graph.setEdge(1, 2, 0)
+    assert cache.path(3, graph, 0, 2) == (1, [0, 1, 2])
+
+
+def test_raw_edge_lists_are_rejected():
+    with pytest.raises(TypeError):
+        QueryCache(counter=None).query(3, [[0, 1, 1], [1, 2, 5]], 0)
+
+
+def test_invalidate_and_clear_detach_the_tracker():
+    graph = DynamicGraph.fromEdges(3, [[0, 1, 1], [1, 2, 5]])
+    cache = QueryCache(counter=None)
+    cache.query(3, graph, 0)
+    assert len(graph._trackers) == 1
+    cache.invalidate(graph)
+    assert graph._trackers == [] and len(cache) == 0
+
+    cache.query(3, graph, 0)
+    cache.clear()
+    assert graph._trackers == [] and len(cache) == 0
+
+
+def test_discarded_cache_detaches_its_tracker():
+    graph = DynamicGraph.fromEdges(3, [[0, 1, 1], [1, 2, 5]])
+    cache = QueryCache(counter=None)
+    cache.query(3, graph, 0)
+    del cache
+    gc.collect()
+    assert graph._trackers == []
+
+
+def _chain(n):
+    return CSRGraph.fromEdges(n, [[i, i + 1, 1] for i in range(n - 1)])
+
+
+def test_lru_eviction_under_max_bytes():
+    graph = _chain(100)
+    entry_bytes = QueryCache(counter=None).query(100, graph, 0).nbytes
+    counter = OperationCounter()
+    cache = QueryCache(max_bytes=2 * entry_bytes, counter=counter)
+    cache.query(100, graph, 0)
+    cache.query(100, graph, 1)
+    cache.query(100, graph, 0)  # 0 is now the most recent
+    cache.query(100, graph, 2)  # Evicts 1
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+    assert counter.cache_evictions == 1
+
+    counter.reset()
+    cache.query(100, graph, 0)
+    cache.query(100, graph, 1)
+    assert (counter.cache_hits, counter.cache_misses) == (1, 1)
+
+
+def test_edits_and_batches_invalidate_entries():
+    graph = DynamicGraph.fromEdges(4, [[0, 1, 1], [1, 2, 1], [2, 3, 1]])
+    cache = QueryCache(counter=None)
+    assert cache.query(4, graph, 0).distance(3) == 3
+    graph.setEdge(0, 3, 1)
+    assert len(cache) == 0
+    assert cache.query(4, graph, 0).distance(3) == 1
+
+    with graph.batch():
+        graph.setEdge(0, 3, 10)
+        graph.setEdge(0, 2, 1)
+        assert len(cache) == 1  # Dropped once, after the batch
+    assert len(cache) == 0
+    assert cache.query(4, graph, 0).distance(3) == 2
+
+
+def test_entries_dropped_when_graph_is_collected():
+    cache = QueryCache(counter=None)
+    graph = _chain(50)
+    cache.query(50, graph, 0)
+    cache.query(50, graph, 1)
+    assert len(cache) == 2
+    del graph
+    gc.collect()
+    assert len(cache) == 0 and cache.nbytes == 0 and cache._tokens == {}
+
+
+def test_counts_reach_perf_monitor_summary():
+    graph = _chain(10)
+    entry_bytes = QueryCache(counter=None).query(10, graph, 0).nbytes
+    perf_monitor.reset()
+    cache = QueryCache(max_bytes=entry_bytes)  # perf_monitor is the default counter
+    for src in (0, 0, 1):
+        cache.query(10, graph, src)
+    summary = perf_monitor.summary()
+    assert (summary["cache_hits"], summary["cache_misses"], summary["cache_evictions"]) == (1, 2, 1)
@@ -0,0 +1,26 @@
+import sys
+
+import numpy as np
+
+from bellman_ford import bellmanFord
+from results import compactDtype, toArray, unreachable
+
+
+def test_int_and_inf_list_stays_exact_above_2_53():
+    big = 2**53 + 1
+    out = toArray([0, big, float("inf")], "int64")
+    assert out.tolist() == [0, big, sys.maxsize]
+
+
+def test_bellman_ford_array_output_matches_list():
+    edges = [[0, 1, 4], [1, 2, 3], [0, 2, 9], [3, 0, 1]]
+    dist = bellmanFord(4, edges, 0)
+    packed = bellmanFord(4, edges, 0, dtype="int32")
+    assert packed.dtype == np.int32
+    assert packed.tolist() == [0, 4, 7, unreachable("int32")]
+    assert dist[:3] == [0, 4, 7] and dist[3] == float("inf")
+
+
+def test_compact_dtype_widens_only_when_needed():
+    assert compactDtype([0, 5, float("inf")]) == np.int32
+    assert compactDtype([0, 2**40, sys.maxsize]) == np.int64
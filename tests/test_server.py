@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from dijkstra import dijkstraPath
+from graph_generator import createFamily
+from server import QueryServer
+
+
+async def _exchange(graph, lines):
+    """Sends raw request lines to a fresh server and returns the decoded replies."""
+    server = QueryServer(graph, workers=1, batch_window=0.001)
+    try:
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        replies = []
+        for line in lines:
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+        writer.close()
+        return replies
+    finally:
+        await server.close()
+
+
+def test_error_replies_and_answers():
+    graph = createFamily("random", 50, seed=11, csr=True)
+    lines = [
+        "not json",
+        "[1, 2]",
+        json.dumps({"id": 1, "op": "distance", "target": 3}),
+        json.dumps({"id": 2, "src": 1.5, "target": 3}),
+        json.dumps({"id": 3, "src": "1", "target": 3}),
+        json.dumps({"id": 4, "src": True, "target": 3}),
+        json.dumps({"id": 5, "src": 0, "target": 50}),
+        json.dumps({"id": 6, "op": "teleport", "src": 0, "target": 3}),
+        json.dumps({"id": 7, "op": "path", "src": 0, "target": 3}),
+    ]
+    replies = asyncio.run(_exchange(graph, lines))
+
+    for reply in replies[:8]:
+        assert "error" in reply and "distance" not in reply
+    assert replies[0]["id"] is None and replies[1]["error"] == "Request must be a JSON object"
+    assert replies[2] == {"id": 1, "error": "Missing src"}
+    assert [reply["id"] for reply in replies[3:8]] == [2, 3, 4, 5, 6]
+    assert replies[3]["error"] == "src must be an integer node id"
+    assert replies[7]["error"] == "Unknown op: teleport"
+
+    distance, path = dijkstraPath(graph.V, graph, 0, 3)
+    assert replies[8] == {"id": 7, "distance": distance, "path": path}
@@ -1,12 +1,42 @@
-import networkx as nx
+import numpy as np
 from PyQt6.QtWidgets import (
+    QGraphicsItem,
+    QGraphicsPathItem,
     QGraphicsSimpleTextItem,
     QGraphicsScene,
     QGraphicsView,
     QGraphicsEllipseItem,
     QGraphicsLineItem,
+    QStyleOptionGraphicsItem,
 )
-from PyQt6.QtGui import QBrush, QPen, QColor, QFont, QPainter
+from PyQt6.QtCore import QObject, QPointF, QRectF, Qt, QThread, pyqtSignal as Signal, pyqtSlot as Slot
+from PyQt6.QtGui import QBrush, QPen, QColor, QFont, QPainter, QPainterPath, QPolygonF
+from event_trace import STATES, STATE_CODE
+from layout import LayoutCache, graph_arrays, graph_key, layout_graph
+
+# Graphs with more nodes than this are drawn in large-graph mode
+LARGE_GRAPH_NODES = 200
+
+
+def points_polygon(xy):
+    """(n, 2) float array -> QPolygonF, filled through its buffer instead of n QPointF objects."""
+    polygon = QPolygonF()
+    polygon.resize(len(xy))
+    if len(xy):
+        buffer = polygon.data()
+        buffer.setsize(len(xy) * 2 * 8)
+        np.frombuffer(buffer, dtype=np.float64)[:] = np.ascontiguousarray(xy, dtype=np.float64).ravel()
+    return polygon
+
+
+def heat_colors(steps=32):
+    """Blue (near) -> yellow -> red (far) color ramp."""
+    stops = np.array([[0, 122, 204], [40, 167, 69], [255, 193, 7], [220, 53, 69]], dtype=float)
+    t = np.linspace(0, len(stops) - 1, steps)
+    lo = np.minimum(t.astype(int), len(stops) - 2)
+    rgb = stops[lo] + (stops[lo + 1] - stops[lo]) * (t - lo)[:, None]
+    return [QColor(int(r), int(g), int(b)) for r, g, b in rgb]
+
 
 class GraphNode(QGraphicsEllipseItem):
     COLOR_DEFAULT = QColor("#007ACC")   # Blue
@@ -25,7 +55,7 @@ class GraphNode(QGraphicsEllipseItem):
         self.id_text = QGraphicsSimpleTextItem(f"Node {node_id}", self)
         font = QFont("Arial", 10, QFont.Weight.Bold)
         self.id_text.setFont(font)
-        
+
         # Distance Label (Center) - Starts at Infinity
         self.dist_text = QGraphicsSimpleTextItem("∞", self)
         self.dist_text.setFont(QFont("Arial", 12, QFont.Weight.Bold))
@@ -38,14 +68,14 @@ class GraphNode(QGraphicsEllipseItem):
         rect = self.boundingRect()
         id_rect = self.id_text.boundingRect()
         self.id_text.setPos(
-            rect.center().x() - id_rect.width() / 2, 
+            rect.center().x() - id_rect.width() / 2,
             rect.top() - id_rect.height() - 2
         )
 
         # Center the Distance inside the node
         dist_rect = self.dist_text.boundingRect()
         self.dist_text.setPos(
-            rect.center().x() - dist_rect.width() / 2, 
+            rect.center().x() - dist_rect.width() / 2,
             rect.center().y() - dist_rect.height() / 2
         )
 
@@ -63,42 +93,321 @@ class GraphNode(QGraphicsEllipseItem):
         elif state == "default": self.setBrush(QBrush(self.COLOR_DEFAULT))
 
 
+class NodeCloud(QGraphicsItem):
+    """
+    Every node of a large graph in one item, instead of an ellipse and two
+    text items per node. Painting only touches the nodes inside the exposed
+    rect (viewport culling); zoomed out, nodes become plain points and labels
+    are skipped (level of detail).
+    """
+
+    COLORS = {
+        "default": GraphNode.COLOR_DEFAULT,
+        "start": GraphNode.COLOR_START,
+        "visited": GraphNode.COLOR_VISITED,
+        "frontier": GraphNode.COLOR_FRONTIER,
+        "updating": GraphNode.COLOR_UPDATING,
+    }
+    HEAT_COLORS = heat_colors()
+    COLOR_UNREACHABLE = QColor("#ADB5BD")  # Grey
+    LABEL_MIN_SCALE = 3.0   # Zoom level at which labels appear
+    MAX_LABELS = 1000       # Never draw more labels than this at once
+    POINT_MAX_PIXELS = 3.0  # Below this on-screen radius, draw points
+
+    def __init__(self, nodes, xy, radius=4.0):
+        super().__init__()
+        self.nodes = nodes
+        self.xy = xy
+        self.radius = radius
+        self.states = np.zeros(len(nodes), dtype=np.int8)
+        self.dists = np.full(len(nodes), np.inf)
+        self.heat = None  # Heatmap color index per node, when one is shown
+        self._colors = [self.COLORS[state] for state in STATES]
+
+        # Nodes sorted by x: the exposed rect becomes one searchsorted range
+        self._order = np.argsort(xy[:, 0], kind="stable")
+        self._sorted_x = xy[self._order, 0]
+
+        pad = radius * 4
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        self._bounds = QRectF(lo[0] - pad, lo[1] - pad, hi[0] - lo[0] + 2 * pad, hi[1] - lo[1] + 2 * pad)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        return self._bounds
+
+    def node_rect(self, i):
+        x, y = self.xy[i]
+        pad = self.radius * 4  # Room for the label above the node
+        return QRectF(x - pad, y - pad, 2 * pad, 2 * pad)
+
+    def set_state(self, i, state):
+        self.states[i] = STATE_CODE[state]
+        self.update(self.node_rect(i))
+
+    def set_distance(self, i, dist):
+        self.dists[i] = dist
+        self.update(self.node_rect(i))
+
+    def reset(self):
+        self.states[:] = 0
+        self.dists = np.full(len(self.nodes), np.inf)
+        self.heat = None
+        self.update()
+
+    def show_heatmap(self, dists):
+        """
+        Colors every node by distance at once (inf = unreachable, grey).
+        Colors follow distance rank, so skewed distributions still use the
+        whole ramp.
+        """
+        self.dists = np.array(dists, dtype=np.float64)
+        reached = np.flatnonzero(np.isfinite(self.dists))
+        steps = len(self.HEAT_COLORS)
+        heat = np.full(len(self.dists), steps, dtype=np.int16)  # steps = unreachable
+        order = reached[np.argsort(self.dists[reached], kind="stable")]
+        heat[order] = np.arange(len(order)) * steps // max(len(order), 1)
+        self.heat = heat
+        self.update()
+
+    def visible(self, rect):
+        """Indices of the nodes inside rect."""
+        r = self.radius
+        lo, hi = np.searchsorted(self._sorted_x, [rect.left() - r, rect.right() + r])
+        idx = self._order[lo:hi]
+        ys = self.xy[idx, 1]
+        return idx[(ys >= rect.top() - r) & (ys <= rect.bottom() + r)]
+
+    def paint(self, painter, option, widget=None):
+        idx = self.visible(option.exposedRect)
+        if len(idx) == 0:
+            return
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        xy, r = self.xy, self.radius
+        if self.heat is not None:
+            codes, colors = self.heat[idx], self.HEAT_COLORS + [self.COLOR_UNREACHABLE]
+        else:
+            codes, colors = self.states[idx], self._colors
+
+        # One brush/pen change per color, not per node
+        for code in np.unique(codes).tolist():
+            color = colors[code]
+            group = idx[codes == code]
+            if r * scale < self.POINT_MAX_PIXELS:
+                pen = QPen(color, max(2.0, 2 * r * scale))
+                pen.setCosmetic(True)
+                painter.setPen(pen)
+                painter.drawPoints(points_polygon(xy[group]))
+            else:
+                painter.setPen(QPen(QColor("#000000"), 0))
+                painter.setBrush(QBrush(color))
+                for i in group.tolist():
+                    painter.drawEllipse(QPointF(*xy[i]), r, r)
+
+        if scale < self.LABEL_MIN_SCALE or len(idx) > self.MAX_LABELS:
+            return
+        painter.setPen(QPen(QColor("#000000")))
+        painter.setFont(QFont("Arial", max(1, int(r * 0.8))))
+        for i in idx.tolist():
+            x, y = xy[i]
+            d = self.dists[i]
+            dist = "∞" if d == np.inf else (str(int(d)) if float(d).is_integer() else f"{d:g}")
+            painter.drawText(QRectF(x - 4 * r, y - 3 * r, 8 * r, 2 * r),
+                             Qt.AlignmentFlag.AlignCenter, str(self.nodes[i]))
+            painter.drawText(QRectF(x - 4 * r, y + r, 8 * r, 2 * r),
+                             Qt.AlignmentFlag.AlignCenter, dist)
+
+
+class LayoutWorker(QObject):
+    """Computes one layout on a worker thread, so big graphs never freeze the GUI."""
+
+    finished = Signal(str, object)  # graph key, (n, 2) positions
+
+    def __init__(self, key, graph, base=None):
+        super().__init__()
+        self.key = key
+        self.graph = graph  # (nodes, us, vs, weights)
+        self.base = base    # Previous LayoutEntry to update incrementally
+
+    @Slot()
+    def run(self):
+        self.finished.emit(self.key, layout_graph(*self.graph, base=self.base))
+
+
 class GraphView(QGraphicsView):
-    def __init__(self, parent=None):
+    EDGE_TILES = 16  # Edge paths per axis in large mode, so culling has units
+
+    def __init__(self, parent=None, layout_cache_dir=None):
         scene = QGraphicsScene()
         super().__init__(scene, parent)
         self.setRenderHints(QPainter.RenderHint.Antialiasing)
         self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
         self.setBackgroundBrush(QBrush(QColor("#F8F9FA")))
         self.node_items = {}
+        self.node_cloud = None  # Large-graph mode only
+        self.node_index = {}
+        self.overlay = []       # Tree/heatmap items drawn over the graph
+        # Layouts per graph content hash; a directory makes them persistent
+        self.layouts = LayoutCache(path=layout_cache_dir)
+        self._graph = None      # (key, nodes, us, vs, weights) being shown
+        self._large = False
+        self._layout_jobs = {}  # graph key -> (thread, worker)
         self.resize(780, 500)
 
     def draw_graph(self, graph_data):
+        self.draw_arrays(*graph_arrays(graph_data))
+
+    def draw_arrays(self, nodes, us, vs, weights, large=None):
+        """
+        Draws nodes plus (us[i] -> vs[i], weights[i]) edges given as index
+        arrays. Small graphs get full GraphNode items; large ones are drawn
+        once their layout, computed on a worker thread, is ready.
+        large forces the mode (None = by node count).
+        A graph seen before reuses its cached layout; a small edit of the
+        previous graph only moves the nodes it touched.
+        """
+        key = graph_key(nodes, us, vs, weights)
+        graph = (nodes, us, vs, weights)
+        self._graph = (key, *graph)
+        self._large = len(nodes) > LARGE_GRAPH_NODES if large is None else large
+        self.node_index = {node: i for i, node in enumerate(nodes)}
+
+        cached = self.layouts.get(key)
+        if cached is not None:
+            self._draw_with_layout(cached.pos)
+            return
+
+        base = self.layouts.latest()
+        if len(nodes) <= LARGE_GRAPH_NODES:
+            pos = layout_graph(*graph, base=base)
+            self.layouts.put(key, *graph, pos)
+            self._draw_with_layout(pos)
+        else:
+            self._clear()
+            self.scene().addSimpleText(f"Computing layout for {len(nodes)} nodes...",
+                                       QFont("Arial", 14))
+            self._start_layout(key, graph, base)
+
+    # --- Node updates (both modes) ---
+    def set_node_state(self, node_id, state):
+        if self.node_cloud is not None:
+            if node_id in self.node_index:
+                self.node_cloud.set_state(self.node_index[node_id], state)
+        elif node_id in self.node_items:
+            self.node_items[node_id].set_state(state)
+
+    def set_node_distance(self, node_id, dist):
+        if self.node_cloud is not None:
+            if node_id in self.node_index:
+                self.node_cloud.set_distance(self.node_index[node_id], dist)
+        elif node_id in self.node_items:
+            self.node_items[node_id].update_distance(dist)
+
+    def reset_nodes(self):
+        self.clear_tree()
+        if self.node_cloud is not None:
+            self.node_cloud.reset()
+        for node_item in self.node_items.values():
+            node_item.set_state("default")
+            node_item.update_distance(float("inf"))
+
+    # --- Whole-graph results (large mode) ---
+    def show_heatmap(self, dists):
+        """Colors nodes by distance (dists indexed like the drawn nodes)."""
+        if self.node_cloud is not None:
+            self.node_cloud.show_heatmap(dists)
+
+    def show_tree(self, pred):
+        """Overlays the shortest-path tree edges pred[v] -> v (-1 = none)."""
+        self.clear_tree()
+        if self.node_cloud is None:
+            return
+        children = np.flatnonzero(np.asarray(pred) >= 0)
+        pen = QPen(QColor(220, 53, 69, 200), 0)  # Cosmetic: 1px at any zoom
+        self.overlay = self._add_edge_paths(self.node_cloud.xy, np.asarray(pred)[children], children, pen)
+        for item in self.overlay:
+            item.setZValue(0.5)
+
+    def clear_tree(self):
+        for item in self.overlay:
+            self.scene().removeItem(item)
+        self.overlay = []
+
+    def wheelEvent(self, event):
+        # Zoom around the cursor; large graphs need it to reach the labels
+        factor = 1.15 if event.angleDelta().y() > 0 else 1 / 1.15
+        self.scale(factor, factor)
+
+    # --- Layout ---
+    def _start_layout(self, key, graph, base=None):
+        if key in self._layout_jobs:
+            return
+        thread = QThread()
+        worker = LayoutWorker(key, graph, base)
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_layout_ready)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self._reap_layouts)
+
+        self._layout_jobs[key] = (thread, worker)
+        thread.start()
+
+    def _on_layout_ready(self, key, pos):
+        _, worker = self._layout_jobs[key]
+        self.layouts.put(key, *worker.graph, pos)
+        # The user may have switched graphs while this one was computing
+        if self._graph is not None and self._graph[0] == key:
+            self._draw_with_layout(pos)
+
+    def _reap_layouts(self):
+        for key, (thread, worker) in list(self._layout_jobs.items()):
+            if thread.isFinished():
+                del self._layout_jobs[key]
+                worker.deleteLater()
+                thread.deleteLater()
+
+    def stop_layouts(self):
+        """Waits for pending layout threads (call before closing)."""
+        for thread, _ in list(self._layout_jobs.values()):
+            thread.wait()
+
+    # --- Drawing ---
+    def _clear(self):
         self.scene().clear()
         self.node_items.clear()
+        self.node_cloud = None
+        self.overlay = []
 
-        # 1. Use NetworkX to calculate "Natural" positions
-        G = nx.DiGraph()
-        for u, neighbors in graph_data.items():
-            G.add_node(u)
-            for v, weight in neighbors.items():
-                G.add_edge(u, v, weight=weight)
-
-        # "Spring Layout" makes it look natural
-        pos = nx.spring_layout(G, seed=42, k=2) 
+    def _draw_with_layout(self, pos):
+        self._clear()
+        _, nodes, us, vs, weights = self._graph
+        if not self._large:
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            self.resetTransform()
+            self._draw_small(nodes, us, vs, weights, pos)
+        else:
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+            self._draw_large(nodes, us, vs, pos)
+        # The scene rect only ever grows on its own; fit it to this graph
+        self.scene().setSceneRect(self.scene().itemsBoundingRect())
 
+    def _draw_small(self, nodes, us, vs, weights, pos):
         # Scale positions to fit visual area
         scale_x, scale_y = 600, 400
         offset_x, offset_y = 50, 50
+        xy = pos * (scale_x, scale_y) + (offset_x, offset_y)
 
-        # 2. Draw Edges (Lines + Weights)
+        # 1. Draw Edges (Lines + Weights)
         pen = QPen(QColor("#555555"), 2)
         font = QFont("Arial", 9)
-        
-        for u, v, data in G.edges(data=True):
-            x1, y1 = pos[u][0] * scale_x + offset_x, pos[u][1] * scale_y + offset_y
-            x2, y2 = pos[v][0] * scale_x + offset_x, pos[v][1] * scale_y + offset_y
-            
+
+        for u, v, weight in zip(us.tolist(), vs.tolist(), weights.tolist()):
+            x1, y1 = xy[u]
+            x2, y2 = xy[v]
+
             # Line
             line = QGraphicsLineItem(x1, y1, x2, y2)
             line.setPen(pen)
@@ -106,13 +415,13 @@ class GraphView(QGraphicsView):
 
             # Weight Text (Midpoint)
             mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            weight_text = QGraphicsSimpleTextItem(str(data['weight']))
+            weight_text = QGraphicsSimpleTextItem(str(weight))
             weight_text.setFont(font)
             # Add a small white background to text so line doesn't strike through
             weight_text.setBrush(QBrush(QColor("black")))
             bg_rect = self.scene().addRect(
-                mid_x, mid_y, weight_text.boundingRect().width(), 
-                weight_text.boundingRect().height(), 
+                mid_x, mid_y, weight_text.boundingRect().width(),
+                weight_text.boundingRect().height(),
                 pen=QPen(Qt.PenStyle.NoPen), brush=QBrush(QColor("#F8F9FA"))
             )
             weight_text.setPos(mid_x, mid_y)
@@ -120,14 +429,51 @@ class GraphView(QGraphicsView):
             weight_text.setZValue(0.6)
             self.scene().addItem(weight_text)
 
-        # 3. Draw Nodes
-        for node_id, (x, y) in pos.items():
-            sx = x * scale_x + offset_x
-            sy = y * scale_y + offset_y
+        # 2. Draw Nodes
+        for node_id, (sx, sy) in zip(nodes, xy.tolist()):
             node_item = GraphNode(node_id, sx, sy)
             self.scene().addItem(node_item)
             self.node_items[node_id] = node_item
             node_item.setZValue(1)
-            
-# Helper import needed for the rect background
-from PyQt6.QtCore import Qt
\ No newline at end of file
+
+    def _draw_large(self, nodes, us, vs, pos):
+        # Spread nodes so the average spacing stays constant as n grows
+        xy = pos * (20.0 * np.sqrt(len(nodes)))
+
+        # 1. Edges: one painter path per tile instead of one item per edge
+        pen = QPen(QColor(85, 85, 85, 120), 0)  # Cosmetic: 1px at any zoom
+        self._add_edge_paths(xy, us, vs, pen)
+
+        # 2. Nodes: a single culling, level-of-detail item
+        self.node_cloud = NodeCloud(nodes, xy)
+        self.node_cloud.setZValue(1)
+        self.scene().addItem(self.node_cloud)
+
+        self.fitInView(self.node_cloud.boundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def _add_edge_paths(self, xy, us, vs, pen):
+        """
+        Adds the (us[i], vs[i]) segments as one QPainterPath item per tile.
+        The scene index culls whole tiles outside the viewport.
+        """
+        items = []
+        if len(us) == 0:
+            return items
+        mid = (xy[us] + xy[vs]) / 2
+        lo = mid.min(axis=0)
+        size = np.maximum(mid.max(axis=0) - lo, 1e-9) / self.EDGE_TILES
+        cell = np.minimum(((mid - lo) // size).astype(np.int64), self.EDGE_TILES - 1)
+        tile = cell[:, 0] * self.EDGE_TILES + cell[:, 1]
+        order = np.argsort(tile, kind="stable")
+        bounds = np.flatnonzero(np.diff(tile[order])) + 1
+
+        for group in np.split(order, bounds):
+            path = QPainterPath()
+            for (x1, y1), (x2, y2) in zip(xy[us[group]].tolist(), xy[vs[group]].tolist()):
+                path.moveTo(x1, y1)
+                path.lineTo(x2, y2)
+            item = QGraphicsPathItem(path)
+            item.setPen(pen)
+            self.scene().addItem(item)
+            items.append(item)
+        return items